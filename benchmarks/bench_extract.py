@@ -0,0 +1,60 @@
+"""
+Throughput and output quality of the HTML extractors over the saved fixtures.
+
+    python -m benchmarks.bench_extract [--repeat 50] [--inflate 200]
+
+Each fixture is also inflated into a large page (body repeated `--inflate`
+times behind a big inline script), which is where early exit pays off.
+Quality is the share of expected phrases found and of boilerplate phrases leaked.
+"""
+import argparse, json, time
+from pathlib import Path
+
+from src.tools.extract import extract_soup, extract_text
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "html"
+
+EXTRACTORS = {
+    "soup": lambda html, url: extract_soup(html),
+    "fast": extract_text,
+}
+
+
+def inflate(html: str, times: int) -> str:
+    head, sep, body = html.partition("<body")
+    script = "<script>" + "var x = 1;" * 20_000 + "</script>"
+    return head + script + (sep + body) * times
+
+
+def quality(text: str, spec: dict) -> tuple[float, float]:
+    found = sum(m in text for m in spec["must"]) / len(spec["must"])
+    leaked = sum(m in text for m in spec["must_not"]) / len(spec["must_not"])
+    return found, leaked
+
+
+def bench(fn, html, url, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = fn(html, url)
+    return (time.perf_counter() - start) / repeat, text
+
+
+def main(repeat: int = 50, inflate_times: int = 200):
+    specs = json.loads((FIXTURES / "expected.json").read_text(encoding="utf-8"))
+    print(f"{'fixture':<22}{'extractor':<10}{'KB':>8}{'pages/s':>10}{'MB/s':>9}{'found':>8}{'leaked':>8}")
+    for name, spec in specs.items():
+        html = (FIXTURES / name).read_text(encoding="utf-8")
+        for label, doc, n in ((name, html, repeat), (name + " x" + str(inflate_times), inflate(html, inflate_times), max(1, repeat // 10))):
+            for ex, fn in EXTRACTORS.items():
+                secs, text = bench(fn, doc, spec["url"], n)
+                found, leaked = quality(text, spec)
+                kb = len(doc) / 1024
+                print(f"{label:<22}{ex:<10}{kb:>8.0f}{1 / secs:>10.0f}{kb / 1024 / secs:>9.1f}{found:>8.0%}{leaked:>8.0%}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark HTML-to-text extraction.")
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--inflate", type=int, default=200, help="repeat each fixture body this many times for the large-page case")
+    args = ap.parse_args()
+    main(args.repeat, args.inflate)
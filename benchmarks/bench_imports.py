@@ -0,0 +1,66 @@
+"""
+Startup cost of the entry points: wall time of a fresh interpreter importing
+each module or running each CLI command, and which heavy libraries it loaded.
+
+    python -m benchmarks.bench_imports [--repeat 5] [--budget 1.0]
+
+Each target runs in a new process `--repeat` times; the best time is reported
+(what a warm disk cache gives a cron job). Exits 1 if a lightweight command
+(`--help`, `db`, `parquet`, `run`, `rank`) takes longer than `--budget` seconds.
+"""
+import argparse, json, subprocess, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ("pandas", "numpy", "langchain_core", "langchain_openai", "langchain_chroma", "openai", "jobspy", "bs4", "yaml")
+MODULES = ["src.cli", "src.store", "src.columnar", "src.metrics", "src.run_fetch", "src.rank_llm", "src.memory", "src.pipeline"]
+COMMANDS = [["--help"], ["db", "--help"], ["parquet", "--help"], ["run", "--help"], ["fetch", "--help"], ["rank", "--help"]]
+LIGHT = {"--help", "db --help", "parquet --help", "run --help", "rank --help"}
+
+_PROBE = "import json, sys; import {m}; print(json.dumps(sorted({{k.split('.')[0] for k in sys.modules}})))"
+
+
+def _run(cmd: list[str]) -> tuple[float, str]:
+    t0 = time.perf_counter()
+    out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return time.perf_counter() - t0, out
+
+
+def measure(repeat: int) -> list[dict]:
+    results = []
+    for m in MODULES:
+        runs = [_run([sys.executable, "-c", _PROBE.format(m=m)]) for _ in range(repeat)]
+        loaded = set(json.loads(runs[-1][1].strip().splitlines()[-1]))
+        results.append(
+            {"target": f"import {m}", "seconds": min(t for t, _ in runs), "heavy": [h for h in HEAVY if h in loaded]}
+        )
+    for args in COMMANDS:
+        best = min(_run([sys.executable, "-m", "src", *args])[0] for _ in range(repeat))
+        results.append({"target": " ".join(args), "seconds": best, "heavy": None})
+    return results
+
+
+def report(results: list[dict]) -> str:
+    lines = [f"{'target':<28} {'seconds':>8}  heavy imports"]
+    for r in results:
+        heavy = "-" if r["heavy"] is None else ", ".join(r["heavy"]) or "none"
+        name = r["target"] if r["target"].startswith("import ") else f"python -m src {r['target']}"
+        lines.append(f"{name:<28} {r['seconds']:>8.3f}  {heavy}")
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Import-time benchmark of the entry points.")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--budget", type=float, default=1.0, help="max seconds for the lightweight commands")
+    args = ap.parse_args()
+    results = measure(args.repeat)
+    print(report(results))
+    slow = [r for r in results if r["target"] in LIGHT and r["seconds"] > args.budget]
+    for r in slow:
+        print(f"python -m src {r['target']} took {r['seconds']:.2f}s (budget {args.budget}s)")
+    sys.exit(1 if slow else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+End-to-end pipeline benchmark with every external service replaced by a local stand-in.
+
+    python -m benchmarks.bench_pipeline [--sizes 100 1000 10000] [--save-baseline]
+
+Each size runs in its own process (so peak RSS is per size). In that process:
+
+- a local HTTP server plays the Adzuna API and serves synthetic job pages,
+- a fake `scrape_jobs` plays JobSpy,
+- `FakeChatModel` (latency, error rate) plays OpenAI,
+- `HashingEmbedder` and `FakeRetriever` replace the embedding calls.
+
+`run_fetch.main` and `rank_jobs` then run end to end. The report shows
+jobs/s per phase, p50/p95 latencies from `src.metrics`, and peak RSS. The
+results are compared against benchmarks/baseline.json. The exit status is 1
+if throughput drops or memory grows by more than --tolerance.
+"""
+import argparse, json, random, resource, shutil, subprocess, sys, tempfile, time
+from pathlib import Path
+from unittest.mock import patch
+
+BASELINE = Path(__file__).with_name("baseline.json")
+PER_PAGE = 50
+ADZUNA_SHARE = 0.7  # rest comes from the fake JobSpy
+WORDS = "python go rust kafka postgres react aws kubernetes terraform spark airflow ml backend api".split()
+
+
+def _description(rng: random.Random, i: int) -> str:
+    body = " ".join(rng.choice(WORDS) for _ in range(60))
+    return f"Job {i}. We build {body}. We are an equal opportunity employer. " * 2
+
+
+def _adzuna_page(query: int, page: int, n_jobs: int, base: str) -> dict:
+    rng = random.Random(query * 10_000 + page)
+    start = (page - 1) * PER_PAGE
+    results = [
+        {
+            "id": f"{query}-{i}",
+            "title": f"Engineer {query}-{i}",
+            "company": {"display_name": f"Company {i % 97}"},
+            "location": {"area": ["US", "New York", "Manhattan"]},
+            "created": "2024-05-01T00:00:00Z",
+            "redirect_url": f"{base}/jobs/{query}-{i}",
+            "salary_min": 100_000 + i,
+            "description": _description(rng, i),
+        }
+        for i in range(start, min(start + PER_PAGE, n_jobs))
+    ]
+    return {"count": n_jobs, "results": results}
+
+
+def _jobspy_frame(n: int, base: str):
+    import pandas as pd
+
+    rng = random.Random(n)
+    return pd.DataFrame(
+        {
+            "id": f"js-{i}",
+            "site": "indeed",
+            "job_url": f"{base}/jobs/js-{i}",
+            "title": f"Developer js-{i}",
+            "company": f"Studio {i % 89}",
+            "location": "Brooklyn, NY",
+            "date_posted": "2024-05-01",
+            "min_amount": 90_000.0,
+            "max_amount": float("nan"),
+            "description": _description(rng, i),
+        }
+        for i in range(n)
+    )
+
+
+def _job_page(h):
+    slug = h.path.rsplit("/", 1)[-1]
+    paragraphs = "".join(f"<p>Responsibility {k} for role {slug}: build and run services.</p>" for k in range(30))
+    html = f"<html><head><script>var x=1;</script></head><body><nav>menu</nav><h1>Role {slug}</h1>{paragraphs}</body></html>"
+    return 200, {"Content-Type": "text/html"}, html
+
+
+def run_once(n_jobs: int, llm_latency: float, error_rate: float, concurrency: int, batch_size: int) -> dict:
+    """One end-to-end run at `n_jobs` jobs; returns the measurements as a dict."""
+    from src import enrich, metrics, run_fetch
+    from src.fetchers import adzuna, jobspy
+    from src.prefilter import HashingEmbedder, embed_profile
+    from src.rank_llm import rank_jobs
+    from benchmarks.fakes import FakeChatModel, FakeRetriever
+    from benchmarks.stub_server import StubServer
+
+    n_adzuna = int(n_jobs * ADZUNA_SHARE)
+    n_queries = max(1, n_adzuna // 1000)
+    per_query = n_adzuna // n_queries
+    n_jobspy = n_jobs - per_query * n_queries
+    tmp = Path(tempfile.mkdtemp(prefix="bench_"))
+    profile = tmp / "profile.md"
+    profile.write_text("Backend engineer: Python, Go, Kafka, Postgres, AWS and Kubernetes.\n")
+
+    def adzuna_route(h):
+        from urllib.parse import parse_qs, urlsplit
+
+        parts = urlsplit(h.path)
+        page = int(parts.path.rsplit("/", 1)[-1])
+        query = int(parse_qs(parts.query)["what"][0].split("-")[1])
+        return 200, {"Content-Type": "application/json"}, json.dumps(_adzuna_page(query, page, per_query, srv.url))
+
+    routes = {"/adzuna/*": adzuna_route, "/jobs/*": _job_page}
+    with StubServer(routes) as srv:
+        cfg = {
+            "queries": [{"source": "adzuna", "what": f"q-{q}"} for q in range(n_queries)]
+            + [{"source": "jobspy", "search_term": "developer"}],
+            "global_params": {"results_per_page": PER_PAGE, "pages": -(-per_query // PER_PAGE) + 1},
+            "fetch": {"max_parallel_queries": 4, "sources": {"adzuna": {"concurrency": 8, "rpm": None}}},
+        }
+        frame = _jobspy_frame(n_jobspy, srv.url)
+        with patch.object(adzuna, "BASE", srv.url + "/adzuna"), patch.object(
+            adzuna, "APP_ID", "bench"
+        ), patch.object(adzuna, "APP_KEY", "bench"), patch.object(
+            jobspy, "scrape_jobs", lambda **kw: frame
+        ), patch.object(enrich, "CACHE_PATH", tmp / "fetch_cache.sqlite"), patch.object(
+            enrich, "_cache", None
+        ), patch("builtins.print"):
+            metrics.reset()
+            t0 = time.perf_counter()
+            run_fetch.main(store_path=tmp / "jobs.sqlite", out_dir=tmp, config=cfg)
+            t_fetch = time.perf_counter() - t0
+
+            embedder = HashingEmbedder()
+            llm = FakeChatModel(latency=llm_latency, error_rate=error_rate)
+            t0 = time.perf_counter()
+            rank_jobs(
+                jobs_csv=tmp / "jobs.csv",
+                out_path=tmp / "ranked.csv",
+                top_k_path=tmp / "top.csv",
+                concurrency=concurrency,
+                batch_size=batch_size,
+                retry_backoff=0.01,  # the fake's failures are independent; no need to wait out an overload
+                cache_path=tmp / "scores.sqlite",
+                profile_path=profile,
+                prefilter_top_n=n_jobs,  # keeps everything; exercises the embedding path
+                embedder=embedder,
+                profile_vecs=embed_profile(embedder, profile),
+                crawler_opts={"host_delay": 0, "respect_robots": False},
+                llm=llm,
+                retriever=FakeRetriever(latency=0.002),
+            )
+            t_rank = time.perf_counter() - t0
+
+    with open(tmp / "jobs.csv", encoding="utf-8") as f:
+        fetched = sum(1 for _ in f) - 1
+    with open(tmp / "ranked.csv", encoding="utf-8") as f:
+        ranked = sum(1 for _ in f) - 1
+    shutil.rmtree(tmp, ignore_errors=True)
+    snap = metrics.snapshot()
+    latency = {
+        "{}{}".format(h["name"], "".join(f"[{v}]" for v in h["labels"].values())): {
+            "count": h["count"], "p50": round(h["p50"], 4), "p95": round(h["p95"], 4), "total": round(h["sum"], 3)
+        }
+        for h in snap["histograms"]
+    }
+    return {
+        "jobs": n_jobs,
+        "fetched": fetched,
+        "ranked": ranked,
+        "fetch_jobs_per_s": round(fetched / t_fetch, 1),
+        "rank_jobs_per_s": round(ranked / t_rank, 1),
+        "fetch_s": round(t_fetch, 2),
+        "rank_s": round(t_rank, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "llm_calls": llm.calls,
+        "latency": latency,
+    }
+
+
+def _child(n, args) -> dict:
+    cmd = [
+        sys.executable, "-m", "benchmarks.bench_pipeline", "--one", str(n),
+        "--llm-latency", str(args.llm_latency), "--error-rate", str(args.error_rate),
+        "--concurrency", str(args.concurrency), "--batch-size", str(args.batch_size),
+    ]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=Path(__file__).resolve().parents[1])
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def compare(result: dict, base: dict, tolerance: float) -> list[str]:
+    """Regressions of `result` against the baseline entry for the same size."""
+    problems = []
+    for k in ("fetch_jobs_per_s", "rank_jobs_per_s"):
+        if result[k] < base[k] * (1 - tolerance):
+            problems.append(f"{result['jobs']} jobs: {k} {result[k]} < baseline {base[k]}")
+    if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+        problems.append(f"{result['jobs']} jobs: peak RSS {result['peak_rss_mb']} MB > baseline {base['peak_rss_mb']} MB")
+    if result["ranked"] < base["ranked"]:
+        problems.append(f"{result['jobs']} jobs: ranked {result['ranked']} < baseline {base['ranked']}")
+    return problems
+
+
+def report(results: list[dict]) -> str:
+    lines = [f"{'jobs':>6} {'fetch/s':>9} {'rank/s':>8} {'ranked':>7} {'llm p50':>8} {'llm p95':>8} {'RSS MB':>7}"]
+    for r in results:
+        llm = r["latency"].get("llm_seconds[gpt-4o-mini]", {"p50": 0, "p95": 0})
+        lines.append(
+            f"{r['jobs']:>6} {r['fetch_jobs_per_s']:>9} {r['rank_jobs_per_s']:>8} {r['ranked']:>7} "
+            f"{llm['p50']:>8} {llm['p95']:>8} {r['peak_rss_mb']:>7}"
+        )
+    for r in results:
+        lines.append(f"\n{r['jobs']} jobs, p50/p95 latency (s):")
+        lines.extend(f"  {k:<40} {v['count']:>6} {v['p50']:>8} {v['p95']:>8}" for k, v in r["latency"].items())
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline end-to-end benchmark of fetch + rank.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--llm-latency", type=float, default=0.02, help="fake model latency per call (s)")
+    ap.add_argument("--error-rate", type=float, default=0.01, help="share of fake model calls that fail")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--batch-size", type=int, default=1)
+    ap.add_argument("--tolerance", type=float, default=0.3, help="allowed regression vs the baseline")
+    ap.add_argument("--save-baseline", action="store_true", help=f"overwrite {BASELINE.name} with this run")
+    ap.add_argument("--one", type=int, default=None, help=argparse.SUPPRESS)  # child mode
+    args = ap.parse_args()
+
+    if args.one is not None:
+        print(json.dumps(run_once(args.one, args.llm_latency, args.error_rate, args.concurrency, args.batch_size)))
+        return
+
+    results = [_child(n, args) for n in args.sizes]
+    print(report(results))
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps({str(r["jobs"]): {k: v for k, v in r.items() if k != "latency"} for r in results}, indent=2) + "\n")
+        print(f"\nSaved {BASELINE}")
+        return
+    if not BASELINE.exists():
+        return
+    baseline = json.loads(BASELINE.read_text())
+    problems = [p for r in results if str(r["jobs"]) in baseline for p in compare(r, baseline[str(r["jobs"])], args.tolerance)]
+    print("\nBaseline check: " + ("OK" if not problems else "REGRESSION"))
+    for p in problems:
+        print("  " + p)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
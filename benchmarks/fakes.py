@@ -0,0 +1,130 @@
+"""Offline stand-ins for the chat model and profile retriever, shared by the benchmarks and tests."""
+import asyncio, hashlib, json, random, time
+from types import SimpleNamespace
+
+
+def fake_score(external_id) -> int:
+    return int(hashlib.sha1(str(external_id).encode()).hexdigest(), 16) % 101
+
+
+def garble(reply: str, how: str) -> str:
+    """Malformed variants of a JSON reply, as real models produce them."""
+    if how == "fence":
+        return f"```json\n{reply}\n```"
+    if how == "truncate":
+        return reply[: len(reply) * 2 // 3]
+    if how == "string_score":
+        data = json.loads(reply)
+        data["score"] = f"{data['score']}/100"
+        return json.dumps(data)
+    return "Sorry, I cannot help with that."
+
+
+class FakeAPIError(RuntimeError):
+    """Carries an HTTP status like the OpenAI client's API errors."""
+
+    def __init__(self, status_code: int = 503):
+        super().__init__(f"fake API error ({status_code})")
+        self.status_code = status_code
+
+
+class FakeChatModel:
+    """
+    Answers ranking prompts with a deterministic score per job after `latency` seconds.
+    `bad_replies` maps an external_id to a list of `garble` modes used for its next single-job replies.
+    `error_rate` is the share of calls that raise, as an overloaded API would (seeded, so repeatable).
+    """
+
+    def __init__(self, latency: float = 0.0, drop_from_batch=(), bad_replies=None, error_rate: float = 0.0):
+        self.latency = latency
+        self.drop_from_batch = set(drop_from_batch)
+        self.bad_replies = {k: list(v) for k, v in (bad_replies or {}).items()}
+        self.error_rate = error_rate
+        self._rng = random.Random(0)
+        self.calls = 0
+        self.batch_calls = 0
+
+    def _respond(self, messages):
+        self.calls += 1
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise FakeAPIError(503)
+        content = next(m.content for m in reversed(messages) if "JOB DATA:\n" in m.content or "JOBS:\n" in m.content)
+        if "JOBS:\n" in content:
+            self.batch_calls += 1
+            jobs = json.loads(content.split("JOBS:\n", 1)[1])
+            rows = [self._row(j) for j in jobs if j.get("external_id") not in self.drop_from_batch]
+            return SimpleNamespace(content=json.dumps({"jobs": rows}))
+        job = json.loads(content.split("JOB DATA:\n", 1)[1])
+        reply = json.dumps(self._row(job))
+        pending = self.bad_replies.get(job.get("external_id"))
+        if pending:
+            reply = garble(reply, pending.pop(0))
+        return SimpleNamespace(content=reply)
+
+    @staticmethod
+    def _row(job):
+        ext = job.get("external_id")
+        return {
+            "external_id": ext,
+            "title": job.get("title", ""),
+            "company": job.get("company", ""),
+            "location": job.get("location", ""),
+            "redirect_url": job.get("redirect_url", ""),
+            "description": job.get("description", ""),
+            "score": fake_score(ext),
+            "why": "fake",
+            "level_fit": "mid",
+            "tech_fit": ["python"],
+            "location_fit": "ok",
+            "relevance_tags": [],
+            "summary": "fake",
+            "concerns": [],
+        }
+
+    def invoke(self, messages):
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+
+class FakeRetriever:
+    def __init__(self, facts=("Python backend engineer",), latency: float = 0.0):
+        self.docs = [SimpleNamespace(page_content=f) for f in facts]
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, query):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.docs
+
+    async def ainvoke(self, query):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.docs
+
+
+def write_jobs_csv(path, n: int):
+    """Write `n` synthetic normalized jobs in the run_fetch CSV layout."""
+    import csv
+
+    cols = ["src_id", "title", "company", "location", "created",
+            "salary_min", "salary_max", "redirect_url", "description"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=cols)
+        w.writeheader()
+        for i in range(n):
+            w.writerow({
+                "src_id": f"fake:{i}",
+                "title": f"Software Engineer {i}",
+                "company": f"Company {i % 7}",
+                "location": "New York, NY",
+                "created": "2024-01-01",
+                "salary_min": 100000 + i,
+                "salary_max": 150000 + i,
+                "redirect_url": f"https://example.com/jobs/{i}",
+                "description": f"Build backend services in Python. Job number {i}.",
+            })
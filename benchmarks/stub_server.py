@@ -0,0 +1,65 @@
+"""Tiny threaded HTTP server for exercising the HTTP client without the network (benchmarks and tests)."""
+import gzip, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    routes: dict = {}  # path (or "prefix*") -> callable(handler) -> (status, headers, body)
+    hits: dict = {}
+    client_ports: set = set()
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        StubHandler.hits[path] = StubHandler.hits.get(path, 0) + 1
+        StubHandler.client_ports.add(self.client_address[1])
+        status, headers, body = self._route(path)(self)
+        if isinstance(body, str):
+            body = body.encode()
+        if "gzip" in self.headers.get("Accept-Encoding", "") and status == 200:
+            body = gzip.compress(body)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def _route(path):
+        if path in StubHandler.routes:
+            return StubHandler.routes[path]
+        for key, handler in StubHandler.routes.items():
+            if key.endswith("*") and path.startswith(key[:-1]):
+                return handler
+        return lambda h: (404, {}, b"missing")
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer:
+    def __init__(self, routes: dict):
+        StubHandler.routes = routes
+        StubHandler.hits = {}
+        StubHandler.client_ports = set()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def hits(self):
+        return StubHandler.hits
+
+    @property
+    def client_ports(self):
+        return StubHandler.client_ports
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
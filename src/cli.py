@@ -0,0 +1,50 @@
+"""
+One entry point for the pipeline:
+
+    python -m src run [--watch 3600]    # every stage that is out of date
+    python -m src fetch [--stream] ...
+    python -m src rank [--concurrency 8] ...
+    python -m src db export ranked
+    python -m src parquet normalized --since 2024-05-01
+    python -m src index
+    python -m src enrich stats
+
+Each command's module is imported only when that command runs, so `--help`
+and the small commands start without loading pandas, langchain or OpenAI.
+"""
+import argparse, importlib, sys
+
+# command -> (module with a `cli(argv)` function, help)
+COMMANDS = {
+    "run": ("src.pipeline", "run the out-of-date stages (index, fetch, rank)"),
+    "fetch": ("src.run_fetch", "fetch jobs from the configured sources"),
+    "rank": ("src.rank_llm", "score fetched jobs against the profile"),
+    "db": ("src.store", "job database utilities (export the CSVs)"),
+    "parquet": ("src.columnar", "row counts of the Parquet datasets"),
+    "index": ("src.memory", "update the profile vector index"),
+    "enrich": ("src.enrich", "enrichment page cache stats and eviction"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Job search pipeline.",
+        epilog="Run `python -m src COMMAND --help` for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    ap.add_argument(
+        "command",
+        choices=COMMANDS,
+        metavar="COMMAND",
+        help="; ".join(f"{name}: {h}" for name, (_, h) in COMMANDS.items()),
+    )
+    ap.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return ap
+
+
+def main(argv=None):
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    module = importlib.import_module(COMMANDS[args.command][0])
+    sys.argv[0] = f"python -m src {args.command}"  # usage lines name the full command
+    return module.cli(args.args)
@@ -0,0 +1,171 @@
+"""
+Optional Parquet storage for raw, normalized and ranked jobs (needs `pyarrow`).
+
+Each table is a dataset directory partitioned by fetch date and source:
+
+    <root>/normalized/fetch_date=2024-05-01/source=adzuna/part-<id>-0.parquet
+
+so a reader that asks for a few columns, or for one month or one source, only
+touches those files and column chunks:
+
+    read_rows("data/parquet", "normalized", columns=["title", "company"],
+              filters=[("fetch_date", ">=", "2024-05-01"), ("source", "=", "adzuna")])
+
+Raw payloads differ per source (nested Adzuna objects, flat JobSpy rows), so
+the raw table keeps them as one JSON column next to `src_id`.
+"""
+import argparse, datetime, json, uuid
+from pathlib import Path
+
+TABLES = ("raw", "normalized", "ranked")
+PARTITIONS = ("fetch_date", "source")
+
+# Column types per table: "str", "float", "int", "json" (a string holding JSON) or "list" (list of str)
+COLUMNS = {
+    "raw": {"src_id": "str", "data": "json"},
+    "normalized": {
+        "src_id": "str", "title": "str", "company": "str", "location": "str", "created": "str",
+        "salary_min": "float", "salary_max": "float", "redirect_url": "str", "description": "str",
+    },
+    "ranked": {
+        "id": "int", "external_id": "str", "description": "str", "redirect_url": "str", "company": "str",
+        "title": "str", "location": "str", "score": "int", "why": "str", "level_fit": "str",
+        "tech_fit": "list", "location_fit": "str", "relevance_tags": "list", "summary": "str", "concerns": "list",
+    },
+}
+KEYS = {"raw": "src_id", "normalized": "src_id", "ranked": "external_id"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow, pyarrow.dataset, pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet storage needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _schema(table: str):
+    pa = _pyarrow()
+    types = {
+        "str": pa.string(), "json": pa.string(), "float": pa.float64(), "int": pa.int64(),
+        "list": pa.list_(pa.string()),
+    }
+    return pa.schema([(k, types[t]) for k, t in COLUMNS[table].items()] + [(p, pa.string()) for p in PARTITIONS])
+
+
+def _partitioning():
+    pa = _pyarrow()
+    return pa.dataset.partitioning(pa.schema([(p, pa.string()) for p in PARTITIONS]), flavor="hive")
+
+
+def _coerce(value, kind: str):
+    if value is None or (value == "" and kind != "str"):
+        return None
+    if kind == "json":
+        return json.dumps(value, default=str, ensure_ascii=False)
+    if kind in ("float", "int"):
+        try:
+            n = float(value)
+        except (TypeError, ValueError):
+            return None
+        if n != n:  # NaN
+            return None
+        return int(n) if kind == "int" else n
+    if kind == "list":
+        if isinstance(value, str):  # a list that went through a CSV round trip
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = [value]
+        return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+    if isinstance(value, float) and value != value:
+        return None
+    return str(value)
+
+
+def source_of(key) -> str:
+    """'adzuna:123' -> 'adzuna'; the part of a job id before the first colon."""
+    return str(key or "").split(":", 1)[0] or "unknown"
+
+
+def write_rows(root, table: str, rows, fetch_date: str | None = None) -> int:
+    """
+    Append `rows` (dicts) to `table` under `root`, partitioned by `fetch_date`
+    (default: today, UTC) and source. Returns the number of rows written.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    pa = _pyarrow()
+    fetch_date = fetch_date or datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+    cols, key = COLUMNS[table], KEYS[table]
+    data = {k: [_coerce(r.get(k), kind) for r in rows] for k, kind in cols.items()}
+    data["fetch_date"] = [fetch_date] * len(rows)
+    data["source"] = [source_of(r.get(key)) for r in rows]
+    pa.dataset.write_dataset(
+        pa.Table.from_pydict(data, schema=_schema(table)),
+        Path(root) / table,
+        format="parquet",
+        partitioning=_partitioning(),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    return len(rows)
+
+
+def read_table(root, table: str, columns=None, filters=None):
+    """
+    `table` as a pyarrow Table, reading only `columns` (default: all) and only
+    the files and row groups that can match `filters`: a pyarrow expression or
+    DNF tuples like [("fetch_date", ">=", "2024-05-01"), ("source", "=", "adzuna")].
+    """
+    pa = _pyarrow()
+    path = Path(root) / table
+    if not path.exists():
+        return _schema(table).empty_table().select(list(columns) if columns else _schema(table).names)
+    if filters is not None and not isinstance(filters, pa.dataset.Expression):
+        filters = pa.parquet.filters_to_expression(filters)
+    dataset = pa.dataset.dataset(path, schema=_schema(table), format="parquet", partitioning=_partitioning())
+    return dataset.to_table(columns=list(columns) if columns else None, filter=filters)
+
+
+def read_rows(root, table: str, columns=None, filters=None) -> list[dict]:
+    """Like `read_table`, as a list of dicts; JSON columns are decoded."""
+    rows = read_table(root, table, columns, filters).to_pylist()
+    for k, kind in COLUMNS[table].items():
+        if kind == "json":
+            for r in rows:
+                if r.get(k) is not None:
+                    r[k] = json.loads(r[k])
+    return rows
+
+
+def latest_fetch_date(root, table: str = "normalized") -> str | None:
+    dates = read_table(root, table, columns=["fetch_date"]).column("fetch_date").unique().to_pylist()
+    return max(dates) if dates else None
+
+
+def summary(root, table: str, filters=None) -> list[dict]:
+    """Row counts per fetch date and source; reads the partition columns only."""
+    t = read_table(root, table, columns=list(PARTITIONS), filters=filters)
+    counts = t.group_by(list(PARTITIONS)).aggregate([("source", "count")]).to_pylist()
+    rows = [{"fetch_date": c["fetch_date"], "source": c["source"], "rows": c["source_count"]} for c in counts]
+    return sorted(rows, key=lambda r: (r["fetch_date"], r["source"]))
+
+
+def cli(argv=None):
+    ap = argparse.ArgumentParser(description="Inspect the Parquet job datasets.")
+    ap.add_argument("table", choices=TABLES)
+    ap.add_argument("--root", default="data/parquet")
+    ap.add_argument("--since", default=None, help="first fetch date (YYYY-MM-DD)")
+    ap.add_argument("--source", default=None)
+    args = ap.parse_args(argv)
+    filters = [f for f in (("fetch_date", ">=", args.since), ("source", "=", args.source)) if f[2]]
+    rows = summary(args.root, args.table, filters or None)
+    for r in rows:
+        print(f"{r['fetch_date']}  {r['source']:<16} {r['rows']:>8}")
+    print(f"{sum(r['rows'] for r in rows)} rows in {len(rows)} partitions")
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,87 @@
+import re
+from src.rank_engine import estimate_tokens
+
+ENCODING = "o200k_base"  # tokenizer of the gpt-4o family
+
+# Sentences that cost tokens but never change a fit score: EEO/legal statements and benefits lists
+BOILERPLATE = re.compile(
+    r"equal (employment )?opportunity|affirmative action|e-verify|reasonable accommodation"
+    r"|without regard to|regardless of (race|age|gender|sex)|race, colou?r|protected veteran"
+    r"|veteran status|sexual orientation|gender identity|national origin"
+    r"|401\(?k\)?|paid time off|\bpto\b|medical, dental|health, dental|dental,? and vision"
+    r"|parental leave|employee assistance program|commuter benefit|wellness (stipend|program)"
+    r"|perks (and|&) benefits|benefits include|we offer competitive",
+    re.I,
+)
+MAX_BOILERPLATE_CHARS = 600  # longer segments likely carry real content too; keep them
+_SEGMENTS = re.compile(r"(?<=[.!?])\s+|\n+")
+_WS = re.compile(r"\s+")
+
+_enc = None
+
+
+def _encoder():
+    """tiktoken encoding, loaded once; None when tiktoken or its BPE file is unavailable."""
+    global _enc
+    if _enc is None:
+        try:
+            import tiktoken
+
+            _enc = tiktoken.get_encoding(ENCODING)
+        except Exception as e:
+            print(f"tiktoken unavailable ({type(e).__name__}); estimating ~4 chars/token")
+            _enc = False
+    return _enc or None
+
+
+def count_tokens(text: str) -> int:
+    enc = _encoder()
+    return len(enc.encode(text, disallowed_special=())) if enc else estimate_tokens(text)
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    enc = _encoder()
+    if enc is None:
+        return text[: budget * 4 - 1]  # estimate_tokens(result) <= budget
+    ids = enc.encode(text, disallowed_special=())
+    return text if len(ids) <= budget else enc.decode(ids[:budget])
+
+
+def compact(text: str, budget: int | None = None) -> str:
+    """
+    Drop boilerplate sentences (EEO, benefits) and repeated ones, then trim
+    to `budget` tokens (None leaves the length alone).
+    """
+    seen, kept = set(), []
+    for seg in _SEGMENTS.split(text or ""):
+        seg = _WS.sub(" ", seg).strip()
+        norm = seg.lower()
+        if not seg or norm in seen:
+            continue
+        seen.add(norm)
+        if len(seg) <= MAX_BOILERPLATE_CHARS and BOILERPLATE.search(seg):
+            continue
+        kept.append(seg)
+    out = " ".join(kept)
+    return truncate_tokens(out, budget) if budget else out
+
+
+class CompactionStats:
+    """Prompt tokens per job before and after compaction."""
+
+    def __init__(self):
+        self.jobs = self.before = self.after = 0
+
+    def add(self, before: int, after: int) -> None:
+        self.jobs += 1
+        self.before += before
+        self.after += after
+
+    def report(self) -> str:
+        if not self.jobs:
+            return "Prompt compaction: no jobs"
+        saved = 1 - self.after / self.before if self.before else 0.0
+        return (
+            f"Prompt compaction: {self.jobs} jobs, {self.before / self.jobs:.0f} -> "
+            f"{self.after / self.jobs:.0f} tokens/job ({saved:.0%} saved)"
+        )
@@ -0,0 +1,118 @@
+import threading, time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from src import http_client
+from src.enrich import fetch_and_cache, get_cached
+
+
+def fetch_robots(base: str) -> RobotFileParser | None:
+    """robots.txt for `base` (scheme://host); None means no restrictions are known."""
+    try:
+        r = http_client.get(base + "/robots.txt", timeout=5)
+    except Exception:
+        return None
+    rp = RobotFileParser()
+    if r.status_code in (401, 403):
+        rp.disallow_all = True
+    elif r.status_code == 200:
+        rp.parse(r.text.splitlines())
+    else:
+        return None
+    return rp
+
+
+class _Host:
+    def __init__(self, concurrency: int):
+        self.sem = threading.BoundedSemaphore(concurrency)
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+        self.robots: RobotFileParser | None = None
+        self.robots_loaded = False
+
+
+class Crawler:
+    """
+    Concurrent, polite page fetcher feeding the enrichment cache.
+
+    At most `max_workers` pages are fetched at once overall and `per_host` per
+    host, with request starts to one host spaced at least `host_delay` seconds
+    apart (or the host's robots.txt Crawl-delay, if larger). Disallowed URLs are
+    skipped. Nothing new starts after `budget_s` seconds; those URLs come back
+    as `[error: ...]` like any other failed fetch. Cached pages return at once.
+    """
+
+    def __init__(
+        self,
+        fetch=fetch_and_cache,
+        max_workers: int = 8,
+        per_host: int = 2,
+        host_delay: float = 1.0,
+        budget_s: float | None = 60.0,
+        respect_robots: bool = True,
+    ):
+        self.fetch = fetch
+        self.per_host = per_host
+        self.host_delay = host_delay
+        self.respect_robots = respect_robots
+        self.deadline = time.monotonic() + budget_s if budget_s else None
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="crawl")
+        self._hosts: dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, base: str) -> _Host:
+        with self._lock:
+            if base not in self._hosts:
+                self._hosts[base] = _Host(self.per_host)
+            return self._hosts[base]
+
+    def _over_budget(self) -> bool:
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def _robots(self, host: _Host, base: str) -> RobotFileParser | None:
+        with host.lock:
+            if not host.robots_loaded:
+                host.robots = fetch_robots(base)
+                host.robots_loaded = True
+            return host.robots
+
+    def _get(self, url: str) -> str:
+        if not url:
+            return "[error: no url]"
+        cached = get_cached(url)
+        if cached is not None:
+            return cached
+        parts = urlsplit(url)
+        base = f"{parts.scheme}://{parts.netloc}"
+        host = self._host(base)
+        with host.sem:
+            if self._over_budget():
+                return "[error: enrichment time budget exceeded]"
+            delay = self.host_delay
+            if self.respect_robots:
+                rp = self._robots(host, base)
+                if rp is not None:
+                    if not rp.can_fetch(http_client.USER_AGENT, url):
+                        return "[error: disallowed by robots.txt]"
+                    delay = max(delay, rp.crawl_delay(http_client.USER_AGENT) or 0)
+            with host.lock:
+                now = time.monotonic()
+                start = max(now, host.next_start)
+                host.next_start = start + delay
+            if start > now:
+                time.sleep(start - now)
+            if self._over_budget():
+                return "[error: enrichment time budget exceeded]"
+            return self.fetch(url, pause=0)
+
+    def submit(self, url: str) -> Future:
+        return self._pool.submit(self._get, url)
+
+    def crawl(self, urls: list[str]) -> dict[str, str]:
+        """Fetch every URL (de-duplicated) and return url -> text."""
+        futures = {u: self.submit(u) for u in dict.fromkeys(urls)}
+        return {u: f.result() for u, f in futures.items()}
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,105 @@
+import array, hashlib, sqlite3, threading, time
+from pathlib import Path
+from src import metrics
+
+
+def text_key(text: str, model: str = "") -> str:
+    """sha256 of the embedding model and the text; a vector is only reused for the same pair."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache in SQLite, keyed by a content hash of the text and
+    the model, with vectors stored as packed float64. `evict()` trims the table
+    to `max_entries` least-recently-used rows.
+    """
+
+    def __init__(self, path="data/embed_cache.sqlite", max_entries: int | None = 100_000):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS vectors (
+                key TEXT PRIMARY KEY,
+                vec BLOB NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS vectors_last_used ON vectors(last_used);
+            """
+        )
+        self.db.commit()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """The cached vectors among `keys`, as {key: vector}."""
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+                chunk = keys[i : i + 500]
+                rows = self.db.execute(
+                    f"SELECT key, vec FROM vectors WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((k, array.array("d", v).tolist()) for k, v in rows)
+            if found:
+                self.db.executemany(
+                    "UPDATE vectors SET last_used=? WHERE key=?", [(time.time(), k) for k in found]
+                )
+                self.db.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        metrics.inc("embed_cache_total", len(found), result="hit")
+        metrics.inc("embed_cache_total", len(keys) - len(found), result="miss")
+        return found
+
+    def put_many(self, items: dict[str, list[float]]) -> None:
+        now = time.time()
+        with self._lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO vectors VALUES (?, ?, ?)",
+                [(k, array.array("d", v).tobytes(), now) for k, v in items.items()],
+            )
+            self.db.commit()
+
+    def evict(self) -> int:
+        if not self.max_entries:
+            return 0
+        with self._lock:
+            removed = self.db.execute(
+                "DELETE FROM vectors WHERE key IN (SELECT key FROM vectors "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self.db.commit()
+        return removed
+
+    def close(self) -> None:
+        self.evict()
+        self.db.close()
+
+
+class CachedEmbeddings:
+    """
+    Wraps an embedder (`embed_documents`/`embed_query`) so documents already in
+    `cache` are not sent again; the misses go out in a single `embed_documents` call.
+    """
+
+    def __init__(self, embedder, cache: EmbeddingCache, model: str | None = None):
+        self.embedder, self.cache = embedder, cache
+        self.model = model if model is not None else str(getattr(embedder, "model", "") or "")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [text_key(t, self.model) for t in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+        missing = {k: t for k, t in zip(keys, texts) if k not in found}
+        if missing:
+            vecs = self.embedder.embed_documents(list(missing.values()))
+            new = dict(zip(missing, vecs))
+            self.cache.put_many(new)
+            found.update(new)
+        return [found[k] for k in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embedder.embed_query(text)
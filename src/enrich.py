@@ -1,23 +1,87 @@
-import time, json
+import time, threading
 from pathlib import Path
-from src.tools.fetch_url import fetch_url
+from src import metrics
+from src.fetch_cache import FetchCache, is_error
+from src.tools.fetch_url import fetch_page
 
-CACHE = Path("data/fetch_cache")
-CACHE.mkdir(parents=True, exist_ok=True)
+CACHE_PATH = Path("data/fetch_cache.sqlite")
+LEGACY_CACHE = Path("data/fetch_cache")  # one JSON file per URL, imported on first use
 
+MAX_AGE = 7 * 86400  # revalidate cached pages older than this
+ERROR_TTL = 15 * 60  # retry failed fetches after this
 
-def _cache_path(url: str) -> Path:
-    import hashlib
+_cache = None
+_lock = threading.Lock()
 
-    return CACHE / (hashlib.sha1(url.encode()).hexdigest() + ".json")
 
+def get_cache() -> FetchCache:
+    """Process-wide enrichment cache, opened (and legacy files imported) on first use."""
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                fresh = not CACHE_PATH.exists()
+                cache = FetchCache(CACHE_PATH, ttl=MAX_AGE, error_ttl=ERROR_TTL)
+                if fresh and LEGACY_CACHE.is_dir():
+                    n = cache.import_json_dir(LEGACY_CACHE)
+                    if n:
+                        print(f"Imported {n} pages from {LEGACY_CACHE} into {CACHE_PATH}")
+                _cache = cache
+    return _cache
 
-def fetch_and_cache(url: str) -> str:
-    """Fetch a page once and reuse cached text later."""
-    path = _cache_path(url)
-    if path.exists():
-        return json.loads(path.read_text()).get("text", "")
-    text = fetch_url(url)
-    path.write_text(json.dumps({"text": text}, ensure_ascii=False))
-    time.sleep(0.3)  # polite pause
-    return text
+
+def get_cached(url: str, max_age: float | None = MAX_AGE) -> str | None:
+    """Cached text for `url` if present and fresh, without touching the network."""
+    entry = get_cache().lookup(url, max_age)
+    return entry["text"] if entry and entry["fresh"] else None
+
+
+def fetch_and_cache(url: str, max_age: float | None = MAX_AGE, pause: float = 0.3) -> str:
+    """
+    Fetch a page once and reuse cached text later. Entries older than `max_age`
+    seconds are revalidated with a conditional GET, so unchanged pages cost a 304.
+    Failures are cached only briefly, and never replace a good (if stale) copy.
+    `pause` is a polite sleep after a real fetch; the crawler paces hosts itself and passes 0.
+    """
+    cache = get_cache()
+    entry = cache.lookup(url, max_age)
+    if entry and entry["fresh"]:
+        return entry["text"]
+    good = entry if entry and not entry["is_error"] else None
+
+    try:
+        with metrics.timer("fetch_seconds", source="enrich"):
+            page = fetch_page(url, *((good["etag"], good["last_modified"]) if good else ()))
+    except Exception as e:
+        print(f"Error fetching URL {url}: {e}")
+        page = {"status": None, "text": f"[error: {e}]", "etag": None, "last_modified": None}
+    if page["status"] == 304 and good:
+        cache.touch(url)
+        return good["text"]
+    if is_error(page["text"]) and good:
+        return good["text"]  # keep serving the stale copy
+    cache.put(url, page["text"], page["status"], page["etag"], page["last_modified"])
+    if pause:
+        time.sleep(pause)  # polite pause
+    return page["text"]
+
+
+def cli(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Enrichment page cache utilities.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="entries, sizes and compression savings")
+    ev = sub.add_parser("evict", help="trim the cache to a size")
+    ev.add_argument("--max-mb", type=float, required=True)
+    args = ap.parse_args(argv)
+
+    cache = get_cache()
+    if args.cmd == "evict":
+        print(f"Evicted {cache.evict(int(args.max_mb * 1024 * 1024))} pages")
+    for k, v in cache.stats().items():
+        print(f"{k}: {v}")
+
+
+if __name__ == "__main__":
+    cli()
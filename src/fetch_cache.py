@@ -0,0 +1,178 @@
+import hashlib, json, sqlite3, threading, time, zlib
+from pathlib import Path
+from src import metrics
+
+
+def url_key(url: str) -> str:
+    """sha1 of the URL; also the file name the old one-JSON-per-URL cache used."""
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def is_error(text: str | None) -> bool:
+    return text is None or text.startswith("[error")
+
+
+class FetchCache:
+    """
+    Enrichment page cache in a single SQLite file, with page text zlib-compressed.
+
+    Each entry keeps fetch time, HTTP status and ETag/Last-Modified validators.
+    Good pages are fresh for `ttl` seconds; failures are cached negatively for
+    only `error_ttl`, so a transient timeout is retried soon. When the stored
+    size passes `max_bytes`, least-recently-used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path="data/fetch_cache.sqlite",
+        ttl: float | None = 7 * 86400,
+        error_ttl: float = 15 * 60,
+        max_bytes: int | None = 200 * 1024 * 1024,
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl, self.error_ttl, self.max_bytes = ttl, error_ttl, max_bytes
+        self.hits = self.misses = self.bytes_served = 0
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                body BLOB,
+                status INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                raw_size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                is_error INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_last_used ON pages(last_used);
+            """
+        )
+        self._stored = self.db.execute("SELECT COALESCE(SUM(stored_size), 0) FROM pages").fetchone()[0]
+
+    def lookup(self, url: str, max_age: float | None = None) -> dict | None:
+        """
+        The cached entry for `url`, or None. `entry["fresh"]` says whether it is
+        within its TTL (`max_age` overrides the TTL for good pages). Only fresh
+        entries count as hits.
+        """
+        with self._lock:
+            row = self.db.execute(
+                "SELECT body, status, etag, last_modified, fetched_at, raw_size, is_error "
+                "FROM pages WHERE key=?",
+                (url_key(url),),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                metrics.inc("fetch_cache_total", result="miss")
+                return None
+            body, status, etag, last_modified, fetched_at, raw_size, err = row
+            ttl = self.error_ttl if err else (self.ttl if max_age is None else max_age)
+            fresh = ttl is None or time.time() - fetched_at < ttl
+            if fresh:
+                self.hits += 1
+                self.bytes_served += raw_size
+                self.db.execute(
+                    "UPDATE pages SET last_used=? WHERE key=?", (time.time(), url_key(url))
+                )
+                self.db.commit()
+            else:
+                self.misses += 1
+        metrics.inc("fetch_cache_total", result="hit" if fresh else "stale")
+        return {
+            "text": zlib.decompress(body).decode("utf-8") if body is not None else "",
+            "status": status,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": fetched_at,
+            "is_error": bool(err),
+            "fresh": fresh,
+        }
+
+    def put(self, url, text, status=None, etag=None, last_modified=None, key=None, fetched_at=None):
+        raw = (text or "").encode("utf-8")
+        body = zlib.compress(raw, 6)
+        now = time.time()
+        with self._lock:
+            old = self.db.execute(
+                "SELECT stored_size FROM pages WHERE key=?", (key or url_key(url),)
+            ).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key or url_key(url), url, body, status, etag, last_modified,
+                    fetched_at or now, now, len(raw), len(body), int(is_error(text)),
+                ),
+            )
+            self.db.commit()
+            self._stored += len(body) - (old[0] if old else 0)
+            if self.max_bytes and self._stored > self.max_bytes:
+                self._evict_locked(int(self.max_bytes * 0.9))
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as just revalidated (e.g. after a 304)."""
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                "UPDATE pages SET fetched_at=?, last_used=? WHERE key=?", (now, now, url_key(url))
+            )
+            self.db.commit()
+
+    def _evict_locked(self, target: int) -> int:
+        removed = 0
+        cur = self.db.execute("SELECT key, stored_size FROM pages ORDER BY last_used")
+        doomed = []
+        for key, size in cur:
+            if self._stored <= target:
+                break
+            doomed.append((key,))
+            self._stored -= size
+            removed += 1
+        self.db.executemany("DELETE FROM pages WHERE key=?", doomed)
+        self.db.commit()
+        return removed
+
+    def evict(self, target_bytes: int | None = None) -> int:
+        """Drop least-recently-used entries until the cache holds at most `target_bytes`."""
+        with self._lock:
+            return self._evict_locked(self.max_bytes if target_bytes is None else target_bytes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, raw, stored = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM pages"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "bytes_served": self.bytes_served,  # page text not re-downloaded thanks to hits
+            "bytes_stored": stored,
+            "bytes_saved_by_compression": raw - stored,
+        }
+
+    def import_json_dir(self, directory) -> int:
+        """Load the legacy one-JSON-file-per-URL cache (keyed by the same sha1)."""
+        n = 0
+        for path in Path(directory).glob("*.json"):
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            self.put(
+                None,
+                entry.get("text", ""),
+                etag=entry.get("etag"),
+                last_modified=entry.get("last_modified"),
+                key=path.stem,
+                fetched_at=entry.get("fetched_at") or path.stat().st_mtime,
+            )
+            n += 1
+        return n
+
+    def close(self) -> None:
+        self.db.close()
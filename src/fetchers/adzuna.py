@@ -1,10 +1,11 @@
 import os, time, requests
 from urllib.parse import urlencode
-from dotenv import load_dotenv
+from src import http_client, metrics
 
-load_dotenv()
-APP_ID = os.getenv("ADZUNA_APP_ID")
-APP_KEY = os.getenv("ADZUNA_APP_KEY")
+# Set here to override; otherwise read from ADZUNA_APP_ID / ADZUNA_APP_KEY at call time,
+# after the entry point has loaded .env
+APP_ID = None
+APP_KEY = None
 
 BASE = "https://api.adzuna.com/v1/api/jobs/us/search"
 
@@ -17,10 +18,15 @@ def _join_terms(v):
     return str(v)
 
 
+def _credentials() -> tuple:
+    return APP_ID or os.getenv("ADZUNA_APP_ID"), APP_KEY or os.getenv("ADZUNA_APP_KEY")
+
+
 def _url(page: int, query: dict, global_params: dict) -> str:
+    app_id, app_key = _credentials()
     q = {
-        "app_id": APP_ID,
-        "app_key": APP_KEY,
+        "app_id": app_id,
+        "app_key": app_key,
         "what": _join_terms(query.get("what", "")),
         "what_or": _join_terms(query.get("what_or", None)),
         "what_exclude": _join_terms(query.get("what_exclude", None)),
@@ -34,21 +40,30 @@ def _url(page: int, query: dict, global_params: dict) -> str:
     return f"{BASE}/{page}?{urlencode(q)}"
 
 
+def fetch_adzuna_page(page: int, query: dict, global_params: dict) -> list[dict]:
+    """Fetch a single Adzuna results page."""
+    assert all(_credentials()), "Missing ADZUNA creds in .env"
+    url = _url(page, query, global_params)
+    print(f"Fetching Adzuna page {page}: {url} \n")
+    with metrics.timer("fetch_seconds", source="adzuna"):
+        r = http_client.get(url, timeout=20)  # no content-type in query
+    metrics.inc("fetch_requests_total", source="adzuna", status=r.status_code)
+    try:
+        r.raise_for_status()
+    except requests.HTTPError:
+        print("URL:", r.url)
+        print("Body:", r.text[:1000])
+        raise
+    results = r.json().get("results", [])
+    metrics.inc("fetch_jobs_total", len(results), source="adzuna")
+    return results
+
+
 def fetch_adzuna(query: dict, global_params: dict, sleep_s: float = 0.2):
-    assert APP_ID and APP_KEY, "Missing ADZUNA creds in .env"
+    assert all(_credentials()), "Missing ADZUNA creds in .env"
     jobs, pages = [], global_params.get("pages", 1)
     for p in range(1, pages + 1):
-        url = _url(p, query, global_params)
-        print(f"Fetching Adzuna page {p}: {url} \n")
-        r = requests.get(url, timeout=20)  # no content-type in query
-        try:
-            r.raise_for_status()
-        except requests.HTTPError:
-            print("URL:", r.url)
-            print("Body:", r.text[:1000])
-            raise
-        payload = r.json()
-        results = payload.get("results", [])
+        results = fetch_adzuna_page(p, query, global_params)
         jobs.extend(results)
         if not results:
             break
@@ -1,17 +1,21 @@
-from jobspy import scrape_jobs
 import pandas as pd
+from src import metrics
 
 
-def fetch_jobspy(query: dict, global_params: dict) -> list[dict]:
+def scrape_jobs(**kwargs) -> pd.DataFrame:
+    """`jobspy.scrape_jobs`, imported on first use (the library is slow to import)."""
+    from jobspy import scrape_jobs as scrape
+
+    return scrape(**kwargs)
+
+
+def scrape_frame(query: dict, global_params: dict) -> pd.DataFrame:
     """
-    Fetch jobs using JobSpy (scrapes LinkedIn, Indeed, Glassdoor, ZipRecruiter).
+    Run JobSpy for one query and return its results DataFrame.
 
     Args:
         query: Dict with search_term, location, distance, site_name (optional)
         global_params: Dict with results_wanted, hours_old
-
-    Returns:
-        List of job dicts in JobSpy's raw format
     """
     site_names = query.get("site_name", ["indeed", "linkedin", "glassdoor", "zip_recruiter"])
     if isinstance(site_names, str):
@@ -33,20 +37,57 @@ def fetch_jobspy(query: dict, global_params: dict) -> list[dict]:
 
     print(f"Fetching JobSpy: '{search_term}' in '{location}' from {site_names}")
 
-    df = scrape_jobs(
-        site_name=site_names,
-        search_term=search_term,
-        location=location,
-        distance=distance,
-        results_wanted=results_wanted,
-        hours_old=hours_old,
-        country_indeed="USA",
-    )
+    with metrics.timer("fetch_seconds", source="jobspy"):
+        df = scrape_jobs(
+            site_name=site_names,
+            search_term=search_term,
+            location=location,
+            distance=distance,
+            results_wanted=results_wanted,
+            hours_old=hours_old,
+            country_indeed="USA",
+        )
+    metrics.inc("fetch_requests_total", source="jobspy", status="ok")
+    metrics.inc("fetch_jobs_total", len(df), source="jobspy")
+    print(f"Found {len(df)} jobs from JobSpy")
+    return df
+
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    """`df.to_dict(orient="records")`, built from whole columns (several times faster)."""
+    keys = list(df.columns)
+    return [dict(zip(keys, values)) for values in zip(*(df[k].tolist() for k in keys))]
+
+
+def iter_records(df: pd.DataFrame, chunk_size: int = 500):
+    """Yield rows of `df` as dicts, converting `chunk_size` rows at a time rather than all at once."""
+    if df is None or df.empty:
+        return
+    for start in range(0, len(df), chunk_size):
+        yield from _records(df.iloc[start : start + chunk_size])
+
+
+def iter_pairs(df: pd.DataFrame, chunk_size: int = 500):
+    """
+    Yield `(raw, normalized)` pairs for the rows of `df`. The whole frame is
+    normalized column-wise by `normalize_frame`; rows become dicts `chunk_size` at a time.
+    """
+    if df is None or df.empty:
+        return
+    normalized = normalize_frame(df)
+    for start in range(0, len(df), chunk_size):
+        end = start + chunk_size
+        yield from zip(_records(df.iloc[start:end]), _records(normalized.iloc[start:end]))
+
+
+def fetch_jobspy(query: dict, global_params: dict) -> list[dict]:
+    """
+    Fetch jobs using JobSpy (scrapes LinkedIn, Indeed, Glassdoor, ZipRecruiter).
 
-    # Convert DataFrame to list of dicts
-    jobs = df.to_dict(orient="records") if not df.empty else []
-    print(f"Found {len(jobs)} jobs from JobSpy")
-    return jobs
+    Returns:
+        List of job dicts in JobSpy's raw format
+    """
+    return list(iter_records(scrape_frame(query, global_params)))
 
 
 def normalize(job: dict) -> dict:
@@ -74,3 +115,37 @@ def normalize(job: dict) -> dict:
         "salary_max": clean(job.get("max_amount")),
         "description": (clean(job.get("description", "")) or "").replace("\n", " ").strip(),
     }
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    """`df[name]` as objects with NaN as None, or `default` everywhere when the column is missing."""
+    if name not in df:
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+    col = df[name].astype(object)
+    return col.where(col.notna(), None)
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Columnar `normalize`: the same schema and values for a whole JobSpy DataFrame
+    at once, one normalized row per input row.
+    """
+    job_url = _column(df, "job_url", "")
+    site = _column(df, "site", "jobspy")
+    job_id = _column(df, "id", "")
+    job_id = job_id.where(job_id.notna() & (job_id != ""), job_url)
+    description = _column(df, "description", "").fillna("").astype(str)
+    return pd.DataFrame(
+        {
+            "src_id": site.map(str) + ":" + job_id.map(str),  # str(None) like the f-string in normalize
+            "title": _column(df, "title", ""),
+            "company": _column(df, "company", ""),
+            "location": _column(df, "location", ""),
+            "created": _column(df, "date_posted", ""),
+            "redirect_url": job_url,
+            "salary_min": _column(df, "min_amount", None),
+            "salary_max": _column(df, "max_amount", None),
+            "description": description.str.replace("\n", " ", regex=False).str.strip(),
+        },
+        index=df.index,
+    )
@@ -0,0 +1,62 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = "jobs-agent/0.1 (+local)"
+DEFAULT_TIMEOUT = 20
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_lock = threading.Lock()
+
+
+def make_session(retries: int = 3, backoff: float = 0.5, pool_size: int = 16) -> requests.Session:
+    """
+    Session with keep-alive connection pooling, gzip, and exponential backoff on
+    connection errors and 429/5xx responses (honouring `Retry-After`).
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # hand the last response back instead of raising
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    s = requests.Session()
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+    return s
+
+
+def get_session() -> requests.Session:
+    """Process-wide shared session, created on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = make_session()
+    return _session
+
+
+def get(url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def conditional_get(
+    url: str,
+    etag: str | None = None,
+    last_modified: str | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    **kwargs,
+) -> requests.Response:
+    """GET with If-None-Match / If-Modified-Since; a 304 means the cached copy is still good."""
+    headers = dict(kwargs.pop("headers", None) or {})
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return get(url, timeout=timeout, headers=headers, **kwargs)
@@ -0,0 +1,203 @@
+"""
+Deterministic, LLM-free job scoring over normalized rows.
+
+Every feature is computed for the whole batch at once (NumPy/pandas); only
+tokenization loops over the rows. Scores land in the same RANK_SCHEMA columns
+as the LLM ranker, so the output can stand in for it or pre-rank for it.
+"""
+import math, re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from src.structured import LEVEL_ORDER
+
+LEVELS = list(LEVEL_ORDER)
+LEVEL_PATTERNS = {  # checked in this order; the first match wins
+    "staff": r"\b(?:staff|principal|distinguished|architect)\b",
+    "senior": r"\b(?:senior|sr\.?|lead|iii|iv)\b",
+    "junior": r"\b(?:junior|jr\.?|entry[- ]level|intern|new grad|graduate)\b|\b(?:engineer|developer) i\b",
+    "mid": r"\b(?:mid(?:-level)?|ii)\b",
+}
+WEIGHTS = {"keywords": 0.5, "level": 0.15, "location": 0.15, "salary": 0.1, "recency": 0.1}
+RECENCY_HALF_LIFE_DAYS = 14
+STOPWORDS = set(
+    """a an and are as at be by for from has have in is it its of on or our that the their this to we
+    will with you your years year experience work team role job using use including etc""".split()
+)
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def _keyword_scores(texts: list[str], profile_text: str):
+    """
+    IDF-weighted overlap of each job's terms with the profile's, scaled so the
+    best job in the batch is 1. Also returns each job's matched terms, best first.
+    """
+    profile_tf = Counter(tokenize(profile_text))
+    vocab = {t: i for i, t in enumerate(profile_tf)}
+    terms = np.array(list(profile_tf), dtype=object)
+    rows, cols = [], []
+    findall, keys = _TOKEN.findall, vocab.keys()
+    for j, text in enumerate(texts):
+        ids = [vocab[t] for t in keys & set(findall(text.lower()))]  # stopwords never reach `vocab`
+        rows.extend([j] * len(ids))
+        cols.extend(ids)
+    n, v = len(texts), len(vocab)
+    rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+    if not n or not v:
+        return np.zeros(n), [[] for _ in range(n)]
+    df = np.bincount(cols, minlength=v)
+    idf = np.log((1 + n) / (1 + df)) + 1
+    weight = idf * np.log1p(np.array(list(profile_tf.values()), dtype=float))
+    raw = np.bincount(rows, weights=weight[cols], minlength=n)
+    matched = np.bincount(rows, minlength=n)
+    sim = raw / np.sqrt(np.maximum(matched, 1)) / np.linalg.norm(weight)
+    top = sim.max()
+    # matched terms per job, most informative first (rows are already grouped by job)
+    order = np.lexsort((-weight[cols], rows))
+    bounds = np.searchsorted(rows[order], np.arange(n + 1))
+    matches = [list(terms[cols[order[bounds[j] : bounds[j + 1]]]]) for j in range(n)]
+    return (sim / top if top > 0 else sim), matches
+
+
+def _levels(titles: pd.Series) -> pd.Series:
+    level = pd.Series("unknown", index=titles.index)
+    lowered = titles.fillna("").str.lower()
+    for name in reversed(list(LEVEL_PATTERNS)):  # earlier patterns overwrite later ones
+        level[lowered.str.contains(LEVEL_PATTERNS[name], regex=True)] = name
+    return level
+
+
+def _level_fit(level: pd.Series, wanted) -> np.ndarray:
+    if not wanted:
+        return np.full(len(level), 0.5)
+    rank = level.map({l: i for i, l in enumerate(LEVELS)}).to_numpy(dtype=float)
+    wanted_rank = np.array([LEVELS.index(w) for w in wanted], dtype=float)
+    gap = np.abs(rank[:, None] - wanted_rank[None, :]).min(axis=1)
+    fit = np.where(gap == 0, 1.0, np.where(gap == 1, 0.5, 0.0))
+    return np.where(np.isnan(rank), 0.5, fit)
+
+
+def _location_fit(locations: pd.Series, titles: pd.Series, wanted, remote: bool):
+    """1 / 0.5 / 0 for perfect / ok / poor. Without preferences every job is 'ok'."""
+    if not wanted and not remote:
+        return np.full(len(locations), 0.5), np.full(len(locations), "ok", dtype=object)
+    loc = locations.fillna("").str.lower()
+    hit = np.zeros(len(loc), dtype=bool)
+    for w in wanted or []:
+        hit |= loc.str.contains(w.lower(), regex=False).to_numpy()
+    if remote:
+        hit |= (loc + " " + titles.fillna("").str.lower()).str.contains("remote", regex=False).to_numpy()
+    return np.where(hit, 1.0, 0.0), np.where(hit, "perfect", "poor").astype(object)
+
+
+def _salary_fit(df: pd.DataFrame, min_salary) -> np.ndarray:
+    """Share of `min_salary` the posting offers (capped at 1); 0.5 when unknown."""
+    if not min_salary:
+        return np.full(len(df), 0.5)
+    offered = pd.Series(np.nan, index=df.index)
+    for col in ("salary_max", "salary_min"):  # prefer the top of the range
+        if col in df:
+            offered = offered.fillna(pd.to_numeric(df[col], errors="coerce"))
+    fit = np.clip(offered.to_numpy(dtype=float) / float(min_salary), 0.0, 1.0)
+    return np.where(np.isnan(fit), 0.5, fit)
+
+
+def _age_days(created: pd.Series, now) -> np.ndarray:
+    ts = pd.to_datetime(created, errors="coerce", utc=True, format="mixed")
+    now = pd.Timestamp(now or pd.Timestamp.now(tz="UTC"))
+    now = now.tz_localize("UTC") if now.tzinfo is None else now
+    return ((now - ts).dt.total_seconds() / 86400).to_numpy(dtype=float)
+
+
+def local_scores(
+    rows: list[dict],
+    profile_text: str,
+    levels=None,
+    locations=None,
+    remote: bool = False,
+    min_salary: float | None = None,
+    weights: dict | None = None,
+    now=None,
+) -> list[dict]:
+    """
+    Score `rows` against the profile with no model calls, returning RANK_SCHEMA rows
+    in input order. `levels`, `locations`/`remote` and `min_salary` are the
+    candidate's preferences; a feature without a preference counts as neutral.
+    """
+    if not rows:
+        return []
+    w = {**WEIGHTS, **(weights or {})}
+    df = pd.DataFrame(rows)
+    for col in ("title", "company", "location", "description", "created", "redirect_url"):
+        if col not in df:
+            df[col] = ""
+    titles = df["title"].fillna("").astype(str)
+    texts = (titles + " " + titles + " " + df["description"].fillna("").astype(str)).tolist()
+
+    kw, matches = _keyword_scores(texts, profile_text)
+    level = _levels(titles)
+    level_name = level.to_numpy()
+    level_fit = _level_fit(level, levels)
+    loc_fit, loc_label = _location_fit(df["location"].fillna("").astype(str), titles, locations, remote)
+    salary_fit = _salary_fit(df, min_salary)
+    age = _age_days(df["created"], now)
+    recency = np.where(np.isnan(age), 0.5, np.exp2(-np.clip(age, 0, None) / RECENCY_HALF_LIFE_DAYS))
+
+    total = sum(w.values())
+    score = 100 * (
+        w["keywords"] * kw + w["level"] * level_fit + w["location"] * loc_fit
+        + w["salary"] * salary_fit + w["recency"] * recency
+    ) / total
+    score = np.rint(score).astype(int)
+
+    out = []
+    for i, r in enumerate(rows):
+        concerns = []
+        if level_fit[i] == 0:
+            concerns.append(f"level looks {level_name[i]}")
+        if loc_fit[i] == 0:
+            concerns.append("location outside preferences")
+        if min_salary and salary_fit[i] < 0.9:
+            concerns.append("salary below target")
+        if not math.isnan(age[i]) and age[i] > 30:
+            concerns.append(f"posted {age[i]:.0f} days ago")
+        posted = "" if math.isnan(age[i]) else f", posted {max(age[i], 0):.0f}d ago"
+        out.append(
+            {
+                "id": r.get("id"),
+                "external_id": r.get("src_id") or r.get("external_id"),
+                "description": r.get("description", ""),
+                "redirect_url": r.get("redirect_url", ""),
+                "company": r.get("company", ""),
+                "title": r.get("title", ""),
+                "location": r.get("location", ""),
+                "score": int(score[i]),
+                "why": f"keyword match {kw[i]:.2f}, level {level_name[i]}, location {loc_label[i]}{posted}"[:280],
+                "level_fit": level_name[i],
+                "tech_fit": matches[i][:8],
+                "location_fit": loc_label[i],
+                "relevance_tags": [],
+                "summary": f"{r.get('title', '')} at {r.get('company', '')} ({r.get('location', '')})",
+                "concerns": concerns,
+            }
+        )
+    return out
+
+
+def local_prefilter(rows: list[dict], profile_text: str, top_n: int, **prefs) -> tuple[list[dict], np.ndarray]:
+    """
+    Keep the `top_n` rows with the best local score, in their original order,
+    like `prefilter.prefilter`. Returns the kept rows and every input row's score.
+    """
+    scores = np.array([s["score"] for s in local_scores(rows, profile_text, **prefs)], dtype=float)
+    if len(rows) <= top_n:
+        return rows, scores
+    keep = np.zeros(len(rows), dtype=bool)
+    keep[np.argsort(-scores, kind="stable")[:top_n]] = True
+    return [r for r, k in zip(rows, keep) if k], scores
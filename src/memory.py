@@ -1,27 +1,85 @@
+import threading
+from functools import lru_cache
 from pathlib import Path
-from langchain_openai import OpenAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
-from dotenv import load_dotenv
-load_dotenv()
+
+from src.embed_cache import text_key
 
 '''
 to build the profile index, run:
 
-python -c "import sys; sys.path.insert(0,'.'); from src.memory import build_profile_index; build_profile_index()"
+python -m src index
+
+Each chunk is stored under a hash of its text, so re-indexing only embeds the
+chunks that changed and deletes the ones that are gone; vectors are also kept
+in data/embed_cache.sqlite, so a chunk that comes back is not embedded again.
 
 '''
 
-def build_profile_index(store_dir="data/chroma"):
-    text = Path("data/profile.md").read_text(encoding="utf-8")
-    splits = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100).split_text(text)
-    vec = Chroma(collection_name="profile", persist_directory=store_dir,
-                 embedding_function=OpenAIEmbeddings())
-    vec.delete_collection(); vec = Chroma(collection_name="profile", persist_directory=store_dir,
-                                          embedding_function=OpenAIEmbeddings())
-    vec.add_texts(splits)
+EMBED_CACHE_PATH = "data/embed_cache.sqlite"
+_stores, _stores_lock = {}, threading.Lock()
+
+@lru_cache(maxsize=None)
+def _embeddings():
+    # langchain/OpenAI are slow to import; only pay for them when the index is used
+    from dotenv import load_dotenv
+    from langchain_openai import OpenAIEmbeddings
+    from src.embed_cache import CachedEmbeddings, EmbeddingCache
+
+    load_dotenv()
+    return CachedEmbeddings(OpenAIEmbeddings(), EmbeddingCache(EMBED_CACHE_PATH))
+
+def _chroma(store_dir):
+    """One Chroma handle per store directory, shared by everything in the process."""
+    with _stores_lock:
+        if store_dir not in _stores:
+            from langchain_chroma import Chroma
+
+            _stores[store_dir] = Chroma(
+                collection_name="profile", persist_directory=store_dir, embedding_function=_embeddings()
+            )
+        return _stores[store_dir]
+
+def reset():
+    """Drop the shared handles (tests, or after the store directory was removed)."""
+    with _stores_lock:
+        _stores.clear()
+    _embeddings.cache_clear()
+
+def load_profile_chunks(profile_path="data/profile.md"):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    text = Path(profile_path).read_text(encoding="utf-8")
+    return RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100).split_text(text)
+
+def build_profile_index(store_dir="data/chroma", profile_path="data/profile.md"):
+    """Bring the index in line with the profile: embed new chunks, delete stale ones."""
+    vec = _chroma(store_dir)
+    model = getattr(vec.embeddings, "model", "")
+    chunks = {text_key(t, model): t for t in load_profile_chunks(profile_path)}
+    existing = set(vec.get(include=[])["ids"])
+    stale = sorted(existing - chunks.keys())
+    new = {i: t for i, t in chunks.items() if i not in existing}
+    if stale:
+        vec.delete(ids=stale)
+    if new:
+        vec.add_texts(list(new.values()), ids=list(new))
+    print(f"Profile index: {len(new)} added, {len(stale)} removed, {len(chunks) - len(new)} unchanged")
     return vec
 
 def get_retriever(store_dir="data/chroma"):
-    return Chroma(collection_name="profile", persist_directory=store_dir,
-                  embedding_function=OpenAIEmbeddings()).as_retriever(k=4)
\ No newline at end of file
+    return _chroma(store_dir).as_retriever(k=4)
+
+def profile_embeddings(store_dir="data/chroma"):
+    """The stored chunk vectors, read through the shared handle."""
+    got = _chroma(store_dir).get(include=["embeddings"])["embeddings"]
+    return [] if got is None else got
+
+def cli(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Update the profile vector index from data/profile.md.")
+    ap.add_argument("--store-dir", default="data/chroma")
+    ap.add_argument("--profile", default="data/profile.md")
+    args = ap.parse_args(argv)
+    build_profile_index(store_dir=args.store_dir, profile_path=args.profile)
+    print(f"Indexed {args.profile} into {args.store_dir}")
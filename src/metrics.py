@@ -0,0 +1,199 @@
+"""
+Process-wide counters, histograms and timers for the fetch and rank pipeline.
+
+    from src import metrics
+    metrics.inc("llm_requests_total", model="gpt-4o-mini")
+    with metrics.timer("stage_seconds", stage="rank"):
+        ...
+    print(metrics.summary())
+
+Updates are a dict lookup and a few additions under one lock, cheap enough to leave on.
+Export with `to_json()` / `to_prometheus()` or `write(path)` (.json or .prom).
+"""
+import bisect, functools, inspect, json, math, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Upper bounds in seconds; suits everything from a cache lookup to a slow LLM call
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate from the buckets by linear interpolation (what Prometheus does)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(max(lo + (hi - lo) * (rank - seen) / n, self.min), self.max)
+            seen += n
+        return self.max
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[tuple, float] = {}
+        self.histograms: dict[tuple, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = Histogram()
+            h.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator timing every call of a sync or async function."""
+
+        def wrap(fn):
+            if inspect.iscoroutinefunction(fn):
+
+                @functools.wraps(fn)
+                async def run_async(*a, **kw):
+                    with self.timer(name, **labels):
+                        return await fn(*a, **kw)
+
+                return run_async
+
+            @functools.wraps(fn)
+            def run(*a, **kw):
+                with self.timer(name, **labels):
+                    return fn(*a, **kw)
+
+            return run
+
+        return wrap
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = [
+                {"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())
+            ]
+            histograms = [
+                {
+                    "name": n,
+                    "labels": dict(l),
+                    "count": h.count,
+                    "sum": h.sum,
+                    "max": h.max,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "buckets": dict(zip([*map(str, h.buckets), "+Inf"], h.counts)),
+                }
+                for (n, l), h in sorted(self.histograms.items())
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format."""
+
+        def fmt(labels, extra=()):
+            items = [*labels.items(), *extra]
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        snap, lines, typed = self.snapshot(), [], set()
+        for c in snap["counters"]:
+            if c["name"] not in typed:
+                lines.append(f"# TYPE {c['name']} counter")
+                typed.add(c["name"])
+            lines.append(f"{c['name']}{fmt(c['labels'])} {c['value']:g}")
+        for h in snap["histograms"]:
+            if h["name"] not in typed:
+                lines.append(f"# TYPE {h['name']} histogram")
+                typed.add(h["name"])
+            cumulative = 0
+            for le, n in h["buckets"].items():
+                cumulative += n
+                lines.append(f"{h['name']}_bucket{fmt(h['labels'], [('le', le)])} {cumulative}")
+            lines.append(f"{h['name']}_sum{fmt(h['labels'])} {h['sum']:g}")
+            lines.append(f"{h['name']}_count{fmt(h['labels'])} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """End-of-run table: timings (count, total, mean, p50, p95, max) then counters."""
+        snap = self.snapshot()
+
+        def label(m):
+            tags = ",".join(f"{k}={v}" for k, v in m["labels"].items())
+            return f"{m['name']}{{{tags}}}" if tags else m["name"]
+
+        rows = [(label(h), h) for h in snap["histograms"]]
+        width = max([len(r[0]) for r in rows] + [len(label(c)) for c in snap["counters"]] + [6])
+        out = []
+        if rows:
+            out.append(f"{'timing':<{width}} {'count':>7} {'total':>9} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8}")
+            for name, h in rows:
+                mean = h["sum"] / h["count"] if h["count"] else math.nan
+                out.append(
+                    f"{name:<{width}} {h['count']:>7} {h['sum']:>9.3f} {mean:>8.3f} "
+                    f"{h['p50']:>8.3f} {h['p95']:>8.3f} {h['max']:>8.3f}"
+                )
+        if snap["counters"]:
+            out.append(f"{'counter':<{width}} {'value':>7}")
+            out.extend(f"{label(c):<{width}} {c['value']:>7g}" for c in snap["counters"])
+        return "\n".join(out)
+
+    def write(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_prometheus() if path.suffix == ".prom" else self.to_json(), encoding="utf-8")
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+reset = REGISTRY.reset
+snapshot = REGISTRY.snapshot
+to_json = REGISTRY.to_json
+to_prometheus = REGISTRY.to_prometheus
+summary = REGISTRY.summary
+write = REGISTRY.write
@@ -0,0 +1,158 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src import metrics
+from src.fetchers import adzuna, jobspy
+from src.ratelimit import RateLimiter
+
+# Used when configs/sources.yaml has no `fetch:` section for a source.
+DEFAULT_LIMITS = {
+    "adzuna": {"concurrency": 4, "rpm": 25, "max_failures": 3},
+    "jobspy": {"concurrency": 2, "rpm": None, "max_failures": 3},
+}
+
+
+class SourceBudget:
+    """
+    Per-source concurrency cap, request rate limit and failure budget.
+    Once a source has failed `max_failures` times its remaining calls are skipped,
+    so one broken source cannot take the whole run down.
+    """
+
+    def __init__(self, name: str, concurrency: int = 1, rpm: float | None = None, max_failures: int = 3):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_failures = max_failures
+        self.failures = 0
+        self._sem = threading.BoundedSemaphore(self.concurrency)
+        self._limiter = RateLimiter(rpm=rpm)
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self) -> bool:
+        return self.failures >= self.max_failures
+
+    def call(self, fn, *args, **kwargs):
+        """Run `fn` within this source's limits; returns None if it failed or was skipped."""
+        if self.exhausted:
+            return None
+        with self._sem:
+            self._limiter.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    n = self.failures
+                metrics.inc("fetch_failures_total", source=self.name)
+                print(f"[{self.name}] request failed ({n}/{self.max_failures}): {e}")
+                if n == self.max_failures:
+                    print(f"[{self.name}] failure budget exhausted, skipping its remaining requests")
+                return None
+
+
+def _fetch_adzuna_query(q, global_params, budget: SourceBudget, pool, emit, unit: str, done=frozenset()):
+    """
+    Fetch Adzuna pages a window at a time, stopping at the first empty or short page.
+    Each page is emitted as unit `<unit>:p<n>` in page order; reaching the last page
+    emits `<unit>:end`. Units listed in `done` are not fetched again.
+    """
+    if f"{unit}:end" in done:
+        return
+    pages = global_params.get("pages", 1)
+    per_page = global_params.get("results_per_page", 50)
+    window = budget.concurrency
+    page = 1
+    while page <= pages and not budget.exhausted:
+        batch = range(page, min(page + window, pages + 1))
+        futures = {
+            p: pool.submit(budget.call, adzuna.fetch_adzuna_page, p, q, global_params)
+            for p in batch
+            if f"{unit}:p{p}" not in done
+        }
+        stop = False
+        for p in batch:
+            if stop:
+                futures[p].cancel()  # pages past the end are normally empty; ignore them
+                continue
+            if p not in futures:
+                continue  # completed (and full) in an interrupted earlier run
+            results = futures[p].result()
+            if results is None:
+                stop = True  # failed; left unmarked so a resumed run retries it
+                continue
+            emit(f"{unit}:p{p}", [(r, adzuna.normalize(r)) for r in results])
+            if len(results) < per_page:
+                emit(f"{unit}:end", [])
+                stop = True
+        if stop:
+            break
+        page += window
+
+
+def _fetch_jobspy_query(q, global_params, budget: SourceBudget, emit, unit: str, done=frozenset()):
+    if unit in done:
+        return
+    df = budget.call(jobspy.scrape_frame, query=q, global_params=global_params)
+    if df is not None:
+        emit(unit, jobspy.iter_pairs(df))  # normalized column-wise, per chunk
+
+
+def _run_queries(queries, global_params, fetch_cfg, emit, done=frozenset()):
+    """Run every query on a thread pool, handing each finished unit of work to `emit`."""
+    fetch_cfg = fetch_cfg or {}
+    source_cfg = fetch_cfg.get("sources", {})
+    budgets = {
+        name: SourceBudget(name, **{**DEFAULT_LIMITS[name], **(source_cfg.get(name) or {})})
+        for name in DEFAULT_LIMITS
+    }
+    adzuna_pool = ThreadPoolExecutor(budgets["adzuna"].concurrency, thread_name_prefix="adzuna")
+
+    def run(item):
+        i, q = item
+        source = q.get("source", "adzuna")
+        if source == "adzuna":
+            _fetch_adzuna_query(q, global_params, budgets["adzuna"], adzuna_pool, emit, f"q{i}", done)
+        elif source == "jobspy":
+            _fetch_jobspy_query(q, global_params, budgets["jobspy"], emit, f"q{i}", done)
+        else:
+            print(f"Unknown source: {source}, skipping")
+
+    try:
+        with ThreadPoolExecutor(fetch_cfg.get("max_parallel_queries", 4), thread_name_prefix="query") as ex:
+            list(ex.map(run, enumerate(queries)))
+    finally:
+        adzuna_pool.shutdown()
+
+    for b in budgets.values():
+        if b.failures:
+            print(f"[{b.name}] {b.failures} failed request(s)")
+
+
+def fetch_all(queries: list[dict], global_params: dict, fetch_cfg: dict | None = None) -> list[tuple]:
+    """
+    Run every configured query concurrently and return `(raw, normalized)` pairs
+    in config order (pages in page order), exactly as a sequential run would.
+    """
+    per_query: dict[str, list] = {}
+
+    def collect(unit, pairs):
+        per_query.setdefault(unit.split(":")[0], []).extend(pairs)
+
+    _run_queries(queries, global_params, fetch_cfg, collect)
+    return [pair for i in range(len(queries)) for pair in per_query.get(f"q{i}", [])]
+
+
+def stream_all(queries: list[dict], global_params: dict, fetch_cfg: dict | None, sink, done=frozenset()):
+    """
+    Like `fetch_all`, but hands each finished unit (a jobspy query or an Adzuna
+    page) to `sink(unit_id, pairs)` as soon as it completes, in completion order,
+    where `pairs` yields `(raw, normalized)` records. Calls to `sink` are serialized. Units in `done` are skipped.
+    """
+    lock = threading.Lock()
+
+    def emit(unit, pairs):
+        with lock:
+            sink(unit, pairs)
+
+    _run_queries(queries, global_params, fetch_cfg, emit, frozenset(done))
@@ -0,0 +1,235 @@
+"""
+Stage scheduler for the whole pipeline:
+
+    python -m src run [--watch 3600] [--force [STAGE ...]] [--dry-run] [rank options...]
+
+Stages form a DAG: `index` (profile.md -> Chroma) and `fetch` (sources.yaml ->
+jobs.csv) are independent and run in parallel; `rank` (jobs.csv + profile ->
+ranked CSVs, including the enrich + rerank cascade of the top K) waits for both.
+
+Each stage fingerprints its inputs. A stage whose fingerprint matches its last
+successful run, whose outputs still exist and which is not older than its
+`max_age` is skipped. State lives in data/pipeline_state.json.
+"""
+import argparse, csv, hashlib, json, os, threading, time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from src import metrics
+
+STATE_PATH = Path("data/pipeline_state.json")
+PROFILE_PATH = Path("data/profile.md")
+JOBS_CSV = Path("data/jobs.csv")
+FETCH_EVERY = 3600  # seconds before a fetch with an unchanged config is repeated
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], object]
+    fingerprint: Callable[[], str]
+    deps: tuple = ()
+    outputs: tuple = ()
+    max_age: float | None = None  # rerun after this many seconds even if the inputs are unchanged
+
+
+def file_hash(path) -> str:
+    path = Path(path)
+    return hashlib.sha1(path.read_bytes()).hexdigest() if path.exists() else "missing"
+
+
+def jobs_hash(path) -> str:
+    """Hash of the set of jobs in a jobs CSV (ids and content), independent of row order."""
+    from src.store import content_hash
+
+    path = Path(path)
+    if not path.exists():
+        return "missing"
+    with open(path, encoding="utf-8") as f:
+        keys = sorted(f"{r.get('src_id')}:{content_hash(r)}" for r in csv.DictReader(f))
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()
+
+
+def combine(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+class Pipeline:
+    def __init__(self, stages: list[Stage], state_path=STATE_PATH, max_workers: int = 4):
+        self.stages = {s.name: s for s in stages}
+        for s in stages:
+            missing = [d for d in s.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"stage {s.name} depends on unknown {missing}")
+        self._check_acyclic()
+        self.state_path = Path(state_path)
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+
+    def _check_acyclic(self):
+        seen, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in seen:
+                raise ValueError(f"dependency cycle through {name}")
+            seen.add(name)
+            for d in self.stages[name].deps:
+                visit(d)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def load_state(self) -> dict:
+        if not self.state_path.exists():
+            return {}
+        try:
+            return json.loads(self.state_path.read_text())
+        except ValueError:
+            return {}
+
+    def _record(self, name: str, fingerprint: str) -> None:
+        with self._lock:
+            state = self.load_state()
+            state[name] = {"fingerprint": fingerprint, "finished": time.time()}
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, indent=2))
+            os.replace(tmp, self.state_path)
+
+    def up_to_date(self, stage: Stage, fingerprint: str) -> bool:
+        last = self.load_state().get(stage.name)
+        if not last or last["fingerprint"] != fingerprint:
+            return False
+        if not all(Path(p).exists() for p in stage.outputs):
+            return False
+        return stage.max_age is None or time.time() - last["finished"] < stage.max_age
+
+    def _execute(self, stage: Stage, force: bool, dry_run: bool) -> str:
+        fingerprint = stage.fingerprint()
+        if not force and self.up_to_date(stage, fingerprint):
+            print(f"[{stage.name}] up to date, skipping")
+            return "skipped"
+        if dry_run:
+            print(f"[{stage.name}] would run")
+            return "stale"
+        print(f"[{stage.name}] running")
+        try:
+            with metrics.timer("pipeline_stage_seconds", stage=stage.name):
+                stage.run()
+        except (Exception, SystemExit) as e:  # a CLI stage exits on bad arguments
+            print(f"[{stage.name}] failed: {e!r}")
+            metrics.inc("pipeline_stages_total", stage=stage.name, status="failed")
+            return "failed"
+        self._record(stage.name, fingerprint)
+        metrics.inc("pipeline_stages_total", stage=stage.name, status="ran")
+        return "ran"
+
+    def run(self, force=(), dry_run: bool = False) -> dict[str, str]:
+        """
+        Run every stage that is out of date (or named in `force`), each as soon
+        as its dependencies are done, independent ones in parallel. Returns
+        {stage: "ran" | "skipped" | "failed" | "blocked" | "stale"}; "blocked" means
+        a dependency failed, "stale" is a dry run's "would run".
+        """
+        results: dict[str, str] = {}
+        pending = list(self.stages)
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="stage") as ex:
+            running = {}
+            while pending or running:
+                for name in list(pending):
+                    deps = self.stages[name].deps
+                    if any(results.get(d) in ("failed", "blocked") for d in deps):
+                        print(f"[{name}] blocked by a failed dependency")
+                        results[name] = "blocked"
+                        pending.remove(name)
+                    elif all(d in results for d in deps):
+                        running[ex.submit(self._execute, self.stages[name], name in force, dry_run)] = name
+                        pending.remove(name)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for f in done:
+                    results[running.pop(f)] = f.result()
+        return {name: results[name] for name in self.stages}
+
+
+def build_pipeline(
+    rank_args=(), fetch_every: float | None = FETCH_EVERY, state_path=STATE_PATH, config_path=None
+) -> Pipeline:
+    """The index -> fetch -> rank pipeline; `rank_args` are `python -m src rank` options."""
+    from src.run_fetch import CONFIG_PATH
+
+    config_path = Path(config_path or CONFIG_PATH)
+    rank_args = list(rank_args)
+
+    def index():
+        from src.memory import build_profile_index
+
+        build_profile_index()
+
+    def fetch():
+        from src.run_fetch import load_config, main
+
+        main(config=load_config(config_path))
+
+    def rank():
+        from src.rank_llm import cli
+
+        cli(rank_args)
+
+    return Pipeline(
+        [
+            Stage("index", index, lambda: file_hash(PROFILE_PATH), outputs=("data/chroma",)),
+            Stage("fetch", fetch, lambda: file_hash(config_path), outputs=(JOBS_CSV,), max_age=fetch_every),
+            Stage(
+                "rank",
+                rank,
+                lambda: combine(jobs_hash(JOBS_CSV), file_hash(PROFILE_PATH), rank_args),
+                deps=("index", "fetch"),
+                outputs=("data/jobs_ranked.csv", "data/jobs_top_k.csv"),
+            ),
+        ],
+        state_path=state_path,
+    )
+
+
+def cli(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Run the pipeline stages that are out of date; other options are passed to `rank`."
+    )
+    ap.add_argument("--watch", type=float, default=None, metavar="SECONDS", help="run again every SECONDS")
+    ap.add_argument(
+        "--fetch-every", type=float, default=None, metavar="SECONDS",
+        help=f"refetch after this long even if sources.yaml is unchanged (default {FETCH_EVERY}, or --watch)",
+    )
+    ap.add_argument("--force", nargs="*", default=None, metavar="STAGE", help="run these stages (default: all)")
+    ap.add_argument("--dry-run", action="store_true", help="only report which stages would run")
+    ap.add_argument("--config", default=None, help="sources config (default: configs/sources.yaml)")
+    ap.add_argument("--state", default=STATE_PATH, help="where stage fingerprints are kept")
+    args, rank_args = ap.parse_known_args(argv)
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    fetch_every = args.fetch_every or args.watch or FETCH_EVERY
+    pipeline = build_pipeline(rank_args, fetch_every, args.state, args.config)
+    force = set(pipeline.stages) if args.force == [] else set(args.force or ())
+    unknown = force - set(pipeline.stages)
+    if unknown:
+        ap.error(f"unknown stage(s) {sorted(unknown)}; choose from {list(pipeline.stages)}")
+    while True:
+        results = pipeline.run(force=force, dry_run=args.dry_run)
+        print("Pipeline: " + ", ".join(f"{k} {v}" for k, v in results.items()))
+        if args.watch is None or args.dry_run:
+            return 1 if "failed" in results.values() else 0
+        force = set()  # --force applies to the first pass only
+        print(f"Next run in {args.watch:g}s (Ctrl-C to stop)")
+        try:
+            time.sleep(args.watch)
+        except KeyboardInterrupt:
+            print("Stopped")
+            return 0
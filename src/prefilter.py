@@ -0,0 +1,93 @@
+import re, zlib
+import numpy as np
+
+
+class HashingEmbedder:
+    """
+    Deterministic bag-of-words embedder (feature hashing of unigrams and bigrams).
+    No network or model download, so it suits offline runs and tests. Exposes the
+    same `embed_documents`/`embed_query` interface as LangChain embeddings.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _vector(self, text: str) -> np.ndarray:
+        v = np.zeros(self.dim, dtype=np.float32)
+        words = re.findall(r"[a-z0-9+#.]+", (text or "").lower())
+        for tok in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = zlib.crc32(tok.encode())
+            v[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return v
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._vector(t).tolist() for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vector(text).tolist()
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    m = np.asarray(m, dtype=np.float32)
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.where(norms == 0, 1, norms)
+
+
+def job_text(r: dict, max_chars: int = 2000) -> str:
+    return f"{r.get('title', '')}\n{(r.get('description') or '')[:max_chars]}"
+
+
+def embed_jobs(rows: list[dict], embedder, batch_size: int = 256) -> np.ndarray:
+    """Embed job title + description in batches of `batch_size` texts per call."""
+    out = []
+    for i in range(0, len(rows), batch_size):
+        out.extend(embedder.embed_documents([job_text(r) for r in rows[i : i + batch_size]]))
+    return np.asarray(out, dtype=np.float32)
+
+
+def profile_vectors(store_dir="data/chroma") -> np.ndarray:
+    """Profile chunk vectors already stored in the Chroma `profile` collection."""
+    from src.memory import profile_embeddings
+
+    return np.asarray(profile_embeddings(store_dir), dtype=np.float32)
+
+
+def embed_profile(embedder, profile_path="data/profile.md") -> np.ndarray:
+    """Profile chunk vectors computed with `embedder` (for backends other than the index's)."""
+    from src.memory import load_profile_chunks
+
+    return np.asarray(embedder.embed_documents(load_profile_chunks(profile_path)), dtype=np.float32)
+
+
+def similarity(job_vecs: np.ndarray, profile_vecs: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each job to its closest profile chunk."""
+    if len(job_vecs) == 0:
+        return np.zeros(0, dtype=np.float32)
+    return (_normalize(job_vecs) @ _normalize(profile_vecs).T).max(axis=1)
+
+
+def prefilter(
+    rows: list[dict],
+    embedder,
+    profile_vecs: np.ndarray,
+    top_n: int | None = None,
+    threshold: float | None = None,
+    batch_size: int = 256,
+) -> tuple[list[dict], np.ndarray]:
+    """
+    Keep jobs whose similarity to the profile is at least `threshold` and among
+    the best `top_n`. Returns the kept rows (in their original order) and the
+    similarity of every input row.
+    """
+    if len(profile_vecs) == 0:
+        raise ValueError("profile index is empty; run `python -m src index` first")
+    sims = similarity(embed_jobs(rows, embedder, batch_size), profile_vecs)
+    keep = np.ones(len(rows), dtype=bool)
+    if threshold is not None:
+        keep &= sims >= threshold
+    if top_n is not None and keep.sum() > top_n:
+        masked = np.where(keep, sims, -np.inf)
+        best = np.argpartition(-masked, top_n - 1)[:top_n]
+        keep = np.zeros(len(rows), dtype=bool)
+        keep[best] = True
+    return [r for r, k in zip(rows, keep) if k], sims
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+from src import metrics
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token) used for TPM budgeting."""
+    return len(text) // 4 + 1
+
+
+async def gather_bounded(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[R]],
+    concurrency: int = 8,
+) -> list[R | None]:
+    """
+    Run `worker` over `items` with at most `concurrency` in flight.
+    Results keep input order; a worker that raises yields None for its item
+    (counted in `worker_failures_total`), so callers must count those as lost.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(item):
+        async with sem:
+            try:
+                return await worker(item)
+            except Exception as e:
+                metrics.inc("worker_failures_total")
+                print(f"Worker failed: {e!r}")
+                return None
+
+    return await asyncio.gather(*(one(i) for i in items))
+
+
+def run_bounded(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[R]],
+    concurrency: int = 8,
+) -> list[R | None]:
+    """Blocking wrapper around `gather_bounded` for sync callers."""
+    return asyncio.run(gather_bounded(items, worker, concurrency))
@@ -1,139 +1,842 @@
-import csv, json
+import asyncio, argparse, csv, json, random
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from src.memory import get_retriever
-from src.enrich import fetch_and_cache
-
-
-RANK_SCHEMA = {
-    "id": "<int | null> (local DB id if present)",
-    "external_id": "<string> (unique key like 'adzuna:123456')",
-    "description": "<string> (job description text)",
-    "redirect_url": "<string> (job posting URL)",
-    "company": "<string> (company name)",
-    "title": "<string> (job title)",
-    "location": "<string> (job location)",
-    "score": "<int 0-100, higher = better fit>",
-    "why": "<short summary <=280 chars>",
-    "level_fit": "<one of: junior | mid | senior | staff | unknown>",
-    "tech_fit": ["<relevant tech keywords>"],
-    "location_fit": "<perfect | ok | poor>",
-    "relevance_tags": ["<keywords like fintech, backend, ai>"],
-    "summary": "<1-2 sentence human-readable job synopsis>",
-    "concerns": ["<potential issues or mismatches>"],
-}
-
-PROMPT = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            "You are an expert technical career assistant. "
-            "Compare the candidate’s profile and the job posting, "
-            "then return STRICT JSON following {schema}. "
-            "Be concise, factual, and do not include extra text.",
-        ),
-        ("user", "PROFILE FACTS:\n{facts}\n\n" "JOB DATA:\n{job}"),
-    ]
-).partial(schema=json.dumps(RANK_SCHEMA, indent=2))
+from typing import Any
+from src import metrics
+from src.compact import CompactionStats, compact, count_tokens
+from src.rank_engine import estimate_tokens, run_bounded
+from src.ratelimit import RateLimiter
+from src.results_log import ResultsLog
+from src.retrieval import CachedRetriever, WholeProfileRetriever, get_profile_retriever
+from src.score_cache import ScoreCache, fingerprint
+from src.store import JobStore
+from src.structured import RANK_SCHEMA, coerce_score, loads_lenient
 
-TOP_K = 20
+# Job columns the LLM ranker reads, and the extra ones the local scorer needs
+JOB_COLUMNS = ("src_id", "title", "company", "location", "redirect_url", "description")
+LOCAL_COLUMNS = ("created", "salary_min", "salary_max")
 
+# Copied from the job row onto every result rather than echoed back by the model
+PASSTHROUGH = ("id", "title", "company", "location", "redirect_url", "description")
+SCORE_SCHEMA = {k: v for k, v in RANK_SCHEMA.items() if k not in PASSTHROUGH}
+_SCHEMA_JSON = json.dumps(SCORE_SCHEMA, separators=(",", ":"), ensure_ascii=False)
+
+# Built into ChatPromptTemplates on first use by `_prompt`; langchain is slow to import
+PROMPT_MESSAGES = [
+    (
+        "system",
+        "You are an expert technical career assistant. "
+        "Compare the candidate’s profile and the job posting, "
+        "then return STRICT JSON following {schema}. "
+        "Be concise, factual, and do not include extra text.",
+    ),
+    ("user", "PROFILE FACTS:\n{facts}\n\n" "JOB DATA:\n{job}"),
+]
+
+BATCH_PROMPT_MESSAGES = [
+    (
+        "system",
+        "You are an expert technical career assistant. "
+        "Compare the candidate’s profile with EACH job posting in the JSON array, "
+        "then return a STRICT JSON object {{\"jobs\": [...]}} holding one entry per job, "
+        "each following {schema} and keeping the job's external_id unchanged. "
+        "Be concise, factual, and do not include extra text.",
+    ),
+    ("user", "PROFILE FACTS:\n{facts}\n\n" "JOBS:\n{jobs}"),
+]
+
+MODEL = "gpt-4o-mini"
+TOP_K = 20  # at most this many jobs are escalated to the enriched rerank
+OUTPUT_TOKENS = 400  # expected completion size, reserved against the TPM quota
+ENRICHED_TOKENS = 2000  # fetch_url caps enriched text at 8000 chars
+JOB_TOKENS = 800  # default per-job description budget after compaction
+REPAIRS = 20  # re-asks allowed per run for replies that are not valid JSON
+RETRIES = 3  # re-sends of a request that failed with a transient API error
+RETRY_BACKOFF = 1.0  # seconds before the first re-send; doubles each time
+REPAIR_PROMPT = (
+    "Your reply could not be used ({error}). "
+    "Answer again with only the JSON object, no markdown or extra text."
+)
+
+
+def _external_id(r: dict):
+    return r.get("src_id") or r.get("external_id")
+
+
+def _query(r: dict) -> str:
+    return f"Key skills/exp relevant to: {r['title']} at {r['company']} in {r['location']}"
+
+
+def _description(r: dict, description: str | None = None) -> str:
+    if description is not None:
+        return description
+    return r.get("description_enriched") or r.get("description", "")
+
+
+def _job_payload(r: dict, description: str | None = None, job_tokens: int | None = None) -> dict:
+    """What the model sees of a job: identity, title/company/location and a compacted description."""
+    return {
+        "external_id": _external_id(r),
+        "title": r.get("title", ""),
+        "company": r.get("company", ""),
+        "location": r.get("location", ""),
+        "description": compact(_description(r, description), job_tokens),
+    }
+
+
+def _raw_tokens(r: dict, description: str | None = None) -> int:
+    """Tokens the uncompacted payload (all fields, full description) would have cost."""
+    raw = {k: r.get(k, "") for k in PASSTHROUGH}
+    raw["description"] = _description(r, description)
+    return count_tokens(json.dumps({**raw, "external_id": _external_id(r)}))
+
+
+@lru_cache(maxsize=None)
+def _prompt(batch: bool = False):
+    """The single-job (or batch) ChatPromptTemplate with the schema filled in."""
+    from langchain_core.prompts import ChatPromptTemplate
+
+    messages = BATCH_PROMPT_MESSAGES if batch else PROMPT_MESSAGES
+    return ChatPromptTemplate.from_messages(messages).partial(schema=_SCHEMA_JSON)
+
+
+def _transient(e: Exception) -> bool:
+    """Rate limits, 5xx and connection errors are worth retrying; bad requests and code bugs are not."""
+    from src.http_client import RETRY_STATUSES
+
+    if getattr(e, "status_code", None) in RETRY_STATUSES:
+        return True
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError")
+
+
+def _chat_model(model: str, timeout: float | None):
+    from langchain_openai import ChatOpenAI  # slow to import; only needed for real API calls
+
+    # JSON mode: the API guarantees a syntactically valid JSON object
+    return ChatOpenAI(
+        model=model,
+        temperature=0,
+        timeout=timeout,
+        model_kwargs={"response_format": {"type": "json_object"}},
+    )
+
+
+def _prompt_fingerprint(model: str, profile_path) -> str:
+    """Hash of the inputs every score depends on; a change invalidates the score cache."""
+    profile = Path(profile_path)
+    profile_text = profile.read_text(encoding="utf-8") if profile.exists() else ""
+    template = [m.content for m in _prompt().format_messages(facts="{facts}", job="{job}")]
+    return fingerprint(profile_text, template, model, SCORE_SCHEMA)
 
-def rank_jobs(
-    jobs_csv="data/jobs.csv",
-    out_path="data/jobs_ranked.csv",
-    top_k_path="data/jobs_top_k.csv",
-):
-    retriever = get_retriever()
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
 
-    rows = list(csv.DictReader(open(jobs_csv, encoding="utf-8")))
-    scored = []
+def pack_batches(
+    rows: list[dict],
+    batch_size: int,
+    token_budget: int,
+    extra_tokens: int = 0,
+    job_tokens: int | None = None,
+) -> list[list[dict]]:
+    """
+    Greedily group rows into batches of at most `batch_size` jobs whose job
+    payloads (plus `extra_tokens` each, for text not fetched yet) together stay
+    under `token_budget` tokens. A single oversized job still gets a batch of its own.
+    """
+    batches, cur, cur_tokens = [], [], 0
     for r in rows:
-        query = f"Key skills/exp relevant to: {r['title']} at {r['company']} in {r['location']}"
-        docs = retriever.invoke(query)
-
-        facts = "\n".join(d.page_content for d in docs) if docs else ""
-        job_json = json.dumps(
-            {
-                "id": r.get("id", None),
-                "external_id": r.get("src_id", None),
-                "title": r.get("title", ""),
-                "company": r.get("company", ""),
-                "location": r.get("location", ""),
-                "description": r.get("description", ""),
-                "redirect_url": r.get("redirect_url", ""),
-            }
+        t = estimate_tokens(json.dumps(_job_payload(r, job_tokens=job_tokens))) + extra_tokens
+        if cur and (len(cur) >= batch_size or cur_tokens + t > token_budget):
+            batches.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(r)
+        cur_tokens += t
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def _parse_batch(resp: str) -> dict:
+    """
+    Map external_id -> validated scored row from a batch response; unusable
+    entries are left out. Raises ValueError if the reply is not JSON at all.
+    """
+    data = loads_lenient(resp)
+    if isinstance(data, dict):
+        data = data.get("jobs", [])
+    if not isinstance(data, list):
+        raise ValueError("batch reply has no jobs array")
+    by_id = {}
+    for d in data:
+        if isinstance(d, dict) and d.get("external_id") is not None:
+            try:
+                by_id[str(d["external_id"])] = coerce_score(d)
+            except ValueError:
+                pass
+    return by_id
+
+
+@dataclass
+class Ranker:
+    """Everything needed to score one job: model, retriever and the optional throttling/caching layers."""
+
+    llm: Any
+    retriever: Any
+    model: str = MODEL
+    limiter: RateLimiter | None = None
+    timeout: float | None = None
+    cache: ScoreCache | None = None
+    job_tokens: int | None = JOB_TOKENS
+    repairs: int = REPAIRS
+    retries: int = RETRIES
+    retry_backoff: float = RETRY_BACKOFF
+    compaction: CompactionStats = field(default_factory=CompactionStats)
+    parse_failures: Counter = field(default_factory=Counter)  # per model
+    repaired: Counter = field(default_factory=Counter)
+
+    async def _prepare(self, r: dict, description: str | None = None):
+        """Retrieve profile facts and build the job payload, single-job prompt and cache key."""
+        docs = await self.retriever.ainvoke(_query(r))
+        facts = [d.page_content for d in docs] if docs else []
+        job = _job_payload(r, description, self.job_tokens)
+        job_json = json.dumps(job, ensure_ascii=False)
+        self.compaction.add(_raw_tokens(r, description), count_tokens(job_json))
+        msg = _prompt().format_messages(facts="\n".join(facts), job=job_json)
+        key = fingerprint(self.model, [m.content for m in msg]) if self.cache else None
+        return facts, job, msg, key
+
+    @staticmethod
+    def _attach(r: dict, data: dict) -> dict:
+        """Fill the passthrough columns from the job row itself."""
+        for k in PASSTHROUGH:
+            data[k] = r.get(k, None if k == "id" else "")
+        data["external_id"] = _external_id(r)
+        return data
+
+    def _cached(self, key, r: dict):
+        data = self.cache.get(key) if self.cache else None
+        return self._attach(r, data) if data is not None else None
+
+    def _store(self, key, r: dict, data: dict) -> dict:
+        if self.cache:
+            self.cache.put(key, {k: v for k, v in data.items() if k not in PASSTHROUGH})
+        return self._attach(r, data)
+
+    async def _complete(self, msg, label: str, n_jobs: int = 1) -> str | None:
+        """
+        Send one chat request under the rate limiter and timeout; None if it timed
+        out. Transient API errors (429, 5xx, connection) are re-sent up to
+        `retries` times with exponential backoff before the error is raised.
+        """
+        prompt_tokens = sum(estimate_tokens(m.content) for m in msg)
+        for attempt in range(self.retries + 1):
+            if self.limiter:
+                with metrics.timer("llm_throttle_seconds", model=self.model):
+                    await self.limiter.acquire_async(prompt_tokens + OUTPUT_TOKENS * n_jobs)
+            metrics.inc("llm_requests_total", model=self.model)
+            try:
+                with metrics.timer("llm_seconds", model=self.model):
+                    resp = await asyncio.wait_for(self.llm.ainvoke(msg), self.timeout)
+                break
+            except asyncio.TimeoutError:
+                metrics.inc("llm_timeouts_total", model=self.model)
+                print(f"Timed out ranking {label} after {self.timeout}s")
+                return None
+            except Exception as e:
+                metrics.inc("llm_errors_total", model=self.model)
+                if attempt >= self.retries or not _transient(e):
+                    raise
+                delay = self.retry_backoff * 2**attempt * (0.5 + random.random())
+                metrics.inc("llm_retries_total", model=self.model)
+                print(f"API error ranking {label} ({e!r}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        usage = getattr(resp, "usage_metadata", None) or {}
+        metrics.inc("llm_prompt_tokens_total", usage.get("input_tokens", prompt_tokens), model=self.model)
+        metrics.inc(
+            "llm_completion_tokens_total",
+            usage.get("output_tokens", estimate_tokens(resp.content)),
+            model=self.model,
         )
-        msg = PROMPT.format_messages(facts=facts, job=job_json)
-        resp = llm.invoke(msg).content.strip()
+        return resp.content.strip()
+
+    async def _score_prepared(self, r: dict, msg, key) -> dict | None:
+        """
+        Ask for one job's score. A reply that cannot be parsed or validated is
+        re-asked once with the error, while the run's repair budget lasts.
+        """
+        label = f"job {_external_id(r)}"
+        repairing = False
+        while True:
+            resp = await self._complete(msg, label)
+            if resp is None:
+                return None
+            try:
+                data = coerce_score(loads_lenient(resp))
+            except ValueError as e:
+                self.parse_failures[self.model] += 1
+                metrics.inc("llm_parse_failures_total", model=self.model)
+                if repairing or self.repairs <= 0:
+                    print(f"Error parsing LLM response for {label}: {e}")
+                    print("Response was:", resp[:500])
+                    return None
+                self.repairs -= 1
+                repairing = True
+                from langchain_core.messages import AIMessage, HumanMessage
+
+                msg = [*msg, AIMessage(content=resp), HumanMessage(content=REPAIR_PROMPT.format(error=e))]
+                continue
+            if repairing:
+                self.repaired[self.model] += 1
+                metrics.inc("llm_repairs_total", model=self.model)
+            return self._store(key, r, data)
+
+    async def _score_one(self, r: dict, msg, key) -> dict | None:
+        """`_score_prepared` for one job of a batch: an error loses only this job, not its batch mates."""
         try:
-            data = json.loads(resp)
-            data["id"] = r.get("id", None)
-            data["external_id"] = r.get("src_id", None)
-            scored.append(data)
-            print(f"Ranked job {data['external_id']} with score {data['score']}!")
+            return await self._score_prepared(r, msg, key)
         except Exception as e:
-            print(f"Error parsing LLM response for job {r.get('src_id', '')}: {e}")
-            print("Response was:", resp)
+            print(f"Failed to rank job {_external_id(r)}: {e!r}")
+            return None
 
-    scored.sort(key=lambda x: float(x["score"]), reverse=True)
+    async def score(self, r: dict, description: str | None = None) -> dict | None:
+        """Retrieve profile facts for one job and ask the LLM to score it. Returns None on failure."""
+        _, _, msg, key = await self._prepare(r, description)
+        cached = self._cached(key, r)
+        if cached is not None:
+            return cached
+        return await self._score_prepared(r, msg, key)
+
+    async def score_batch(self, rows: list[dict]) -> list[dict | None]:
+        """
+        Score several jobs with one chat request. Results are matched back by
+        external_id; jobs missing or malformed in the response are retried one
+        at a time, and a retry that fails leaves only its own slot None.
+        Cache hits never reach the model.
+        """
+        results: list[dict | None] = [None] * len(rows)
+        pending = []
+        for i, r in enumerate(rows):
+            facts, job, msg, key = await self._prepare(r)
+            cached = self._cached(key, r)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, facts, job, msg, key))
+        if len(pending) <= 1:
+            for i, _, _, msg, key in pending:
+                results[i] = await self._score_one(rows[i], msg, key)
+            return results
+
+        facts = list(dict.fromkeys(f for _, fs, _, _, _ in pending for f in fs))
+        jobs = [job for _, _, job, _, _ in pending]
+        msg = _prompt(batch=True).format_messages(
+            facts="\n".join(facts), jobs=json.dumps(jobs, ensure_ascii=False)
+        )
+        resp = await self._complete(msg, f"batch of {len(jobs)} jobs", n_jobs=len(jobs))
+        try:
+            by_id = _parse_batch(resp) if resp else {}
+        except ValueError as e:
+            self.parse_failures[self.model] += 1
+            metrics.inc("llm_parse_failures_total", model=self.model)
+            print(f"Error parsing batch response: {e}")
+            by_id = {}
+
+        retry = []
+        for i, _, _, single_msg, key in pending:
+            data = by_id.get(str(_external_id(rows[i])))
+            if data is None:
+                retry.append((i, single_msg, key))
+            else:
+                results[i] = self._store(key, rows[i], data)
+        if retry:
+            print(f"Batch response missing {len(retry)}/{len(jobs)} jobs; retrying individually")
+        for i, single_msg, key in retry:
+            results[i] = await self._score_one(rows[i], single_msg, key)
+        return results
+
+
+def _write_csv(path, rows):
     cols = RANK_SCHEMA.keys()
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
+    with open(path, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=cols)
         w.writeheader()
-        for s in scored:
+        for s in rows:
             w.writerow({k: s.get(k, "") for k in cols})
-    print(f"Wrote {out_path} ({len(scored)} rows) \n")
-
-    # Further investigation of top K jobs
-    for r in scored[:TOP_K]:
-        full_text = fetch_and_cache(r.get("redirect_url", ""))
-        if full_text and not full_text.startswith("[error"):
-            r["description_enriched"] = full_text
-    print(scored)
-    # Rerank top K with enriched descriptions
-    for r in scored[:TOP_K]:
-        query = f"Key skills/exp relevant to: {r['title']} at {r['company']} in {r['location']}"
-        docs = retriever.invoke(query)
-        facts = "\n".join(d.page_content for d in docs) if docs else ""
-        job_json = json.dumps(
-            {
-                "id": r.get("id", None),
-                "external_id": r.get("external_id", None),
-                "title": r.get("title", ""),
-                "company": r.get("company", ""),
-                "location": r.get("location", ""),
-                "description": r.get("description_enriched", r.get("description", "")),
-                "redirect_url": r.get("redirect_url", ""),
-            }
+    print(f"Wrote {path} ({len(rows)} rows) \n")
+
+
+def _dropped(batches, results) -> int:
+    """Jobs left without a score: whole batches lost to a worker error, plus single failed jobs."""
+    return sum(len(b) if res is None else sum(d is None for d in res) for b, res in zip(batches, results))
+
+
+def _profile_text(profile_path) -> str:
+    with open(profile_path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_parquet(parquet_dir, scored) -> None:
+    if parquet_dir:
+        from src import columnar
+
+        n = columnar.write_rows(parquet_dir, "ranked", scored)
+        print(f"Appended {n} ranked rows to {parquet_dir}")
+
+
+def _load_rows(jobs_csv, store, parquet_dir, columns, stage="rank", model=None) -> list[dict]:
+    """
+    Jobs to rank: those the job store has no current `stage` score for (from
+    `model`), else the latest fetch in the Parquet dataset (only `columns` are
+    read), else `jobs_csv`.
+    """
+    if store:
+        rows = store.unscored(stage, model)
+        print(f"{len(rows)} jobs in {store.path} need scoring")
+        return rows
+    if parquet_dir:
+        from src import columnar
+
+        day = columnar.latest_fetch_date(parquet_dir)
+        rows = columnar.read_rows(parquet_dir, "normalized", columns, [("fetch_date", "=", day)]) if day else []
+        print(f"Read {len(rows)} jobs fetched on {day} from {parquet_dir}")
+        return list({r["src_id"]: r for r in rows}.values())  # a later run that day wins
+    with open(jobs_csv, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def _rank_local(jobs_csv, out_path, top_k_path, profile_path, store_path, preferences, parquet_dir=None):
+    """
+    The LLM-free path of `rank_jobs`: local feature scores for every job. There is
+    no rerank, so `top_k_path` gets the same full list as the LLM path writes there.
+    """
+    store = JobStore(store_path) if store_path else None
+    scorer = "local:" + fingerprint(preferences or {})[:12]  # new preferences rescore every job
+    with metrics.timer("stage_seconds", stage="load"):
+        rows = _load_rows(jobs_csv, store, parquet_dir, JOB_COLUMNS + LOCAL_COLUMNS, stage="local", model=scorer)
+    from src.local_score import local_scores
+
+    with metrics.timer("stage_seconds", stage="local_score"):
+        scored = local_scores(rows, _profile_text(profile_path), **(preferences or {}))
+    metrics.inc("jobs_scored_total", len(scored), stage="local")
+    scored.sort(key=lambda x: float(x["score"]), reverse=True)
+    if store:  # a stage of its own, so LLM ranking never mistakes these for its scores
+        store.save_scores(scored, "local", scorer)
+        exported = store.scores("local")
+        store.close()
+    else:
+        exported = scored
+    _write_csv(out_path, exported)
+    _write_csv(top_k_path, exported)
+    _write_parquet(parquet_dir, scored)
+    print(f"Local scorer: {len(rows)} jobs scored, no LLM calls")
+
+
+def rank_jobs(
+    jobs_csv="data/jobs.csv",
+    out_path="data/jobs_ranked.csv",
+    top_k_path="data/jobs_top_k.csv",
+    concurrency=8,
+    timeout=60.0,
+    rpm=None,
+    tpm=None,
+    cache_path="data/score_cache.sqlite",
+    cache_ttl_days=30,
+    profile_path="data/profile.md",
+    batch_size=1,
+    batch_token_budget=12_000,
+    job_tokens=JOB_TOKENS,
+    repairs=REPAIRS,
+    retries=RETRIES,
+    retry_backoff=RETRY_BACKOFF,
+    prefilter_top_n=None,
+    prefilter_threshold=None,
+    embedder=None,
+    profile_vecs=None,
+    whole_profile_chars=0,
+    store_path=None,
+    crawler_opts=None,
+    resume=False,
+    local_only=False,
+    local_top_n=None,
+    preferences=None,
+    parquet_dir=None,
+    model=MODEL,
+    top_k=TOP_K,
+    rerank_model=None,
+    rerank_concurrency=None,
+    rerank_rpm=None,
+    rerank_tpm=None,
+    escalate_min_score=None,
+    llm=None,
+    rerank_llm=None,
+    retriever=None,
+):
+    """
+    Score every job in `jobs_csv`, then enrich and rerank the top K.
+
+    Up to `concurrency` LLM calls run at once, each bounded by `timeout` seconds
+    and throttled against the model's `rpm`/`tpm` quotas when given.
+    concurrency=1 reproduces the original one-at-a-time behaviour.
+
+    Scores are cached in `cache_path` (None disables it) keyed on the exact
+    prompt, so unchanged postings are not re-sent to the model on later runs.
+
+    With `batch_size` > 1, up to that many jobs (capped at `batch_token_budget`
+    tokens of job data) share one request and one copy of the system prompt.
+
+    Job descriptions are stripped of boilerplate (EEO and benefits statements),
+    deduplicated and trimmed to `job_tokens` tokens before they reach the prompt
+    (None keeps their full length).
+
+    Replies are parsed leniently (markdown fences, truncated JSON) and validated
+    against the rank schema with type coercion. A reply that still fails is
+    re-asked once, up to `repairs` re-asks per run. Requests that fail with a
+    transient API error (429, 5xx, connection) are re-sent up to `retries` times,
+    backing off from `retry_backoff` seconds; jobs that still end without a score
+    are counted as dropped in the end-of-run summary.
+
+    Setting `prefilter_top_n` and/or `prefilter_threshold` first drops jobs whose
+    embedding is far from the profile, so only plausible matches reach the LLM.
+    By default jobs are embedded like the Chroma profile index; pass `embedder`
+    (and optionally matching `profile_vecs`) to use another backend.
+
+    Profile retrieval is memoized per distinct query; with `whole_profile_chars`
+    a profile up to that length is sent whole instead of querying Chroma.
+
+    With `store_path`, jobs are read from the job database instead of `jobs_csv`
+    (only those not yet scored at their current content by `model`), scores and
+    enrichment are written back, and the CSVs are exported from the accumulated
+    scores. Only this run's jobs are escalated, plus stored jobs whose rerank
+    score came from a model other than `rerank_model`.
+
+    Ranking is a two-tier cascade. The first-pass `model` scores every job; the
+    best `top_k` jobs (only those scoring at least `escalate_min_score`, if set)
+    are escalated: their pages are fetched and `rerank_model` (default: the
+    first-pass model) scores them again on the full text, under its own
+    `rerank_concurrency` and `rerank_rpm`/`rerank_tpm` limits.
+
+    Top-K pages are fetched by a polite concurrent `Crawler` (configured via
+    `crawler_opts`) and each rerank starts as soon as its own page is ready.
+
+    Every scored batch is appended to `<out_path stem>.partial.jsonl` as it
+    completes. With `resume`, jobs already in that log (from a crashed or
+    interrupted run with the same model, prompt and profile) are not scored
+    again and are merged into the output. The log is removed only after a run in
+    which every job was scored; if any job failed, timed out or was dropped it is
+    kept, so `resume` retries just those.
+
+    With `parquet_dir` (and no `store_path`), the latest fetch is read from the
+    Parquet dataset there instead of `jobs_csv`, projecting only the columns the
+    ranker uses, and the results are appended to its `ranked` table.
+
+    `local_only` scores every job with the deterministic feature scorer in
+    `src.local_score` and makes no LLM calls at all; `local_top_n` instead uses
+    it as a pre-ranker, keeping only the N best jobs for the LLM. `preferences`
+    (levels, locations, remote, min_salary) feed the local scorer.
+    """
+    if local_only:
+        return _rank_local(
+            jobs_csv, out_path, top_k_path, profile_path, store_path, preferences, parquet_dir
         )
-        msg = PROMPT.format_messages(facts=facts, job=job_json)
-        resp = llm.invoke(msg).content.strip()
-        try:
-            data = json.loads(resp)
-            data["id"] = r.get("id", None)
-            data["external_id"] = r.get("external_id", None)
-            print(
-                f"Re-ranked enriched job {data['external_id']} with score {data['score']}!"
-            )
-            for k in data:
-                r[k] = data[k]
-        except Exception as e:
-            print(
-                f"Error parsing LLM response for enriched job {r.get('external_id', '')}: {e}"
+    llm = llm or _chat_model(model, timeout)
+    model = getattr(llm, "model_name", None) or model
+    if rerank_llm is None:
+        rerank_llm = _chat_model(rerank_model, timeout) if rerank_model and rerank_model != model else llm
+    rerank_model = getattr(rerank_llm, "model_name", None) or rerank_model or model
+    namespace = _prompt_fingerprint(model, profile_path)
+    cache = None
+    if cache_path:
+        cache = ScoreCache(cache_path, namespace=namespace, ttl_days=cache_ttl_days)
+    log = ResultsLog(
+        Path(out_path).with_suffix(".partial.jsonl"), fingerprint(namespace, job_tokens, rerank_model)
+    )
+    resumed = resume and log.load()
+    log.open(append=resumed)
+    if retriever is None:
+        retriever = get_profile_retriever(profile_path, whole_profile_chars=whole_profile_chars)
+    elif not isinstance(retriever, (CachedRetriever, WholeProfileRetriever)):
+        retriever = CachedRetriever(retriever)
+    ranker = Ranker(
+        llm=llm,
+        retriever=retriever,
+        model=model,
+        limiter=RateLimiter(rpm, tpm) if rpm or tpm else None,
+        timeout=timeout,
+        cache=cache,
+        job_tokens=job_tokens,
+        repairs=repairs,
+        retries=retries,
+        retry_backoff=retry_backoff,
+    )
+    if rerank_llm is llm and not (rerank_rpm or rerank_tpm):
+        reranker = ranker
+    else:
+        reranker = Ranker(
+            llm=rerank_llm,
+            retriever=retriever,
+            model=rerank_model,
+            limiter=RateLimiter(rerank_rpm, rerank_tpm) if rerank_rpm or rerank_tpm else None,
+            timeout=timeout,
+            cache=cache,  # keys include the model, so the tiers never collide
+            job_tokens=job_tokens,
+            repairs=repairs,
+            retries=retries,
+            retry_backoff=retry_backoff,
+        )
+
+    store = JobStore(store_path) if store_path else None
+    with metrics.timer("stage_seconds", stage="load"):
+        rows = _load_rows(
+            jobs_csv, store, parquet_dir, JOB_COLUMNS + (LOCAL_COLUMNS if local_top_n is not None else ()),
+            model=model,
+        )
+
+    if local_top_n is not None:
+        n = len(rows)
+        from src.local_score import local_prefilter
+
+        with metrics.timer("stage_seconds", stage="local_prefilter"):
+            rows, _ = local_prefilter(rows, _profile_text(profile_path), local_top_n, **(preferences or {}))
+        print(f"Local pre-rank kept {len(rows)}/{n} jobs for LLM ranking")
+
+    if prefilter_top_n is not None or prefilter_threshold is not None:
+        from src.prefilter import embed_profile, prefilter, profile_vectors
+
+        if profile_vecs is None:
+            profile_vecs = embed_profile(embedder, profile_path) if embedder else profile_vectors()
+        if embedder is None:
+            from langchain_openai import OpenAIEmbeddings
+
+            embedder = OpenAIEmbeddings()
+        n = len(rows)
+        with metrics.timer("stage_seconds", stage="prefilter"):
+            rows, _ = prefilter(
+                rows, embedder, profile_vecs, top_n=prefilter_top_n, threshold=prefilter_threshold
             )
-            print("Response was:", resp)
+        print(f"Prefilter kept {len(rows)}/{n} jobs for LLM ranking")
+
+    done = log.done["rank"]
+    if resumed:
+        n = len(rows)
+        rows = [r for r in rows if str(_external_id(r)) not in done]
+        print(f"Resuming: {n - len(rows)} jobs already scored in {log.path}, {len(rows)} to go")
 
+    async def first_pass(batch):
+        results = await ranker.score_batch(batch)
+        log.append("rank", results)
+        for data in results:
+            if data:
+                print(f"Ranked job {data['external_id']} with score {data['score']}!")
+        return results
+
+    with metrics.timer("stage_seconds", stage="rank"):
+        batches = pack_batches(rows, batch_size, batch_token_budget, job_tokens=job_tokens)
+        results = run_bounded(batches, first_pass, concurrency)
+    scored = [d for b in results if b for d in b if d]
+    dropped = {"rank": _dropped(batches, results)}
+    metrics.inc("jobs_scored_total", len(scored), stage="rank")
+    metrics.inc("jobs_dropped_total", dropped["rank"], stage="rank")
+    scored += done.values()
+    if store:
+        store.save_scores(scored, "rank", model)
     scored.sort(key=lambda x: float(x["score"]), reverse=True)
-    with open(top_k_path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=cols)
-        w.writeheader()
-        for s in scored:
-            w.writerow({k: s.get(k, "") for k in cols})
-    print(f"Wrote {top_k_path} ({len(scored)} rows) \n")
+    _write_csv(out_path, store.scores("rank") if store else scored)  # the store's export includes earlier runs
+
+    # Escalate this run's shortlist, plus stored jobs whose rerank came from another model;
+    # enrich their pages concurrently, each rerank starts as soon as its pages are in
+    escalated = [
+        r for r in scored[:top_k] if escalate_min_score is None or float(r["score"]) >= escalate_min_score
+    ]
+    if store:
+        ids = {str(r.get("external_id")) for r in escalated}
+        escalated += [r for r in store.outdated_reranks(rerank_model) if str(r.get("external_id")) not in ids]
+    reranked = log.done["rerank"]
+    rescored = set()
+    for r in escalated:
+        if str(r.get("external_id")) in reranked:
+            r.update(reranked[str(r.get("external_id"))])
+            rescored.add(str(r.get("external_id")))
+    top = [r for r in escalated if str(r.get("external_id")) not in reranked]
+    from src.crawler import Crawler
+    from src.enrich import fetch_and_cache
+
+    crawler = Crawler(fetch=fetch_and_cache, **(crawler_opts or {}))
+    pages = {id(r): crawler.submit(r.get("redirect_url", "")) for r in top}
+    enriched = []
+
+    async def rerank(batch):
+        for r in batch:
+            with metrics.timer("enrich_wait_seconds"):
+                full_text = await asyncio.wrap_future(pages[id(r)])
+            if full_text and not full_text.startswith("[error"):
+                r["description_enriched"] = full_text
+                enriched.append((r.get("external_id"), r.get("redirect_url", ""), full_text))
+        results = await reranker.score_batch(batch)
+        log.append("rerank", results)
+        for r, data in zip(batch, results):
+            if data:
+                print(f"Re-ranked enriched job {data['external_id']} with score {data['score']}!")
+                rescored.add(str(data["external_id"]))
+                for k in data:
+                    r[k] = data[k]
+        return results
+
+    try:
+        batches = pack_batches(
+            top, batch_size, batch_token_budget,
+            extra_tokens=min(job_tokens or ENRICHED_TOKENS, ENRICHED_TOKENS), job_tokens=job_tokens,
+        )
+        with metrics.timer("stage_seconds", stage="enrich_rerank"):
+            results = run_bounded(batches, rerank, rerank_concurrency or concurrency)
+    finally:
+        crawler.close()
+    dropped["rerank"] = _dropped(batches, results)
+    metrics.inc("jobs_scored_total", len(top) - dropped["rerank"], stage="rerank")
+    metrics.inc("jobs_dropped_total", dropped["rerank"], stage="rerank")
+    if store:
+        store.save_enrichment(enriched)
+        store.save_scores(
+            [
+                {k: v for k, v in r.items() if k != "description_enriched"}
+                for r in escalated
+                if str(r.get("external_id")) in rescored
+            ],
+            "rerank",
+            rerank_model,
+        )
+
+    scored.sort(key=lambda x: float(x["score"]), reverse=True)
+    if store:
+        _write_csv(top_k_path, store.best_scores())
+        store.close()
+    else:
+        _write_csv(top_k_path, scored)
+    _write_parquet(parquet_dir, scored)
+    if any(dropped.values()):
+        log.close()
+        print(f"Kept {log.path}: {sum(dropped.values())} jobs were not scored; --resume retries only those")
+    else:
+        log.clear()
+
+    band = f", score >= {escalate_min_score}" if escalate_min_score is not None else ""
+    print(f"Tier 1 ({model}): {len(scored)} jobs scored")
+    print(f"Tier 2 ({rerank_model}): {len(escalated)} jobs escalated (top {top_k}{band}), {len(top) - dropped['rerank']} re-scored")
+    if any(dropped.values()):
+        print(
+            f"Dropped {sum(dropped.values())} jobs (API errors, timeouts or unusable replies): "
+            f"{dropped['rank']} in tier 1, {dropped['rerank']} in tier 2 (tier 2 keeps their tier 1 score)"
+        )
+    for rk in {id(r): r for r in (ranker, reranker)}.values():
+        print(rk.compaction.report())
+        for m, n in rk.parse_failures.items():
+            print(f"Parse failures ({m}): {n}, {rk.repaired[m]} repaired by a re-ask")
+    if isinstance(retriever, CachedRetriever):
+        print(f"Retrieval cache: {retriever.hits} hits, {retriever.misses} misses")
+    if cache:
+        st = cache.stats()
+        print(f"Score cache: {st['hits']} hits, {st['misses']} misses ({st['hit_rate']:.0%})")
+        cache.close()
+
+
+def _hashing_embedder():
+    from src.prefilter import HashingEmbedder
+
+    return HashingEmbedder()
+
+
+def cli(argv=None):
+    from dotenv import load_dotenv
+    from src.structured import LEVEL_ORDER
+
+    ap = argparse.ArgumentParser(description="Rank fetched jobs against the profile.")
+    ap.add_argument("--concurrency", type=int, default=8, help="max LLM calls in flight")
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request timeout (s)")
+    ap.add_argument("--rpm", type=float, default=None, help="requests/minute quota")
+    ap.add_argument("--tpm", type=float, default=None, help="tokens/minute quota")
+    ap.add_argument("--no-cache", action="store_true", help="re-score every job")
+    ap.add_argument("--batch-size", type=int, default=1, help="jobs per LLM request")
+    ap.add_argument(
+        "--batch-tokens", type=int, default=12_000, help="token budget for job data per batch"
+    )
+    ap.add_argument(
+        "--job-tokens", type=int, default=JOB_TOKENS, help="per-job description budget (0 = untrimmed)"
+    )
+    ap.add_argument(
+        "--retries", type=int, default=RETRIES, help="re-sends of a request after a 429/5xx/connection error"
+    )
+    ap.add_argument("--prefilter-top-n", type=int, default=None, help="LLM-rank only the N closest jobs")
+    ap.add_argument(
+        "--prefilter-threshold", type=float, default=None, help="min cosine similarity to the profile"
+    )
+    ap.add_argument(
+        "--embedder", choices=["openai", "hashing"], default="openai", help="prefilter embedding backend"
+    )
+    ap.add_argument(
+        "--whole-profile",
+        type=int,
+        default=0,
+        metavar="CHARS",
+        help="send the whole profile when it is at most CHARS long instead of retrieving chunks",
+    )
+    ap.add_argument("--db", default=None, help="read jobs from / write scores to this job database")
+    ap.add_argument("--resume", action="store_true", help="continue an interrupted run from its results log")
+    ap.add_argument(
+        "--parquet", default=None, metavar="DIR", help="read jobs from / append results to Parquet in DIR"
+    )
+    ap.add_argument("--local", action="store_true", help="score with local features only, no LLM calls")
+    ap.add_argument("--local-top-n", type=int, default=None, help="LLM-rank only the N best local scores")
+    ap.add_argument(
+        "--level", action="append", choices=LEVEL_ORDER, default=None, help="wanted seniority (repeatable)"
+    )
+    ap.add_argument("--location", action="append", default=None, help="wanted location (repeatable)")
+    ap.add_argument("--remote", action="store_true", help="remote jobs fit the location preference")
+    ap.add_argument("--min-salary", type=float, default=None, help="target salary for the local scorer")
+    ap.add_argument("--model", default=MODEL, help="first-pass model that scores every job")
+    ap.add_argument("--top-k", type=int, default=TOP_K, help="max jobs escalated to the enriched rerank")
+    ap.add_argument("--rerank-model", default=None, help="stronger model for escalated jobs (default: same)")
+    ap.add_argument("--rerank-concurrency", type=int, default=None, help="max rerank calls in flight")
+    ap.add_argument("--rerank-rpm", type=float, default=None, help="requests/minute quota of the rerank model")
+    ap.add_argument("--rerank-tpm", type=float, default=None, help="tokens/minute quota of the rerank model")
+    ap.add_argument(
+        "--escalate-min-score", type=float, default=None, help="escalate only jobs scoring at least this"
+    )
+    ap.add_argument("--metrics", default=None, help="also write run metrics here (.json or .prom)")
+    args = ap.parse_args(argv)
+    load_dotenv()
+    rank_jobs(
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        cache_path=None if args.no_cache else "data/score_cache.sqlite",
+        batch_size=args.batch_size,
+        batch_token_budget=args.batch_tokens,
+        job_tokens=args.job_tokens or None,
+        retries=args.retries,
+        prefilter_top_n=args.prefilter_top_n,
+        prefilter_threshold=args.prefilter_threshold,
+        embedder=_hashing_embedder() if args.embedder == "hashing" else None,
+        whole_profile_chars=args.whole_profile,
+        store_path=args.db,
+        resume=args.resume,
+        parquet_dir=args.parquet,
+        local_only=args.local,
+        local_top_n=args.local_top_n,
+        preferences={
+            "levels": args.level, "locations": args.location, "remote": args.remote, "min_salary": args.min_salary
+        },
+        model=args.model,
+        top_k=args.top_k,
+        rerank_model=args.rerank_model,
+        rerank_concurrency=args.rerank_concurrency,
+        rerank_rpm=args.rerank_rpm,
+        rerank_tpm=args.rerank_tpm,
+        escalate_min_score=args.escalate_min_score,
+    )
+    print(metrics.summary())
+    if args.metrics:
+        metrics.write(args.metrics)
 
 
 if __name__ == "__main__":
-    rank_jobs()
+    cli()
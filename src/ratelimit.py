@@ -0,0 +1,55 @@
+import asyncio, threading, time
+
+
+class TokenBucket:
+    """
+    Token bucket refilling `rate` tokens every `per` seconds, bursting up to `capacity`.
+    Safe to share between threads; usable from sync and async code.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: float | None = None):
+        self.rate = rate / per  # tokens per second
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, n: float) -> float:
+        """Take `n` tokens (going into debt if needed) and return seconds to wait."""
+        n = min(n, self.capacity)  # an oversized request must still be admissible
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= n
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, n: float = 1) -> None:
+        wait = self._reserve(n)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, n: float = 1) -> None:
+        wait = self._reserve(n)
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute quotas, either of which may be unset."""
+
+    def __init__(self, rpm: float | None = None, tpm: float | None = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    def acquire(self, tokens: float = 0) -> None:
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens and tokens:
+            self.tokens.acquire(tokens)
+
+    async def acquire_async(self, tokens: float = 0) -> None:
+        if self.requests:
+            await self.requests.acquire_async(1)
+        if self.tokens and tokens:
+            await self.tokens.acquire_async(tokens)
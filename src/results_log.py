@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+
+class ResultsLog:
+    """
+    Append-only JSONL log of scored jobs for one ranking run, flushed after every
+    batch, so a crashed or rate-limited run can resume where it stopped.
+
+    The first line records a fingerprint of the inputs that scores depend on
+    (model, prompt, profile); a log written under a different fingerprint is
+    not resumed. Each further line is {"stage": "rank" | "rerank", "data": {...}}.
+    """
+
+    def __init__(self, path, fingerprint: str):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.done: dict[str, dict[str, dict]] = {"rank": {}, "rerank": {}}
+        self._f = None
+
+    def load(self) -> bool:
+        """Read an earlier attempt's results into `done`; False if there is nothing to resume."""
+        if not self.path.exists():
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        if header.get("fingerprint") != self.fingerprint:
+            print(f"{self.path} was written with other ranking inputs; starting over")
+            return False
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash mid-write
+            self.done.setdefault(entry["stage"], {})[str(entry["data"].get("external_id"))] = entry["data"]
+        return True
+
+    def open(self, append: bool) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a" if append else "w", encoding="utf-8")
+        if not append:
+            self._f.write(json.dumps({"fingerprint": self.fingerprint}) + "\n")
+            self._f.flush()
+
+    def append(self, stage: str, rows) -> None:
+        for data in rows:
+            if data:
+                self._f.write(json.dumps({"stage": stage, "data": data}, default=str, ensure_ascii=False) + "\n")
+        self._f.flush()  # survives a crash of this process; the OS writes it out
+
+    def close(self) -> None:
+        if self._f:
+            self._f.close()
+            self._f = None
+
+    def clear(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
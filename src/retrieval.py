@@ -0,0 +1,110 @@
+import asyncio, re
+from collections import OrderedDict
+from pathlib import Path
+from src import metrics
+
+
+def _key(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class CachedRetriever:
+    """
+    Memoizes a retriever's results in a size-bounded LRU keyed on the normalized
+    query, so repeated title/company/location queries (and the rerank pass)
+    skip the embedding call and vector search. Concurrent identical async
+    queries share a single lookup.
+    """
+
+    def __init__(self, retriever, maxsize: int = 2048):
+        self.retriever = retriever
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._lru: OrderedDict[str, list] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _get(self, key):
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            metrics.inc("retrieval_cache_total", result="hit")
+            return self._lru[key]
+        return None
+
+    def _put(self, key, docs):
+        self._lru[key] = docs
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def invoke(self, query: str):
+        key = _key(query)
+        docs = self._get(key)
+        if docs is None:
+            self.misses += 1
+            metrics.inc("retrieval_cache_total", result="miss")
+            with metrics.timer("retrieval_seconds"):
+                docs = self.retriever.invoke(query)
+            self._put(key, docs)
+        return docs
+
+    async def ainvoke(self, query: str):
+        key = _key(query)
+        docs = self._get(key)
+        if docs is not None:
+            return docs
+        if key in self._inflight:
+            self.hits += 1
+            metrics.inc("retrieval_cache_total", result="hit")
+            return await asyncio.shield(self._inflight[key])
+        self.misses += 1
+        metrics.inc("retrieval_cache_total", result="miss")
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            with metrics.timer("retrieval_seconds"):
+                docs = await self.retriever.ainvoke(query)
+            self._put(key, docs)
+            fut.set_result(docs)
+            return docs
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved so an unawaited failure isn't logged
+            raise
+        finally:
+            del self._inflight[key]
+
+
+class WholeProfileRetriever:
+    """Returns the entire profile as one document: no embeddings at all for small profiles."""
+
+    def __init__(self, text: str):
+        from langchain_core.documents import Document
+
+        self.docs = [Document(page_content=text)]
+
+    def invoke(self, query: str):
+        return self.docs
+
+    async def ainvoke(self, query: str):
+        return self.docs
+
+
+def get_profile_retriever(
+    profile_path="data/profile.md",
+    store_dir="data/chroma",
+    whole_profile_chars: int = 0,
+    cache_size: int = 2048,
+):
+    """
+    Retriever for ranking prompts. If the profile is at most `whole_profile_chars`
+    long it is used verbatim; otherwise the Chroma index is queried through an LRU.
+    """
+    path = Path(profile_path)
+    if whole_profile_chars and path.exists():
+        text = path.read_text(encoding="utf-8")
+        if len(text) <= whole_profile_chars:
+            return WholeProfileRetriever(text)
+    from src.memory import get_retriever
+
+    return CachedRetriever(get_retriever(store_dir), maxsize=cache_size)
@@ -1,62 +1,249 @@
-import csv, json, yaml
+import argparse, csv, hashlib, json, os
 from pathlib import Path
 
-from src.fetchers.adzuna import fetch_adzuna, normalize as normalize_adzuna
-from src.fetchers.jobspy import fetch_jobspy, normalize as normalize_jobspy
+from src import metrics
+from src.orchestrator import fetch_all, stream_all
+from src.store import CSV_COLS, JobStore, dedupe, fuzzy_key
 
 ROOT = Path(__file__).resolve().parents[1]
-cfg = yaml.safe_load(open(ROOT / "configs/sources.yaml"))
+CONFIG_PATH = ROOT / "configs/sources.yaml"
 
 
-def main():
-    out_jsonl = ROOT / "data/jobs_raw.jsonl"
-    out_csv = ROOT / "data/jobs.csv"
-    out_jsonl.parent.mkdir(parents=True, exist_ok=True)
+def load_config(path=CONFIG_PATH) -> dict:
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_COLS)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: r.get(k) for k in CSV_COLS})
+
+
+class Checkpoint:
+    """
+    Units of fetch work (a jobspy query, an Adzuna page) already written by an
+    interrupted streaming run, plus that run's id. Tied to a hash of the query
+    config so a changed config starts over.
+    """
+
+    def __init__(self, path, config: dict):
+        self.path = Path(path)
+        self.config_hash = hashlib.sha1(
+            json.dumps(config, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        self.run_id = None
+        self.done: set[str] = set()
+
+    def load(self) -> bool:
+        if not self.path.exists():
+            return False
+        state = json.loads(self.path.read_text())
+        if state.get("config") != self.config_hash:
+            print("Fetch config changed since the checkpoint; starting over")
+            return False
+        self.run_id, self.done = state["run_id"], set(state["done"])
+        return True
+
+    def mark(self, unit: str) -> None:
+        self.done.add(unit)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"config": self.config_hash, "run_id": self.run_id, "done": sorted(self.done)})
+        )
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class StreamWriter:
+    """
+    Sink for `orchestrator.stream_all`: takes each finished unit's records, drops
+    repeats, appends to jobs_raw.jsonl / jobs.csv, flushes, updates the job
+    store and only then marks the unit done in the checkpoint.
+    """
+
+    def __init__(self, out_jsonl, out_csv, store: JobStore, checkpoint: Checkpoint, append: bool):
+        mode = "a" if append else "w"
+        self.jsonl = open(out_jsonl, mode, encoding="utf-8")
+        csv_exists = append and Path(out_csv).exists()
+        self.seen_ids, self.seen_keys = set(), set()
+        if csv_exists:  # rebuild the de-dup sets from what the earlier attempt wrote
+            with open(out_csv, encoding="utf-8") as f:
+                for r in csv.DictReader(f):
+                    self.seen_ids.add(r["src_id"])
+                    self.seen_keys.add(fuzzy_key(r))
+        self.csv_file = open(out_csv, mode, newline="", encoding="utf-8")
+        self.csv = csv.DictWriter(self.csv_file, fieldnames=CSV_COLS)
+        if not csv_exists:
+            self.csv.writeheader()
+        self.store, self.checkpoint = store, checkpoint
+        self.counts = {"new": 0, "changed": 0, "unchanged": 0, "duplicate": 0}
+        self.raw_count = self.row_count = 0
+
+    def __call__(self, unit, pairs):
+        pairs, rows = list(pairs), []
+        for raw, n in pairs:
+            self.jsonl.write(json.dumps(raw, ensure_ascii=False, default=str) + "\n")
+            fk = fuzzy_key(n)
+            if n.get("src_id") in self.seen_ids or fk in self.seen_keys:
+                continue
+            self.seen_ids.add(n.get("src_id"))
+            self.seen_keys.add(fk)
+            rows.append(n)
+            self.csv.writerow({k: n.get(k) for k in CSV_COLS})
+        self.jsonl.flush()
+        self.csv_file.flush()
+        for k, v in self.store.upsert(rows, self.checkpoint.run_id).items():
+            self.counts[k] += v
+        self.store.add_raw(pairs, self.checkpoint.run_id)
+        self.raw_count += len(pairs)
+        self.row_count += len(rows)
+        self.checkpoint.mark(unit)
+
+    def close(self):
+        self.jsonl.close()
+        self.csv_file.close()
 
-    all_jobs = []
+
+def _main_stream(cfg: dict, out_jsonl, out_csv, store: JobStore, incremental: bool, resume: bool):
     global_params = cfg.get("global_params", {})
+    checkpoint = Checkpoint(
+        out_jsonl.parent / "fetch_checkpoint.json",
+        {"queries": cfg["queries"], "global_params": global_params},
+    )
+    resumed = resume and checkpoint.load()
+    if resumed:
+        print(f"Resuming run {checkpoint.run_id}: {len(checkpoint.done)} units already written")
+    else:
+        checkpoint.run_id = store.start_run()
+    writer = StreamWriter(out_jsonl, out_csv, store, checkpoint, append=resumed)
+    try:
+        with metrics.timer("stage_seconds", stage="fetch"):
+            stream_all(cfg["queries"], global_params, cfg.get("fetch", {}), writer, checkpoint.done)
+    finally:
+        writer.close()
+    checkpoint.clear()
+
+    c = writer.counts
+    print(
+        f"Job store run {checkpoint.run_id}: {c['new']} new, {c['changed']} changed, "
+        f"{c['unchanged']} unchanged, {c['duplicate']} duplicate"
+    )
+    rows = writer.row_count
+    if incremental:
+        new = store.new_since(checkpoint.run_id)
+        _write_csv(out_csv, new)
+        rows = len(new)
+    print(f"Wrote {out_csv} ({rows} rows) and {out_jsonl}")
+
+
+def main(
+    incremental: bool = False,
+    store_path=ROOT / "data/jobs.sqlite",
+    stream: bool = False,
+    resume: bool = False,
+    out_dir=ROOT / "data",
+    parquet_dir=None,
+    config: dict | None = None,
+):
+    """
+    Fetch every configured query, record the postings in the job store and write
+    jobs.csv. With `incremental`, jobs.csv holds only postings that are new or
+    changed since earlier runs, so ranking skips repeats.
 
-    for q in cfg["queries"]:
-        source = q.get("source", "adzuna")
+    With `stream`, records are written and flushed as each query/page finishes
+    instead of at the end, and progress is checkpointed; `resume` continues an
+    interrupted streaming run from its last completed query or page.
 
-        if source == "adzuna":
-            jobs = fetch_adzuna(query=q, global_params=global_params)
-            normalized = [normalize_adzuna(j) for j in jobs]
-        elif source == "jobspy":
-            jobs = fetch_jobspy(query=q, global_params=global_params)
-            normalized = [normalize_jobspy(j) for j in jobs]
-        else:
-            print(f"Unknown source: {source}, skipping")
-            continue
+    With `parquet_dir`, the raw and normalized records are also appended to the
+    Parquet datasets there (see `src.columnar`), partitioned by fetch date and
+    source. Streaming runs write their units as they go, so they skip this.
 
-        all_jobs.extend([(j, n) for j, n in zip(jobs, normalized)])
+    `config` is the parsed sources config (default: read from configs/sources.yaml).
+    """
+    cfg = config if config is not None else load_config()
+    out_jsonl = Path(out_dir) / "jobs_raw.jsonl"
+    out_csv = Path(out_dir) / "jobs.csv"
+    out_jsonl.parent.mkdir(parents=True, exist_ok=True)
+    store = JobStore(store_path)
+
+    if stream or resume:
+        if parquet_dir:
+            print("Parquet output is written by batch runs only; ignoring it for --stream")
+        try:
+            _main_stream(cfg, out_jsonl, out_csv, store, incremental, resume)
+        finally:
+            store.close()
+        return
+
+    global_params = cfg.get("global_params", {})
+    with metrics.timer("stage_seconds", stage="fetch"):
+        all_jobs = fetch_all(cfg["queries"], global_params, cfg.get("fetch", {}))
 
     # write raw
-    with open(out_jsonl, "w", encoding="utf-8") as f:
+    with metrics.timer("stage_seconds", stage="write_raw"), open(out_jsonl, "w", encoding="utf-8") as f:
         for raw, _ in all_jobs:
             f.write(json.dumps(raw, ensure_ascii=False, default=str) + "\n")
 
-    # normalized CSV
-    rows = [n for _, n in all_jobs]
-    cols = [
-        "src_id",
-        "title",
-        "company",
-        "location",
-        "created",
-        "salary_min",
-        "salary_max",
-        "redirect_url",
-        "description",
-    ]
-    with open(out_csv, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=cols)
-        w.writeheader()
-        for r in rows:
-            w.writerow({k: r.get(k) for k in cols})
+    # de-duplicate across queries/sites, then across runs via the store
+    with metrics.timer("stage_seconds", stage="store"):
+        rows = dedupe([n for _, n in all_jobs])
+        run_id = store.start_run()
+        counts = store.upsert(rows, run_id)
+        store.add_raw(all_jobs, run_id)
+    print(
+        f"Job store run {run_id}: {counts['new']} new, {counts['changed']} changed, "
+        f"{counts['unchanged']} unchanged, {counts['duplicate']} duplicate "
+        f"({len(all_jobs) - len(rows)} repeats dropped within this run)"
+    )
+    if incremental:
+        rows = store.new_since(run_id)
+    store.close()
 
+    # normalized CSV
+    _write_csv(out_csv, rows)
     print(f"Wrote {out_csv} ({len(rows)} rows) and {out_jsonl}")
+    if parquet_dir:
+        from src import columnar
+
+        with metrics.timer("stage_seconds", stage="write_parquet"):
+            raw_rows = ({"src_id": n.get("src_id"), "data": raw} for raw, n in all_jobs)
+            columnar.write_rows(parquet_dir, "raw", raw_rows)
+            columnar.write_rows(parquet_dir, "normalized", rows)
+        print(f"Appended {len(all_jobs)} raw and {len(rows)} normalized rows to {parquet_dir}")
+
+
+def cli(argv=None):
+    from dotenv import load_dotenv
+
+    ap = argparse.ArgumentParser(description="Fetch jobs from the configured sources.")
+    ap.add_argument(
+        "--incremental", action="store_true", help="write only new or changed postings to jobs.csv"
+    )
+    ap.add_argument("--stream", action="store_true", help="write results as each query/page finishes")
+    ap.add_argument("--resume", action="store_true", help="continue an interrupted --stream run")
+    ap.add_argument("--config", default=CONFIG_PATH, help="sources config (default: configs/sources.yaml)")
+    ap.add_argument("--parquet", default=None, metavar="DIR", help="also append to Parquet datasets in DIR")
+    ap.add_argument("--metrics", default=None, help="also write run metrics here (.json or .prom)")
+    args = ap.parse_args(argv)
+    load_dotenv()
+    main(
+        incremental=args.incremental,
+        stream=args.stream,
+        resume=args.resume,
+        parquet_dir=args.parquet,
+        config=load_config(args.config),
+    )
+    print(metrics.summary())
+    if args.metrics:
+        metrics.write(args.metrics)
 
 
 if __name__ == "__main__":
-    main()
+    cli()
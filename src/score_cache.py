@@ -0,0 +1,104 @@
+import hashlib, json, sqlite3, time
+from pathlib import Path
+from src import metrics
+
+
+def fingerprint(*parts) -> str:
+    """Stable sha256 over JSON-serialisable parts."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    Persistent LLM score cache in SQLite, keyed by a content hash of everything
+    that went into the prompt.
+
+    `namespace` should fingerprint the inputs shared by every entry (profile,
+    prompt template, model, schema); when it changes the whole cache is dropped.
+    Entries older than `ttl_days` are treated as misses, and `evict()` trims the
+    table to `max_entries` least-recently-used rows.
+    """
+
+    def __init__(
+        self,
+        path="data/score_cache.sqlite",
+        namespace: str = "",
+        ttl_days: float | None = 30,
+        max_entries: int | None = 50_000,
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS scores (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS scores_last_used ON scores(last_used);
+            CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT);
+            """
+        )
+        row = self.db.execute("SELECT v FROM meta WHERE k='namespace'").fetchone()
+        if row is None or row[0] != namespace:
+            if row is not None:
+                print("Score cache inputs changed (profile/prompt/model); clearing cache")
+            self.db.execute("DELETE FROM scores")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('namespace', ?)", (namespace,))
+        self.db.commit()
+
+    def get(self, key: str) -> dict | None:
+        row = self.db.execute("SELECT data, created FROM scores WHERE key=?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.ttl and now - row[1] > self.ttl):
+            self.misses += 1
+            metrics.inc("score_cache_total", result="miss")
+            return None
+        self.hits += 1
+        metrics.inc("score_cache_total", result="hit")
+        self.db.execute("UPDATE scores SET last_used=? WHERE key=?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, data: dict) -> None:
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+            (key, json.dumps(data, ensure_ascii=False), now, now),
+        )
+        self.db.commit()
+
+    def evict(self) -> int:
+        """Drop expired rows, then least-recently-used rows beyond `max_entries`."""
+        removed = 0
+        if self.ttl:
+            removed += self.db.execute(
+                "DELETE FROM scores WHERE created < ?", (time.time() - self.ttl,)
+            ).rowcount
+        if self.max_entries:
+            removed += self.db.execute(
+                "DELETE FROM scores WHERE key IN (SELECT key FROM scores "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        self.db.commit()
+        return removed
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        size = self.db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size,
+        }
+
+    def close(self) -> None:
+        self.evict()
+        self.db.commit()
+        self.db.close()
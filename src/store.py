@@ -0,0 +1,340 @@
+import csv, hashlib, json, re, sqlite3, time
+from pathlib import Path
+
+# Columns of a normalized job row (jobs.csv)
+CSV_COLS = [
+    "src_id",
+    "title",
+    "company",
+    "location",
+    "created",
+    "salary_min",
+    "salary_max",
+    "redirect_url",
+    "description",
+]
+
+# Fields that define "the same posting content"; a change re-queues the job for ranking.
+CONTENT_FIELDS = ("title", "company", "location", "description", "salary_min", "salary_max")
+
+
+def fuzzy_key(r: dict) -> str:
+    """Normalized title|company|location, for spotting one posting listed under several ids."""
+
+    def norm(v):
+        return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", str(v or "").lower())).strip()
+
+    return "|".join(norm(r.get(k)) for k in ("title", "company", "location"))
+
+
+def content_hash(r: dict) -> str:
+    blob = json.dumps([r.get(k) for k in CONTENT_FIELDS], default=str, ensure_ascii=False)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def dedupe(rows: list[dict]) -> list[dict]:
+    """Drop repeats within one batch by src_id or fuzzy key, keeping the first seen."""
+    seen_ids, seen_keys, out = set(), set(), []
+    for r in rows:
+        fk = fuzzy_key(r)
+        if r.get("src_id") in seen_ids or fk in seen_keys:
+            continue
+        seen_ids.add(r.get("src_id"))
+        seen_keys.add(fk)
+        out.append(r)
+    return out
+
+
+def _chunks(seq, n=500):
+    seq = list(seq)
+    for i in range(0, len(seq), n):
+        yield seq[i : i + n]
+
+
+class JobStore:
+    """
+    Pipeline database (SQLite, WAL mode). Holds every posting ever fetched,
+    keyed on `src_id`, with first-seen/last-seen timestamps and a content hash
+    to detect edits, alongside raw payloads, LLM scores and enrichment text.
+    Each fetch is a numbered run so callers can ask what is new since then.
+    The CSV files the stages used to exchange are exports of these tables.
+    """
+
+    def __init__(self, path="data/jobs.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # callers that share a store across threads serialize access themselves
+        self.db = sqlite3.connect(str(path), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                src_id TEXT PRIMARY KEY,
+                source TEXT NOT NULL DEFAULT '',
+                created TEXT,
+                fuzzy_key TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                data TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                first_run INTEGER NOT NULL,
+                changed_run INTEGER NOT NULL,
+                seen_run INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS raw_jobs (
+                src_id TEXT PRIMARY KEY,
+                run_id INTEGER NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS scores (
+                external_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                score REAL,
+                job_hash TEXT,
+                model TEXT,
+                data TEXT NOT NULL,
+                scored_at REAL NOT NULL,
+                PRIMARY KEY (external_id, stage)
+            );
+            CREATE TABLE IF NOT EXISTS enrichment (
+                external_id TEXT PRIMARY KEY,
+                url TEXT,
+                text TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_fuzzy ON jobs(fuzzy_key);
+            CREATE INDEX IF NOT EXISTS jobs_changed_run ON jobs(changed_run);
+            CREATE INDEX IF NOT EXISTS jobs_source ON jobs(source);
+            CREATE INDEX IF NOT EXISTS jobs_created ON jobs(created);
+            CREATE INDEX IF NOT EXISTS jobs_first_seen ON jobs(first_seen);
+            CREATE INDEX IF NOT EXISTS scores_stage_score ON scores(stage, score DESC);
+            """
+        )
+
+    def start_run(self) -> int:
+        cur = self.db.execute("INSERT INTO runs (started) VALUES (?)", (time.time(),))
+        self.db.commit()
+        return cur.lastrowid
+
+    def last_run(self) -> int | None:
+        return self.db.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+
+    def _existing(self, column: str, values) -> dict:
+        """Map `column` value -> (src_id, content_hash) for rows matching any of `values`."""
+        out = {}
+        for chunk in _chunks(set(values)):
+            marks = ",".join("?" * len(chunk))
+            for row in self.db.execute(
+                f"SELECT {column} AS k, src_id, content_hash FROM jobs WHERE {column} IN ({marks})",
+                chunk,
+            ):
+                out.setdefault(row["k"], (row["src_id"], row["content_hash"]))
+        return out
+
+    def upsert(self, rows: list[dict], run_id: int) -> dict:
+        """
+        Record `rows` as seen in `run_id` using bulk statements. Returns counts of
+        new, changed, unchanged and duplicate (same fuzzy key under another src_id) rows.
+        """
+        now = time.time()
+        counts = {"new": 0, "changed": 0, "unchanged": 0, "duplicate": 0}
+        prepared = [(r, r.get("src_id"), fuzzy_key(r), content_hash(r)) for r in rows]
+        by_id = self._existing("src_id", [p[1] for p in prepared])
+        by_key = self._existing("fuzzy_key", [p[2] for p in prepared if p[1] not in by_id])
+
+        inserts, changes, seen = [], [], []
+        for r, sid, fk, h in prepared:
+            if sid in by_id:
+                if by_id[sid][1] != h:
+                    changes.append((fk, h, json.dumps(r, default=str, ensure_ascii=False),
+                                    r.get("created"), now, run_id, run_id, sid))
+                    counts["changed"] += 1
+                else:
+                    seen.append((now, run_id, sid))
+                    counts["unchanged"] += 1
+            elif fk in by_key:
+                seen.append((now, run_id, by_key[fk][0]))
+                counts["duplicate"] += 1
+            else:
+                inserts.append((sid, str(sid).split(":", 1)[0], r.get("created"), fk, h,
+                                json.dumps(r, default=str, ensure_ascii=False),
+                                now, now, run_id, run_id, run_id))
+                by_id[sid] = by_key[fk] = (sid, h)
+                counts["new"] += 1
+
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO jobs (src_id, source, created, fuzzy_key, content_hash, data, "
+                "first_seen, last_seen, first_run, changed_run, seen_run) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                inserts,
+            )
+            self.db.executemany(
+                "UPDATE jobs SET fuzzy_key=?, content_hash=?, data=?, created=?, last_seen=?, "
+                "changed_run=?, seen_run=? WHERE src_id=?",
+                changes,
+            )
+            self.db.executemany("UPDATE jobs SET last_seen=?, seen_run=? WHERE src_id=?", seen)
+        return counts
+
+    def add_raw(self, pairs, run_id: int) -> None:
+        """Bulk-store raw source payloads from `(raw, normalized)` pairs."""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO raw_jobs VALUES (?, ?, ?)",
+                (
+                    (n.get("src_id"), run_id, json.dumps(raw, default=str, ensure_ascii=False))
+                    for raw, n in pairs
+                ),
+            )
+
+    def new_since(self, run_id: int) -> list[dict]:
+        """Jobs first seen or changed in `run_id` or later."""
+        cur = self.db.execute(
+            "SELECT data FROM jobs WHERE changed_run >= ? ORDER BY rowid", (run_id,)
+        )
+        return [json.loads(row["data"]) for row in cur]
+
+    def jobs(self, source: str | None = None, since: str | None = None) -> list[dict]:
+        """Normalized jobs, optionally only from `source` and/or created on or after `since`."""
+        sql, args = "SELECT data FROM jobs WHERE 1=1", []
+        if source:
+            sql += " AND source=?"
+            args.append(source)
+        if since:
+            sql += " AND created >= ?"
+            args.append(since)
+        return [json.loads(row["data"]) for row in self.db.execute(sql + " ORDER BY rowid", args)]
+
+    def unscored(self, stage: str = "rank", model: str | None = None) -> list[dict]:
+        """
+        Jobs with no `stage` score yet, or whose content changed since they were
+        scored; with `model`, also those scored by a different model.
+        """
+        cur = self.db.execute(
+            "SELECT j.data FROM jobs j LEFT JOIN scores s "
+            "ON s.external_id = j.src_id AND s.stage = ? "
+            "WHERE s.external_id IS NULL OR s.job_hash != j.content_hash "
+            "OR (? IS NOT NULL AND s.model IS NOT ?) ORDER BY j.rowid",
+            (stage, model, model),
+        )
+        return [json.loads(row["data"]) for row in cur]
+
+    def outdated_reranks(self, model: str) -> list[dict]:
+        """First-pass rows of jobs whose rerank score came from another model or older content."""
+        cur = self.db.execute(
+            "SELECT r.data FROM scores rr "
+            "JOIN scores r ON r.external_id = rr.external_id AND r.stage = 'rank' "
+            "JOIN jobs j ON j.src_id = rr.external_id "
+            "WHERE rr.stage = 'rerank' AND (rr.model IS NOT ? OR rr.job_hash != j.content_hash) "
+            "ORDER BY r.score DESC",
+            (model,),
+        )
+        return [json.loads(row["data"]) for row in cur]
+
+    def save_scores(self, scored: list[dict], stage: str = "rank", model: str | None = None) -> None:
+        now = time.time()
+        hashes = {
+            k: v[1] for k, v in self._existing("src_id", [s.get("external_id") for s in scored]).items()
+        }
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (s.get("external_id"), stage, _as_float(s.get("score")),
+                     hashes.get(s.get("external_id")), model,
+                     json.dumps(s, default=str, ensure_ascii=False), now)
+                    for s in scored
+                ),
+            )
+
+    def scores(self, stage: str = "rank", min_score: float | None = None, limit: int | None = None):
+        """Scored rows for `stage`, best first, served by the (stage, score) index."""
+        sql, args = "SELECT data FROM scores WHERE stage=?", [stage]
+        if min_score is not None:
+            sql += " AND score >= ?"
+            args.append(min_score)
+        sql += " ORDER BY score DESC"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [json.loads(row["data"]) for row in self.db.execute(sql, args)]
+
+    def best_scores(self) -> list[dict]:
+        """Every scored job, using its enriched rerank score where there is one."""
+        cur = self.db.execute(
+            "SELECT COALESCE(rr.data, r.data) AS data FROM scores r "
+            "LEFT JOIN scores rr ON rr.external_id = r.external_id AND rr.stage = 'rerank' "
+            "WHERE r.stage = 'rank' ORDER BY COALESCE(rr.score, r.score) DESC"
+        )
+        return [json.loads(row["data"]) for row in cur]
+
+    def save_enrichment(self, rows) -> None:
+        """Bulk-store `(external_id, url, text)` tuples."""
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO enrichment VALUES (?, ?, ?, ?)",
+                ((eid, url, text, now) for eid, url, text in rows),
+            )
+
+    def get(self, src_id: str) -> dict | None:
+        row = self.db.execute("SELECT * FROM jobs WHERE src_id=?", (src_id,)).fetchone()
+        return dict(row) if row else None
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def _as_float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _write_csv(path, rows, cols) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=cols)
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: r.get(k, "") for k in cols})
+    print(f"Wrote {path} ({len(rows)} rows)")
+
+
+def export_csv(store: JobStore, kind: str, path) -> None:
+    """Write one of the classic CSV hand-off files from the database."""
+    if kind == "jobs":
+        _write_csv(path, store.jobs(), CSV_COLS)
+        return
+    from src.structured import RANK_SCHEMA
+
+    rows = store.scores("rank") if kind == "ranked" else store.best_scores()
+    _write_csv(path, rows, list(RANK_SCHEMA.keys()))
+
+
+def cli(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Job database utilities.")
+    ap.add_argument("--db", default="data/jobs.sqlite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ex = sub.add_parser("export", help="export a table as one of the pipeline CSVs")
+    ex.add_argument("kind", choices=["jobs", "ranked", "top_k"])
+    ex.add_argument("--out", help="output path (default: the usual data/*.csv)")
+    args = ap.parse_args(argv)
+
+    default_out = {"jobs": "data/jobs.csv", "ranked": "data/jobs_ranked.csv", "top_k": "data/jobs_top_k.csv"}
+    store = JobStore(args.db)
+    export_csv(store, args.kind, args.out or default_out[args.kind])
+    store.close()
+
+
+if __name__ == "__main__":
+    cli()
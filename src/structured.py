@@ -0,0 +1,132 @@
+import json, re
+
+# Columns of a scored job: the model's reply plus fields copied from the job row
+RANK_SCHEMA = {
+    "id": "<int | null> (local DB id if present)",
+    "external_id": "<string> (unique key like 'adzuna:123456')",
+    "description": "<string> (job description text)",
+    "redirect_url": "<string> (job posting URL)",
+    "company": "<string> (company name)",
+    "title": "<string> (job title)",
+    "location": "<string> (job location)",
+    "score": "<int 0-100, higher = better fit>",
+    "why": "<short summary <=280 chars>",
+    "level_fit": "<one of: junior | mid | senior | staff | unknown>",
+    "tech_fit": ["<relevant tech keywords>"],
+    "location_fit": "<perfect | ok | poor>",
+    "relevance_tags": ["<keywords like fintech, backend, ai>"],
+    "summary": "<1-2 sentence human-readable job synopsis>",
+    "concerns": ["<potential issues or mismatches>"],
+}
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.S | re.I)
+
+LEVEL_ORDER = ("junior", "mid", "senior", "staff")
+LEVELS = {*LEVEL_ORDER, "unknown"}
+LOCATION_FITS = {"perfect", "ok", "poor"}
+LIST_FIELDS = ("tech_fit", "relevance_tags", "concerns")
+TEXT_FIELDS = ("why", "summary")
+WHY_CHARS = 280
+
+
+def _close(text: str) -> str:
+    """Close the strings, arrays and objects left open at the end of `text`."""
+    stack, in_str, esc = [], False, False
+    for ch in text:
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if in_str:
+        text += '"'
+    return text.rstrip().rstrip(",") + "".join(reversed(stack))
+
+
+def _repair_truncated(text: str, attempts: int = 50):
+    """
+    Salvage a reply cut off mid-JSON: close it as is, else drop back to each
+    earlier comma (losing the half-written field) and close that.
+    """
+    cuts = [len(text)] + [i for i in range(len(text) - 1, 0, -1) if text[i] == ","][:attempts]
+    for cut in cuts:
+        try:
+            return json.loads(_close(text[:cut]))
+        except ValueError:
+            continue
+    raise ValueError("truncated beyond repair")
+
+
+def loads_lenient(text: str):
+    """
+    Parse a model reply as JSON, tolerating markdown fences, prose around the
+    JSON and replies truncated mid-object. Raises ValueError when nothing usable is left.
+    """
+    if text is None:
+        raise ValueError("empty reply")
+    m = _FENCE.search(text)
+    if m:
+        text = m.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON object in reply")
+    text = text[min(starts):].strip()
+    try:
+        obj, _ = json.JSONDecoder().raw_decode(text)
+        return obj
+    except ValueError:
+        pass
+    return _repair_truncated(text)
+
+
+def _score(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"bad score {value!r}")
+    if isinstance(value, (int, float)):
+        n = float(value)
+    else:
+        m = re.search(r"-?\d+(?:\.\d+)?", str(value or ""))
+        if not m:
+            raise ValueError(f"bad score {value!r}")
+        n = float(m.group())
+    return int(round(min(100.0, max(0.0, n))))
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None]
+    return [s.strip() for s in str(value).split(",") if s.strip()]
+
+
+def coerce_score(data) -> dict:
+    """
+    Validate one scoring reply against the rank schema, coercing near-misses:
+    "85" or "85/100" scores, comma-separated strings for list fields, unknown
+    enum values. Raises ValueError if there is no usable score.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"expected an object, got {type(data).__name__}")
+    if "score" not in data:
+        raise ValueError("missing score")
+    out = dict(data)
+    out["score"] = _score(data["score"])
+    for k in LIST_FIELDS:
+        out[k] = _as_list(data.get(k))
+    for k in TEXT_FIELDS:
+        out[k] = "" if data.get(k) is None else str(data[k])
+    out["why"] = out["why"][:WHY_CHARS]
+    level = str(data.get("level_fit") or "").strip().lower()
+    out["level_fit"] = level if level in LEVELS else "unknown"
+    loc = str(data.get("location_fit") or "").strip().lower()
+    out["location_fit"] = loc if loc in LOCATION_FITS else ""
+    return out
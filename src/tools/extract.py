@@ -0,0 +1,178 @@
+import html as html_lib, json, re
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+MAX_CHARS = 8000  # keep enriched text LLM-friendly
+CHUNK = 16 * 1024  # fast path feeds the parser this much HTML at a time
+
+SKIP = {"script", "style", "nav", "footer", "header", "noscript", "svg", "template"}
+CONTENT = {"h1", "h2", "p", "li"}
+VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+_LD_JSON = re.compile(r"<script[^>]*application/ld\+json[^>]*>(.*?)</script>", re.I | re.S)
+_WS = re.compile(r"\s+")
+
+
+def _clean(parts, limit: int) -> str:
+    return _WS.sub(" ", " ".join(parts)).strip()[:limit]
+
+
+class _TextParser(HTMLParser):
+    """
+    Streaming text collector. Without `roots` it keeps text inside h1/h2/p/li
+    (what the BeautifulSoup extractor selected); with `roots` — (attr, value)
+    pairs such as ("id", "content") — it keeps all text under matching elements;
+    with `keep_all` it keeps everything.
+    Script/style/nav/footer/header subtrees are always dropped.
+    """
+
+    def __init__(self, roots=None, keep_all=False):
+        super().__init__(convert_charrefs=True)
+        self.roots = roots
+        self.keep_all = keep_all
+        self.parts: list[str] = []
+        self.size = 0
+        self._stack: list[tuple] = []
+        self._skip = 0  # open SKIP elements
+        self._keep = int(keep_all)  # open elements whose text we keep
+
+    def _matches(self, attrs) -> bool:
+        for name, value in attrs:
+            if value is None:
+                continue
+            for attr, want in self.roots:
+                if name == attr and (value == want if attr == "id" else want in value.split()):
+                    return True
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID:
+            return
+        keep = not self.keep_all and (self._matches(attrs) if self.roots else tag in CONTENT)
+        self._stack.append((tag, tag in SKIP, keep))
+        self._skip += tag in SKIP
+        self._keep += keep
+
+    def handle_endtag(self, tag):
+        # tolerate unclosed <p>/<li>: pop back to the matching open tag, if any
+        if not any(t == tag for t, _, _ in self._stack):
+            return
+        while self._stack:
+            t, skip, keep = self._stack.pop()
+            self._skip -= skip
+            self._keep -= keep
+            if t == tag:
+                break
+
+    def handle_data(self, data):
+        if self._keep and not self._skip:
+            data = data.strip()
+            if data:
+                self.parts.append(data)
+                self.size += len(data) + 1
+
+
+def _stream(html: str, limit: int, roots=None, keep_all=False) -> str:
+    """Feed the document in chunks and stop once `limit` characters are collected."""
+    p = _TextParser(roots, keep_all)
+    for i in range(0, len(html), CHUNK):
+        p.feed(html[i : i + CHUNK])
+        if p.size >= limit:
+            break
+    else:
+        p.close()
+    return _clean(p.parts, limit)
+
+
+def extract_fast(html: str, limit: int = MAX_CHARS) -> str:
+    """Generic extractor: stdlib streaming parser, early exit at the character budget."""
+    return _stream(html, limit)
+
+
+def extract_soup(html: str, limit: int = MAX_CHARS) -> str:
+    """The original BeautifulSoup path; kept as the quality reference for benchmarks."""
+    import bs4
+
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    for t in soup(["script", "style", "nav", "footer", "header"]):
+        t.decompose()
+    text = " ".join(x.get_text(" ", strip=True) for x in soup.select("h1,h2,p,li"))
+    return _WS.sub(" ", text)[:limit]
+
+
+def _job_postings(data):
+    if isinstance(data, list):
+        for d in data:
+            yield from _job_postings(d)
+    elif isinstance(data, dict):
+        kind = data.get("@type")
+        if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+            yield data
+        yield from _job_postings(data.get("@graph", []))
+
+
+def _place(loc) -> str:
+    loc = loc[0] if isinstance(loc, list) and loc else loc
+    if not isinstance(loc, dict):
+        return ""
+    addr = loc.get("address") or {}
+    if isinstance(addr, str):
+        return addr
+    return ", ".join(
+        str(addr[k]) for k in ("addressLocality", "addressRegion", "addressCountry") if isinstance(addr.get(k), str)
+    )
+
+
+def extract_json_ld(html: str, limit: int = MAX_CHARS) -> str | None:
+    """Text from a schema.org `JobPosting` block (Workday and many ATS pages embed one)."""
+    for m in _LD_JSON.finditer(html):
+        try:
+            data = json.loads(m.group(1).strip())
+        except ValueError:
+            continue
+        for job in _job_postings(data):
+            org = job.get("hiringOrganization")
+            org = org.get("name") if isinstance(org, dict) else org
+            desc = html_lib.unescape(job.get("description") or "")
+            head = [job.get("title"), org, _place(job.get("jobLocation"))]
+            body = _stream(desc, limit, keep_all=True) if "<" in desc else desc
+            text = _clean([str(x) for x in head if x] + [body], limit)
+            if body:
+                return text
+    return None
+
+
+def _region(*roots):
+    return lambda html, limit=MAX_CHARS: _stream(html, limit, roots=list(roots)) or None
+
+
+# host suffix -> extractor; tried after JSON-LD, before the generic path
+SITE_EXTRACTORS = {
+    "greenhouse.io": _region(("class", "app-title"), ("id", "content"), ("class", "job__title"), ("class", "job__description")),
+    "lever.co": _region(("class", "posting-headline"), ("class", "section-wrapper")),
+}
+
+
+def _site_extractor(url: str | None):
+    host = (urlparse(url).hostname or "") if url else ""
+    for suffix, fn in SITE_EXTRACTORS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return fn
+    return None
+
+
+def extract_text(html: str, url: str | None = None, limit: int = MAX_CHARS) -> str:
+    """
+    Page text for the LLM, at most `limit` chars. Tries an embedded JobPosting,
+    then a site-specific extractor for `url`'s host, then the generic fast path.
+    """
+    if "ld+json" in html:
+        text = extract_json_ld(html, limit)
+        if text:
+            return text
+    site = _site_extractor(url)
+    if site:
+        text = site(html, limit)
+        if text:
+            return text
+    return extract_fast(html, limit)
@@ -1,4 +1,24 @@
-import requests, bs4, re
+from src import http_client
+from src.tools.extract import extract_text
+
+
+def fetch_page(url: str, etag: str | None = None, last_modified: str | None = None) -> dict:
+    """
+    Fetch a page, revalidating with the given validators when present.
+    Returns {status, text, etag, last_modified}; text is None on 304 (not modified).
+    """
+    r = http_client.conditional_get(url, etag=etag, last_modified=last_modified, timeout=8)
+    page = {
+        "status": r.status_code,
+        "text": None,
+        "etag": r.headers.get("ETag", etag),
+        "last_modified": r.headers.get("Last-Modified", last_modified),
+    }
+    if r.status_code == 200:
+        page["text"] = extract_text(r.text, url=r.url)
+    elif r.status_code != 304:
+        page["text"] = f"[error: http {r.status_code}]"
+    return page
 
 
 def fetch_url(url: str) -> str:
@@ -7,20 +27,7 @@ def fetch_url(url: str) -> str:
     Designed for LangChain tool use.
     """
     try:
-        r = requests.get(
-            url,
-            headers={"User-Agent": "jobs-agent/0.1 (+local)"},
-            timeout=8,
-            allow_redirects=True,
-        )
-        if r.status_code != 200:
-            return f"[error: http {r.status_code}]"
-        soup = bs4.BeautifulSoup(r.text, "html.parser")
-        for t in soup(["script", "style", "nav", "footer", "header"]):
-            t.decompose()
-        text = " ".join(x.get_text(" ", strip=True) for x in soup.select("h1,h2,p,li"))
-        text = re.sub(r"\s+", " ", text)
-        return text[:8000]  # truncate to stay LLM-friendly
+        return fetch_page(url)["text"]
     except Exception as e:
         print(f"Error fetching URL {url}: {e}")
         return f"[error: {e}]"
@@ -84,7 +84,7 @@ class TestUrl:
 class TestFetchAdzuna:
     @patch("src.fetchers.adzuna.APP_ID", "test_id")
     @patch("src.fetchers.adzuna.APP_KEY", "test_key")
-    @patch("src.fetchers.adzuna.requests.get")
+    @patch("src.fetchers.adzuna.http_client.get")
     def test_fetch_single_page(self, mock_get):
         mock_response = MagicMock()
         mock_response.json.return_value = {
@@ -105,7 +105,7 @@ class TestFetchAdzuna:
 
     @patch("src.fetchers.adzuna.APP_ID", "test_id")
     @patch("src.fetchers.adzuna.APP_KEY", "test_key")
-    @patch("src.fetchers.adzuna.requests.get")
+    @patch("src.fetchers.adzuna.http_client.get")
     def test_fetch_stops_on_empty_results(self, mock_get):
         mock_response = MagicMock()
         mock_response.json.return_value = {"results": []}
@@ -123,6 +123,7 @@ class TestFetchAdzuna:
 
     @patch("src.fetchers.adzuna.APP_ID", None)
     @patch("src.fetchers.adzuna.APP_KEY", None)
+    @patch.dict("os.environ", {"ADZUNA_APP_ID": "", "ADZUNA_APP_KEY": ""})
     def test_fetch_missing_credentials(self):
         with pytest.raises(AssertionError, match="Missing ADZUNA creds"):
             fetch_adzuna(query={}, global_params={})
@@ -0,0 +1,15 @@
+from benchmarks.bench_pipeline import compare, run_once
+
+
+class TestHarness:
+    def test_small_end_to_end_run(self):
+        r = run_once(120, llm_latency=0.0, error_rate=0.0, concurrency=8, batch_size=4)
+        assert r["fetched"] == r["ranked"] == 120
+        assert r["latency"]["stage_seconds[fetch]"]["count"] == 1
+        assert r["latency"]["fetch_seconds[adzuna]"]["count"] >= 2
+
+    def test_compare_flags_regressions(self):
+        base = {"jobs": 100, "fetch_jobs_per_s": 1000, "rank_jobs_per_s": 100, "peak_rss_mb": 200, "ranked": 99}
+        assert compare(dict(base, rank_jobs_per_s=80), base, 0.3) == []
+        problems = compare(dict(base, rank_jobs_per_s=50, peak_rss_mb=400), base, 0.3)
+        assert len(problems) == 2
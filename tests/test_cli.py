@@ -0,0 +1,59 @@
+import json, subprocess, sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src import cli
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _loaded(module: str, cwd=ROOT) -> set[str]:
+    """Top-level packages a fresh interpreter has loaded after importing `module`."""
+    code = f"import json, sys; import {module}; print(json.dumps(sorted({{k.split('.')[0] for k in sys.modules}})))"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, env={"PYTHONPATH": str(ROOT)}, capture_output=True, text=True,
+        check=True,
+    ).stdout
+    return set(json.loads(out.strip().splitlines()[-1]))
+
+
+class TestLazyImports:
+    @pytest.mark.parametrize("module", ["src.cli", "src.store", "src.columnar", "src.memory", "src.pipeline"])
+    def test_light_modules_load_no_heavy_libraries(self, module):
+        assert not _loaded(module) & {"pandas", "numpy", "langchain_core", "langchain_openai", "jobspy", "bs4"}
+
+    def test_rank_llm_defers_langchain_and_numpy(self):
+        heavy = {"langchain_core", "langchain_openai", "openai", "numpy", "pandas", "requests", "jobspy", "bs4"}
+        assert not _loaded("src.rank_llm") & heavy
+
+    def test_run_fetch_defers_jobspy_and_config(self):
+        assert not _loaded("src.run_fetch") & {"jobspy", "yaml", "dotenv"}
+
+    def test_imports_touch_no_files(self, tmp_path):
+        _loaded("src.rank_llm", cwd=tmp_path)
+        _loaded("src.run_fetch", cwd=tmp_path)
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestCli:
+    def test_help_lists_commands(self):
+        out = subprocess.run(
+            [sys.executable, "-m", "src", "--help"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        assert all(name in out for name in cli.COMMANDS)
+
+    def test_dispatches_remaining_args(self):
+        with patch("src.store.cli") as store_cli, patch.object(sys, "argv", ["pytest"]):
+            cli.main(["db", "--db", "x.sqlite", "export", "jobs"])
+        store_cli.assert_called_once_with(["--db", "x.sqlite", "export", "jobs"])
+
+    def test_enrich_cache_command(self, tmp_path, capsys):
+        with patch("src.enrich.CACHE_PATH", tmp_path / "pages.sqlite"), patch("src.enrich._cache", None):
+            cli.main(["enrich", "stats"])
+        assert "entries" in capsys.readouterr().out
+
+    def test_unknown_command_exits(self):
+        with pytest.raises(SystemExit):
+            cli.main(["frobnicate"])
@@ -0,0 +1,87 @@
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from src import columnar
+
+
+def _jobs(source, n, **extra):
+    return [
+        {"src_id": f"{source}:{i}", "title": f"Engineer {i}", "company": "Acme", "location": "NYC",
+         "created": "2024-05-01", "salary_min": 100000 + i, "salary_max": "", "redirect_url": f"https://x/{i}",
+         "description": "Python", **extra}
+        for i in range(n)
+    ]
+
+
+class TestCoerce:
+    def test_types(self):
+        assert columnar._coerce("", "float") is None
+        assert columnar._coerce("120000", "float") == 120000.0
+        assert columnar._coerce(float("nan"), "int") is None
+        assert columnar._coerce(float("nan"), "str") is None
+        assert columnar._coerce('["a", "b"]', "list") == ["a", "b"]
+        assert columnar._coerce("python", "list") == ["python"]
+        assert columnar._coerce({"a": [1]}, "json") == '{"a": [1]}'
+
+    def test_source_of(self):
+        assert columnar.source_of("adzuna:123") == "adzuna"
+        assert columnar.source_of(None) == "unknown"
+
+    def test_missing_pyarrow_is_a_clear_error(self, tmp_path):
+        with patch.dict(sys.modules, {"pyarrow": None}), pytest.raises(ImportError, match="pip install pyarrow"):
+            columnar.write_rows(tmp_path, "normalized", _jobs("adzuna", 1))
+
+
+@pytest.fixture
+def lake(tmp_path):
+    columnar.write_rows(tmp_path, "normalized", _jobs("adzuna", 3) + _jobs("indeed", 2), fetch_date="2024-05-01")
+    columnar.write_rows(tmp_path, "normalized", _jobs("adzuna", 4), fetch_date="2024-06-01")
+    return tmp_path
+
+
+class TestParquet:
+    def test_partitioned_by_date_and_source(self, lake):
+        assert (lake / "normalized" / "fetch_date=2024-05-01" / "source=indeed").is_dir()
+        assert columnar.summary(lake, "normalized") == [
+            {"fetch_date": "2024-05-01", "source": "adzuna", "rows": 3},
+            {"fetch_date": "2024-05-01", "source": "indeed", "rows": 2},
+            {"fetch_date": "2024-06-01", "source": "adzuna", "rows": 4},
+        ]
+
+    def test_projection_and_filters(self, lake):
+        rows = columnar.read_rows(
+            lake, "normalized", columns=["src_id", "title"],
+            filters=[("fetch_date", "=", "2024-05-01"), ("source", "=", "indeed")],
+        )
+        assert rows == [{"src_id": "indeed:0", "title": "Engineer 0"}, {"src_id": "indeed:1", "title": "Engineer 1"}]
+        assert columnar.latest_fetch_date(lake) == "2024-06-01"
+
+    def test_values_round_trip(self, lake):
+        row = columnar.read_rows(lake, "normalized", filters=[("src_id", "=", "indeed:1")])[0]
+        assert row["salary_min"] == 100001.0 and row["salary_max"] is None
+        assert row["description"] == "Python"
+
+    def test_raw_and_ranked_tables(self, tmp_path):
+        columnar.write_rows(tmp_path, "raw", [{"src_id": "adzuna:1", "data": {"company": {"display_name": "A"}}}])
+        assert columnar.read_rows(tmp_path, "raw")[0]["data"] == {"company": {"display_name": "A"}}
+        columnar.write_rows(tmp_path, "ranked", [{"external_id": "adzuna:1", "score": 80, "tech_fit": ["python"]}])
+        ranked = columnar.read_rows(tmp_path, "ranked", columns=["external_id", "score", "tech_fit"])
+        assert ranked == [{"external_id": "adzuna:1", "score": 80, "tech_fit": ["python"]}]
+
+    def test_missing_table_reads_empty(self, tmp_path):
+        assert columnar.read_rows(tmp_path, "ranked") == []
+        assert columnar.latest_fetch_date(tmp_path) is None
+
+    def test_rank_jobs_reads_latest_fetch_and_appends_ranked(self, lake):
+        from src.rank_llm import rank_jobs
+
+        profile = lake / "profile.md"
+        profile.write_text("Python engineer")
+        rank_jobs(
+            out_path=lake / "ranked.csv", top_k_path=lake / "top.csv", profile_path=profile,
+            cache_path=None, parquet_dir=lake, local_only=True,
+        )
+        ranked = columnar.read_rows(lake, "ranked", columns=["external_id"])
+        assert sorted(r["external_id"] for r in ranked) == [f"adzuna:{i}" for i in range(4)]
@@ -0,0 +1,57 @@
+import csv, json
+
+from src.compact import CompactionStats, compact, count_tokens
+from src.rank_llm import _job_payload
+from benchmarks.fakes import FakeChatModel, FakeRetriever, write_jobs_csv
+
+DESCRIPTION = (
+    "We build payment APIs in Python. You will own the ledger service. "
+    "We build payment APIs in Python. "
+    "Acme is an equal opportunity employer and considers applicants without regard to race, color or religion. "
+    "Benefits include medical, dental and vision plus a 401(k) match. "
+    "Experience with PostgreSQL is required."
+)
+
+
+class TestCompact:
+    def test_drops_boilerplate_and_repeats(self):
+        assert compact(DESCRIPTION) == (
+            "We build payment APIs in Python. You will own the ledger service. "
+            "Experience with PostgreSQL is required."
+        )
+
+    def test_trims_to_budget(self):
+        text = compact("Python " * 5000, budget=100)
+        assert count_tokens(text) <= 100 < count_tokens("Python " * 5000)
+
+    def test_stats_report(self):
+        stats = CompactionStats()
+        stats.add(400, 100)
+        stats.add(200, 100)
+        assert stats.report() == "Prompt compaction: 2 jobs, 300 -> 100 tokens/job (67% saved)"
+
+
+class TestRankPayload:
+    def test_payload_omits_passthrough_fields(self):
+        job = {"id": 7, "src_id": "a:1", "title": "T", "redirect_url": "https://x", "description": DESCRIPTION}
+        payload = _job_payload(job, job_tokens=800)
+        assert set(payload) == {"external_id", "title", "company", "location", "description"}
+        assert "401(k)" not in payload["description"]
+
+    def test_urls_and_descriptions_come_from_the_job_row(self, tmp_path, monkeypatch):
+        from src import rank_llm
+
+        monkeypatch.setattr("src.enrich.fetch_and_cache", lambda url, **kw: "[error: offline]")
+        monkeypatch.setattr("src.crawler.get_cached", lambda url: None)
+        monkeypatch.setattr("src.crawler.fetch_robots", lambda base: None)
+        jobs = tmp_path / "jobs.csv"
+        write_jobs_csv(jobs, 3)
+        rank_llm.rank_jobs(
+            jobs_csv=jobs, out_path=tmp_path / "r.csv", top_k_path=tmp_path / "t.csv",
+            llm=FakeChatModel(), retriever=FakeRetriever(), cache_path=None,
+            crawler_opts={"host_delay": 0},
+        )
+        rows = list(csv.DictReader((tmp_path / "r.csv").open(encoding="utf-8")))
+        assert {r["redirect_url"] for r in rows} == {f"https://example.com/jobs/{i}" for i in range(3)}
+        assert all(r["description"].startswith("Build backend services") for r in rows)
+        assert "redirect_url" not in json.dumps(rank_llm.SCORE_SCHEMA)
@@ -0,0 +1,69 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src import http_client
+from src.crawler import Crawler
+from benchmarks.stub_server import StubServer
+
+
+class Recorder:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.starts = {}
+
+    def __call__(self, url, pause=0.3):
+        self.starts[url] = time.monotonic()
+        time.sleep(self.latency)
+        return f"text of {url}"
+
+
+@pytest.fixture(autouse=True)
+def no_cache():
+    with patch("src.crawler.get_cached", return_value=None):
+        yield
+
+
+class TestCrawler:
+    def test_spaces_requests_per_host_but_not_across_hosts(self):
+        fetch = Recorder()
+        c = Crawler(fetch=fetch, host_delay=0.1, respect_robots=False)
+        urls = [f"http://a.test/{i}" for i in range(3)] + [f"http://b.test/{i}" for i in range(3)]
+        t0 = time.monotonic()
+        out = c.crawl(urls)
+        assert out["http://a.test/2"] == "text of http://a.test/2"
+
+        a = sorted(fetch.starts[u] for u in urls[:3])
+        assert all(y - x >= 0.09 for x, y in zip(a, a[1:]))
+        assert fetch.starts["http://b.test/0"] - t0 < 0.05  # b.test is not held up by a.test
+
+    def test_global_parallelism(self):
+        fetch = Recorder(latency=0.1)
+        c = Crawler(fetch=fetch, max_workers=8, host_delay=0, respect_robots=False)
+        t0 = time.monotonic()
+        c.crawl([f"http://h{i}.test/" for i in range(8)])
+        assert time.monotonic() - t0 < 0.3
+
+    def test_time_budget(self):
+        c = Crawler(fetch=Recorder(), host_delay=0.2, budget_s=0.1, respect_robots=False)
+        out = c.crawl([f"http://a.test/{i}" for i in range(3)])
+        assert out["http://a.test/0"].startswith("text of")
+        assert out["http://a.test/2"] == "[error: enrichment time budget exceeded]"
+
+    def test_empty_url(self):
+        assert Crawler(fetch=Recorder()).crawl([""]) == {"": "[error: no url]"}
+
+    def test_robots_rules_and_crawl_delay(self):
+        robots = "User-agent: *\nDisallow: /private\nCrawl-delay: 1\n"
+        s = http_client.make_session(retries=0, backoff=0)
+        with patch.object(http_client, "_session", s), StubServer(
+            {"/robots.txt": lambda h: (200, {}, robots)}
+        ) as srv:
+            fetch = Recorder()
+            c = Crawler(fetch=fetch, host_delay=0)
+            out = c.crawl([srv.url + "/private/1", srv.url + "/jobs/1", srv.url + "/jobs/2"])
+            assert srv.hits["/robots.txt"] == 1
+
+        assert out[srv.url + "/private/1"] == "[error: disallowed by robots.txt]"
+        assert abs(fetch.starts[srv.url + "/jobs/2"] - fetch.starts[srv.url + "/jobs/1"]) >= 0.99  # robotparser only reads whole seconds
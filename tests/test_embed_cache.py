@@ -0,0 +1,40 @@
+from src.embed_cache import CachedEmbeddings, EmbeddingCache, text_key
+from src.prefilter import HashingEmbedder
+
+
+class Counting(HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return super().embed_documents(texts)
+
+
+class TestEmbeddingCache:
+    def test_round_trip_and_persistence(self, tmp_path):
+        EmbeddingCache(tmp_path / "e.sqlite").put_many({"k": [0.25, -1.5]})
+        cache = EmbeddingCache(tmp_path / "e.sqlite")
+        assert cache.get_many(["k", "other"]) == {"k": [0.25, -1.5]}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evict_keeps_most_recent(self, tmp_path):
+        cache = EmbeddingCache(tmp_path / "e.sqlite", max_entries=1)
+        cache.put_many({"a": [1.0]})
+        cache.put_many({"b": [2.0]})
+        assert cache.evict() == 1
+        assert cache.get_many(["a", "b"]) == {"b": [2.0]}
+
+    def test_key_depends_on_model(self):
+        assert text_key("x", "small") != text_key("x", "large")
+
+
+class TestCachedEmbeddings:
+    def test_only_misses_are_embedded_in_one_call(self, tmp_path):
+        inner = Counting()
+        emb = CachedEmbeddings(inner, EmbeddingCache(tmp_path / "e.sqlite"))
+        first = emb.embed_documents(["a b", "c d"])
+        again = emb.embed_documents(["c d", "e f", "a b", "e f"])
+        assert inner.calls == [["a b", "c d"], ["e f"]]
+        assert again[0] == first[1] and again[2] == first[0] and again[1] == again[3]
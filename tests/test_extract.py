@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.tools.extract import extract_fast, extract_json_ld, extract_soup, extract_text
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+SPECS = json.loads((FIXTURES / "expected.json").read_text(encoding="utf-8"))
+
+
+class TestFixtures:
+    @pytest.mark.parametrize("name", sorted(SPECS))
+    def test_keeps_content_and_drops_boilerplate(self, name):
+        spec = SPECS[name]
+        text = extract_text((FIXTURES / name).read_text(encoding="utf-8"), url=spec["url"])
+        assert [m for m in spec["must"] if m not in text] == []
+        assert [m for m in spec["must_not"] if m in text] == []
+
+    def test_generic_path_matches_soup_on_well_formed_html(self):
+        html = "<html><body><nav>menu</nav><h1>Backend Engineer</h1><p>Build <b>APIs</b>.</p><ul><li>Go</li></ul></body></html>"
+        assert extract_fast(html) == extract_soup(html) == "Backend Engineer Build APIs . Go"
+
+
+class TestFastPath:
+    def test_stops_at_budget(self):
+        html = "<p>" + "word " * 100_000 + "</p>"
+        assert len(extract_fast(html, limit=500)) == 500
+
+    def test_unclosed_tags_and_skipped_subtrees(self):
+        html = "<ul><li>one<li>two</ul><script>var a='<p>x</p>'</script><footer><p>legal</p></footer><p>three"
+        assert extract_fast(html) == "one two three"
+
+    def test_site_extractor_falls_back_to_generic(self):
+        html = "<h1>Title</h1><p>No greenhouse markup here.</p>"
+        assert extract_text(html, url="https://boards.greenhouse.io/x/jobs/1") == "Title No greenhouse markup here."
+
+
+class TestJsonLd:
+    def test_graph_and_plain_text_description(self):
+        ld = {"@graph": [{"@type": "WebPage"}, {"@type": "JobPosting", "title": "SRE", "description": "Keep things up."}]}
+        html = f'<script type="application/ld+json">{json.dumps(ld)}</script><p>page body</p>'
+        assert extract_json_ld(html) == "SRE Keep things up."
+
+    def test_invalid_json_is_ignored(self):
+        html = '<script type="application/ld+json">{not json</script><p>page body</p>'
+        assert extract_json_ld(html) is None
+        assert extract_text(html) == "page body"
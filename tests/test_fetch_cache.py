@@ -0,0 +1,68 @@
+import json
+from unittest.mock import patch
+
+from src import enrich
+from src.fetch_cache import FetchCache, url_key
+
+
+class TestFetchCache:
+    def test_roundtrip_compressed_with_metadata(self, tmp_path):
+        c = FetchCache(tmp_path / "c.sqlite")
+        text = "Backend engineer. " * 200
+        c.put("http://x/1", text, 200, '"e1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+        e = c.lookup("http://x/1")
+        assert e["text"] == text and e["fresh"] and e["status"] == 200 and e["etag"] == '"e1"'
+        st = c.stats()
+        assert st["hits"] == 1 and st["bytes_served"] == len(text)
+        assert st["bytes_saved_by_compression"] > len(text) // 2
+
+    def test_ttl_and_short_negative_ttl(self, tmp_path):
+        c = FetchCache(tmp_path / "c.sqlite", ttl=3600, error_ttl=60)
+        with patch("src.fetch_cache.time.time", return_value=1000.0):
+            c.put("http://ok", "page", 200)
+            c.put("http://bad", "[error: timeout]", None)
+        with patch("src.fetch_cache.time.time", return_value=1000.0 + 120):
+            assert c.lookup("http://ok")["fresh"]
+            assert not c.lookup("http://bad")["fresh"]
+            assert c.lookup("http://ok", max_age=60)["fresh"] is False
+        assert c.stats()["misses"] == 2
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        import os
+
+        c = FetchCache(tmp_path / "c.sqlite", max_bytes=None)
+        for i in range(3):
+            with patch("src.fetch_cache.time.time", return_value=1000.0 + i):
+                c.put(f"http://x/{i}", os.urandom(1000).hex())  # incompressible-ish
+        with patch("src.fetch_cache.time.time", return_value=2000.0):
+            c.lookup("http://x/0")
+        per_entry = c.stats()["bytes_stored"] // 3
+        assert c.evict(target_bytes=per_entry * 2 + per_entry // 2) == 1
+        assert c.lookup("http://x/1") is None
+        assert c.lookup("http://x/0") is not None
+
+    def test_import_legacy_json_dir(self, tmp_path):
+        legacy = tmp_path / "fetch_cache"
+        legacy.mkdir()
+        (legacy / (url_key("http://x/job") + ".json")).write_text(json.dumps({"text": "old page"}))
+        c = FetchCache(tmp_path / "c.sqlite", ttl=None)
+        assert c.import_json_dir(legacy) == 1
+        assert c.lookup("http://x/job")["text"] == "old page"
+
+
+class TestFetchAndCache:
+    def test_transient_failure_is_retried_after_error_ttl(self, tmp_path):
+        cache = FetchCache(tmp_path / "c.sqlite", error_ttl=60)
+        pages = iter([
+            {"status": None, "text": "[error: timeout]", "etag": None, "last_modified": None},
+            {"status": 200, "text": "the job", "etag": None, "last_modified": None},
+        ])
+        with patch.object(enrich, "_cache", cache), patch(
+            "src.enrich.fetch_page", side_effect=lambda *a: next(pages)
+        ) as fetch, patch("src.enrich.time.sleep"):
+            with patch("src.fetch_cache.time.time", return_value=1000.0):
+                assert enrich.fetch_and_cache("http://x") == "[error: timeout]"
+                assert enrich.fetch_and_cache("http://x") == "[error: timeout]"  # negative hit
+            with patch("src.fetch_cache.time.time", return_value=1100.0):
+                assert enrich.fetch_and_cache("http://x") == "the job"
+        assert fetch.call_count == 2
@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import pytest
+
+from src import http_client
+from src.tools.fetch_url import fetch_page, fetch_url
+from benchmarks.stub_server import StubServer
+
+HTML = "<html><body><nav>menu</nav><h1>Backend Engineer</h1><p>Build APIs.</p></body></html>"
+
+
+def _flaky(fail_times, status=503):
+    state = {"n": 0}
+
+    def handler(h):
+        state["n"] += 1
+        if state["n"] <= fail_times:
+            return status, {"Retry-After": "0"}, "busy"
+        return 200, {"Content-Type": "text/html"}, HTML
+
+    return handler
+
+
+def _etag(h):
+    if h.headers.get("If-None-Match") == '"v1"':
+        return 304, {"ETag": '"v1"'}, b""
+    return 200, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, HTML
+
+
+@pytest.fixture
+def session():
+    s = http_client.make_session(retries=3, backoff=0)
+    with patch.object(http_client, "_session", s):
+        yield s
+
+
+class TestSession:
+    def test_retries_5xx_and_429(self, session):
+        with StubServer({"/a": _flaky(2), "/b": _flaky(1, status=429)}) as srv:
+            assert http_client.get(srv.url + "/a").status_code == 200
+            assert http_client.get(srv.url + "/b").status_code == 200
+            assert srv.hits == {"/a": 3, "/b": 2}
+
+    def test_gives_up_after_retry_budget(self, session):
+        with StubServer({"/down": _flaky(99)}) as srv:
+            assert http_client.get(srv.url + "/down").status_code == 503
+            assert srv.hits["/down"] == 4  # 1 try + 3 retries
+
+    def test_keep_alive_reuses_connection_and_decodes_gzip(self, session):
+        with StubServer({"/ok": lambda h: (200, {}, HTML)}) as srv:
+            for _ in range(5):
+                assert "Backend Engineer" in http_client.get(srv.url + "/ok").text
+            assert len(srv.client_ports) == 1
+
+    def test_conditional_get(self, session):
+        with StubServer({"/job": _etag}) as srv:
+            first = fetch_page(srv.url + "/job")
+            assert first["status"] == 200 and first["etag"] == '"v1"'
+            again = fetch_page(srv.url + "/job", etag=first["etag"])
+            assert again["status"] == 304 and again["text"] is None
+
+
+class TestFetchUrl:
+    def test_extracts_text(self, session):
+        with StubServer({"/job": lambda h: (200, {}, HTML)}) as srv:
+            assert fetch_url(srv.url + "/job") == "Backend Engineer Build APIs."
+
+    def test_http_error_text(self, session):
+        with StubServer({}) as srv:
+            assert fetch_url(srv.url + "/nope") == "[error: http 404]"
+
+
+class TestEnrichRevalidation:
+    def test_stale_entry_revalidated_with_304(self, session, tmp_path):
+        from src import enrich
+        from src.fetch_cache import FetchCache
+
+        with patch.object(enrich, "_cache", FetchCache(tmp_path / "c.sqlite")), patch("src.enrich.time.sleep"):
+            with StubServer({"/job": _etag}) as srv:
+                url = srv.url + "/job"
+                assert enrich.fetch_and_cache(url) == "Backend Engineer Build APIs."
+                assert enrich.fetch_and_cache(url) == "Backend Engineer Build APIs."
+                assert srv.hits["/job"] == 1  # fresh entry served from cache
+
+                assert enrich.fetch_and_cache(url, max_age=0) == "Backend Engineer Build APIs."
+                assert srv.hits["/job"] == 2
+                assert enrich.get_cache().lookup(url)["etag"] == '"v1"'
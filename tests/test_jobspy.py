@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 import pandas as pd
 import numpy as np
-from src.fetchers.jobspy import normalize, fetch_jobspy
+from src.fetchers.jobspy import normalize, normalize_frame, fetch_jobspy, iter_pairs, iter_records
 
 
 class TestNormalize:
@@ -67,6 +67,36 @@ class TestNormalize:
         assert result["src_id"] == "glassdoor:https://glassdoor.com/job/999"
 
 
+class TestNormalizeFrame:
+    def _frame(self):
+        return pd.DataFrame([
+            {"id": "abc", "site": "linkedin", "job_url": "https://l.com/abc", "title": "Dev", "company": "A",
+             "location": "NYC", "date_posted": "2024-01-20", "min_amount": 120000.0, "max_amount": np.nan,
+             "description": "  Build\nthings\n"},
+            {"id": np.nan, "site": "indeed", "job_url": "https://i.com/x", "title": np.nan, "company": np.nan,
+             "location": "Remote", "date_posted": np.nan, "min_amount": np.nan, "max_amount": 90000.0,
+             "description": np.nan},
+            {"id": "", "site": np.nan, "job_url": np.nan, "title": "Ops", "company": "B",
+             "location": np.nan, "date_posted": "2024-01-21", "min_amount": 1.0, "max_amount": 2.0,
+             "description": ""},
+        ])
+
+    def test_matches_per_row_normalize(self):
+        df = self._frame()
+        assert normalize_frame(df).to_dict(orient="records") == [normalize(r) for r in iter_records(df)]
+
+    def test_matches_with_missing_columns(self):
+        df = pd.DataFrame([{"job_url": "https://g.com/1", "site": "glassdoor"}, {"job_url": "https://g.com/2"}])
+        assert normalize_frame(df).to_dict(orient="records") == [normalize(r) for r in iter_records(df)]
+
+    def test_iter_pairs_chunks(self):
+        df = pd.concat([self._frame()] * 5, ignore_index=True)
+        pairs = list(iter_pairs(df, chunk_size=4))
+        assert [raw["job_url"] for raw, _ in pairs] == df["job_url"].tolist()
+        assert [n for _, n in pairs] == [normalize(r) for r in iter_records(df)]
+        assert list(iter_pairs(pd.DataFrame())) == []
+
+
 class TestFetchJobspy:
     @patch("src.fetchers.jobspy.scrape_jobs")
     def test_fetch_returns_jobs(self, mock_scrape):
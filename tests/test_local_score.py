@@ -0,0 +1,111 @@
+import csv, time
+
+import pandas as pd
+
+from src.local_score import _levels, local_prefilter, local_scores
+from src.rank_llm import RANK_SCHEMA, rank_jobs
+from benchmarks.fakes import FakeChatModel, FakeRetriever, write_jobs_csv
+
+PROFILE = "Senior backend engineer. Python, Kafka, Postgres and AWS. Based in New York."
+NOW = "2024-06-01T00:00:00Z"
+
+
+def _rows():
+    return [
+        {"src_id": "a", "title": "Senior Python Engineer", "location": "New York, NY", "created": "2024-05-30",
+         "salary_min": "150000", "salary_max": "190000", "description": "Python, Kafka and Postgres on AWS."},
+        {"src_id": "b", "title": "Junior Frontend Developer", "location": "Austin, TX", "created": "2024-03-01",
+         "salary_min": "70000", "salary_max": "", "description": "React and CSS."},
+        {"src_id": "c", "title": "Backend Engineer", "location": "Remote - US", "created": "",
+         "description": "Python services."},
+    ]
+
+
+class TestFeatures:
+    def test_levels_from_titles(self):
+        titles = pd.Series(["Sr. Engineer", "Principal Engineer", "Software Engineer II", "Engineer I",
+                            "New Grad Developer", "Tech Lead", "Engineer"])
+        assert _levels(titles).tolist() == ["senior", "staff", "mid", "junior", "junior", "senior", "unknown"]
+
+    def test_matching_job_outranks_the_rest(self):
+        out = local_scores(_rows(), PROFILE, levels=["senior"], locations=["New York"], min_salary=160000, now=NOW)
+        assert [r["external_id"] for r in sorted(out, key=lambda r: -r["score"])] == ["a", "c", "b"]
+        best, worst = out[0], out[1]
+        assert best["level_fit"] == "senior" and best["location_fit"] == "perfect"
+        assert best["tech_fit"][:1] and set(best["tech_fit"]) >= {"python", "kafka", "postgres", "aws"}
+        assert "level looks junior" in worst["concerns"] and "salary below target" in worst["concerns"]
+        assert any(c.startswith("posted") for c in worst["concerns"])
+
+    def test_remote_counts_as_a_location_match(self):
+        out = local_scores(_rows(), PROFILE, remote=True, now=NOW)
+        assert [r["location_fit"] for r in out] == ["poor", "poor", "perfect"]
+
+    def test_missing_location_matches_nothing(self):
+        rows = [{"src_id": "x", "title": "Engineer", "location": None}]
+        assert local_scores(rows, PROFILE, locations=["none"], now=NOW)[0]["location_fit"] == "poor"
+
+    def test_no_preferences_are_neutral(self):
+        out = local_scores(_rows(), PROFILE, now=NOW)
+        assert {r["location_fit"] for r in out} == {"ok"}
+        assert not any("salary" in c for r in out for c in r["concerns"])
+
+    def test_rows_carry_the_rank_schema(self):
+        out = local_scores(_rows(), PROFILE, now=NOW)
+        assert all(set(RANK_SCHEMA) <= set(r) for r in out)
+        assert all(0 <= r["score"] <= 100 for r in out)
+
+    def test_deterministic(self):
+        assert local_scores(_rows(), PROFILE, now=NOW) == local_scores(_rows(), PROFILE, now=NOW)
+
+
+class TestSpeed:
+    def test_scores_20k_jobs_in_seconds(self):
+        rows = [dict(r, src_id=f"{r['src_id']}{i}") for i in range(7000) for r in _rows()]
+        t0 = time.perf_counter()
+        out = local_scores(rows, PROFILE, levels=["senior"], remote=True, min_salary=150000, now=NOW)
+        assert len(out) == len(rows)
+        assert time.perf_counter() - t0 < 10
+
+
+class TestLocalPrefilter:
+    def test_keeps_best_in_input_order(self):
+        kept, scores = local_prefilter(_rows(), PROFILE, 2, levels=["senior"], now=NOW)
+        assert [r["src_id"] for r in kept] == ["a", "c"]
+        assert scores.shape == (3,)
+
+
+class TestRankJobsLocal:
+    def _run(self, tmp_path, **kw):
+        jobs, profile = tmp_path / "jobs.csv", tmp_path / "profile.md"
+        write_jobs_csv(jobs, 12)
+        profile.write_text(PROFILE)
+        out, top = tmp_path / "ranked.csv", tmp_path / "top.csv"
+        rank_jobs(jobs_csv=jobs, out_path=out, top_k_path=top, profile_path=profile, cache_path=None, **kw)
+        return list(csv.DictReader(out.read_text().splitlines())), list(csv.DictReader(top.read_text().splitlines()))
+
+    def test_local_only_makes_no_llm_calls(self, tmp_path):
+        llm = FakeChatModel()
+        ranked, top = self._run(tmp_path, llm=llm, local_only=True, top_k=5)
+        assert llm.calls == 0
+        assert len(ranked) == 12 and top == ranked  # same shape as the LLM path's top-K file
+        scores = [int(r["score"]) for r in ranked]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_local_scores_do_not_count_as_llm_scores(self, tmp_path):
+        from src.store import JobStore
+
+        db = tmp_path / "jobs.sqlite"
+        store = JobStore(db)
+        store.upsert([{"src_id": f"fake:{i}", "title": f"Engineer {i}", "company": "C", "location": "NY"} for i in range(5)],
+                     store.start_run())
+        store.close()
+        self._run(tmp_path, local_only=True, store_path=db)
+        llm = FakeChatModel()
+        ranked, _ = self._run(tmp_path, llm=llm, retriever=FakeRetriever(), store_path=db, top_k=0)
+        assert llm.calls == 5
+        assert {r["why"] for r in ranked} == {"fake"}
+
+    def test_local_top_n_limits_llm_calls(self, tmp_path):
+        llm = FakeChatModel()
+        ranked, _ = self._run(tmp_path, llm=llm, retriever=FakeRetriever(), local_top_n=4, top_k=0)
+        assert llm.calls == 4 and len(ranked) == 4
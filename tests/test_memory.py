@@ -2,14 +2,39 @@ import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
+# src.memory imports these on first use; load them before Path.read_text is patched
+import dotenv, langchain_chroma, langchain_openai, langchain_text_splitters  # noqa: F401
+
+from src import memory
+from src.prefilter import HashingEmbedder
+
+
+@pytest.fixture(autouse=True)
+def fresh_handles(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory, "EMBED_CACHE_PATH", str(tmp_path / "embed_cache.sqlite"))
+    memory.reset()
+    yield
+    memory.reset()
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(len(texts))
+        return super().embed_documents(texts)
+
 
 class TestBuildProfileIndex:
-    @patch("src.memory.Chroma")
-    @patch("src.memory.OpenAIEmbeddings")
+    @patch("langchain_chroma.Chroma")
+    @patch("langchain_openai.OpenAIEmbeddings")
     @patch("src.memory.Path.read_text")
     def test_build_profile_index_creates_chunks(self, mock_read, mock_embeddings, mock_chroma):
         mock_read.return_value = "A" * 2000  # Text that will be chunked
         mock_vec = MagicMock()
+        mock_vec.get.return_value = {"ids": []}
         mock_chroma.return_value = mock_vec
 
         from src.memory import build_profile_index
@@ -20,24 +45,43 @@ class TestBuildProfileIndex:
         added_texts = mock_vec.add_texts.call_args[0][0]
         assert len(added_texts) > 1  # Should be split into chunks
 
-    @patch("src.memory.Chroma")
-    @patch("src.memory.OpenAIEmbeddings")
-    @patch("src.memory.Path.read_text")
-    def test_build_profile_index_deletes_existing_collection(self, mock_read, mock_embeddings, mock_chroma):
-        mock_read.return_value = "Test profile content"
-        mock_vec = MagicMock()
-        mock_chroma.return_value = mock_vec
+    def test_reindex_embeds_only_changed_chunks(self, tmp_path):
+        profile = tmp_path / "profile.md"
+        profile.write_text("\n\n".join(f"Paragraph {i} " + "word " * 150 for i in range(6)))
+        store = str(tmp_path / "chroma")
+        embedder = CountingEmbedder()
+        with patch("langchain_openai.OpenAIEmbeddings", return_value=embedder):
+            memory.build_profile_index(store, profile)
+            memory.build_profile_index(store, profile)  # unchanged: no embedding call
+            profile.write_text(profile.read_text().replace("Paragraph 3", "Paragraph three"))
+            vec = memory.build_profile_index(store, profile)
+            profile.write_text(profile.read_text().replace("Paragraph three", "Paragraph 3"))
+            memory.build_profile_index(store, profile)  # reverted chunk comes from the embedding cache
 
-        from src.memory import build_profile_index
-        build_profile_index()
+        assert embedder.batches == [6, 1]
+        texts = vec.get()["documents"]
+        assert len(texts) == 6 and any(t.startswith("Paragraph 3") for t in texts)
+
+    @patch("langchain_chroma.Chroma")
+    @patch("langchain_openai.OpenAIEmbeddings")
+    def test_stale_chunks_are_deleted(self, mock_embeddings, mock_chroma, tmp_path):
+        profile = tmp_path / "profile.md"
+        profile.write_text("Test profile content")
+        mock_vec = mock_chroma.return_value
+        mock_vec.embeddings.model = ""
+        mock_vec.get.return_value = {"ids": ["old"]}
 
-        # Should delete collection before adding new texts
-        mock_vec.delete_collection.assert_called_once()
+        memory.build_profile_index(profile_path=profile)
+
+        mock_vec.delete.assert_called_once_with(ids=["old"])
+        mock_vec.delete_collection.assert_not_called()
+        texts, = mock_vec.add_texts.call_args[0]
+        assert texts == ["Test profile content"]
 
 
 class TestGetRetriever:
-    @patch("src.memory.Chroma")
-    @patch("src.memory.OpenAIEmbeddings")
+    @patch("langchain_chroma.Chroma")
+    @patch("langchain_openai.OpenAIEmbeddings")
     def test_get_retriever_returns_retriever(self, mock_embeddings, mock_chroma):
         mock_vec = MagicMock()
         mock_retriever = MagicMock()
@@ -50,16 +94,36 @@ class TestGetRetriever:
         assert result == mock_retriever
         mock_vec.as_retriever.assert_called_once_with(k=4)
 
-    @patch("src.memory.Chroma")
-    @patch("src.memory.OpenAIEmbeddings")
+    @patch("langchain_chroma.Chroma")
+    @patch("langchain_openai.OpenAIEmbeddings")
     def test_get_retriever_uses_correct_collection(self, mock_embeddings, mock_chroma):
         mock_chroma.return_value = MagicMock()
 
         from src.memory import get_retriever
         get_retriever(store_dir="custom_store")
 
-        mock_chroma.assert_called_with(
-            collection_name="profile",
-            persist_directory="custom_store",
-            embedding_function=mock_embeddings.return_value,
-        )
+        kwargs = mock_chroma.call_args.kwargs
+        assert kwargs["collection_name"] == "profile"
+        assert kwargs["persist_directory"] == "custom_store"
+        assert kwargs["embedding_function"].embedder is mock_embeddings.return_value
+
+    @patch("langchain_chroma.Chroma")
+    @patch("langchain_openai.OpenAIEmbeddings")
+    def test_handles_are_shared(self, mock_embeddings, mock_chroma):
+        from src.memory import get_retriever
+        get_retriever(store_dir="a")
+        get_retriever(store_dir="a")
+        get_retriever(store_dir="b")
+
+        assert mock_chroma.call_count == 2
+        mock_embeddings.assert_called_once()
+
+    @patch("langchain_chroma.Chroma")
+    @patch("langchain_openai.OpenAIEmbeddings")
+    def test_profile_vectors_use_the_shared_handle(self, mock_embeddings, mock_chroma):
+        from src.prefilter import profile_vectors
+        mock_chroma.return_value.get.return_value = {"ids": ["a"], "embeddings": [[1.0, 0.0]]}
+        memory.get_retriever(store_dir="a")
+
+        assert profile_vectors(store_dir="a").tolist() == [[1.0, 0.0]]
+        mock_chroma.assert_called_once()
@@ -0,0 +1,82 @@
+import asyncio, json
+
+import pytest
+
+from src.metrics import Registry
+
+
+@pytest.fixture
+def reg():
+    return Registry()
+
+
+class TestRegistry:
+    def test_counters_by_label(self, reg):
+        reg.inc("hits_total", source="a")
+        reg.inc("hits_total", 2, source="a")
+        reg.inc("hits_total", source="b")
+        values = {c["labels"]["source"]: c["value"] for c in reg.snapshot()["counters"]}
+        assert values == {"a": 3, "b": 1}
+
+    def test_histogram_quantiles(self, reg):
+        for v in [0.002] * 90 + [3.0] * 10:
+            reg.observe("lat", v)
+        (h,) = reg.snapshot()["histograms"]
+        assert h["count"] == 100 and h["max"] == 3.0
+        assert 0.001 <= h["p50"] <= 0.005
+        assert 2.5 <= h["p95"] <= 3.0
+
+    def test_timer_and_decorator(self, reg):
+        @reg.timed("work_seconds", kind="sync")
+        def work():
+            return 1
+
+        @reg.timed("work_seconds", kind="async")
+        async def awork():
+            await asyncio.sleep(0.01)
+            return 2
+
+        with reg.timer("block_seconds"):
+            pass
+        assert work() == 1 and asyncio.run(awork()) == 2
+        counts = {(h["name"], h["labels"].get("kind")): h["count"] for h in reg.snapshot()["histograms"]}
+        assert counts == {("block_seconds", None): 1, ("work_seconds", "async"): 1, ("work_seconds", "sync"): 1}
+
+    def test_exporters(self, reg, tmp_path):
+        reg.inc("llm_requests_total", model="m")
+        reg.observe("llm_seconds", 0.2, model="m")
+        prom = reg.to_prometheus()
+        assert "# TYPE llm_requests_total counter" in prom
+        assert 'llm_requests_total{model="m"} 1' in prom
+        assert 'llm_seconds_bucket{model="m",le="0.25"} 1' in prom
+        assert 'llm_seconds_bucket{model="m",le="+Inf"} 1' in prom
+        assert 'llm_seconds_count{model="m"} 1' in prom
+
+        reg.write(tmp_path / "m.json")
+        assert json.loads((tmp_path / "m.json").read_text())["counters"][0]["value"] == 1
+        table = reg.summary()
+        assert "llm_seconds{model=m}" in table and "llm_requests_total{model=m}" in table
+
+
+class TestPipelineInstrumentation:
+    def test_rank_run_records_llm_and_stage_metrics(self, tmp_path, monkeypatch):
+        from src import metrics, rank_llm
+        from benchmarks.fakes import FakeChatModel, FakeRetriever, write_jobs_csv
+
+        metrics.reset()
+        monkeypatch.setattr("src.enrich.fetch_and_cache", lambda url, **kw: "[error: offline]")
+        monkeypatch.setattr("src.crawler.get_cached", lambda url: None)
+        monkeypatch.setattr("src.crawler.fetch_robots", lambda base: None)
+        jobs = tmp_path / "jobs.csv"
+        write_jobs_csv(jobs, 4)
+        rank_llm.rank_jobs(
+            jobs_csv=jobs, out_path=tmp_path / "r.csv", top_k_path=tmp_path / "t.csv",
+            llm=FakeChatModel(), retriever=FakeRetriever(), cache_path=None,
+            crawler_opts={"host_delay": 0},
+        )
+        snap = metrics.snapshot()
+        counters = {(c["name"], tuple(c["labels"].values())): c["value"] for c in snap["counters"]}
+        assert counters[("llm_requests_total", ("gpt-4o-mini",))] == 8  # first pass + rerank
+        assert counters[("retrieval_cache_total", ("miss",))] == 4
+        stages = {h["labels"].get("stage") for h in snap["histograms"] if h["name"] == "stage_seconds"}
+        assert {"load", "rank", "enrich_rerank"} <= stages
@@ -0,0 +1,71 @@
+import time
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.orchestrator import SourceBudget, fetch_all
+
+
+def _page(n, size, prefix="a"):
+    return [{"id": f"{prefix}{n}-{i}", "title": "t"} for i in range(size)]
+
+
+class TestSourceBudget:
+    def test_failures_are_contained_then_skipped(self):
+        calls = []
+
+        def boom():
+            calls.append(1)
+            raise RuntimeError("down")
+
+        b = SourceBudget("x", max_failures=2)
+        assert [b.call(boom) for _ in range(4)] == [None] * 4
+        assert len(calls) == 2
+        assert b.exhausted
+
+
+class TestFetchAll:
+    @patch("src.orchestrator.adzuna.fetch_adzuna_page")
+    def test_adzuna_pages_in_order_and_stop_on_short_page(self, mock_page):
+        sizes = {1: 2, 2: 2, 3: 1, 4: 0, 5: 0}
+        mock_page.side_effect = lambda p, q, gp: _page(p, sizes[p])
+
+        pairs = fetch_all(
+            [{"source": "adzuna"}],
+            {"pages": 5, "results_per_page": 2},
+            {"sources": {"adzuna": {"concurrency": 2, "rpm": None}}},
+        )
+
+        assert [raw["id"] for raw, _ in pairs] == ["a1-0", "a1-1", "a2-0", "a2-1", "a3-0"]
+        assert pairs[0][1]["src_id"] == "adzuna:a1-0"
+        requested = {c.args[0] for c in mock_page.call_args_list}
+        assert 5 not in requested  # windows {1,2} and {3,4}; stopped before page 5
+
+    @patch("src.orchestrator.jobspy.scrape_frame")
+    @patch("src.orchestrator.adzuna.fetch_adzuna_page")
+    def test_failing_source_does_not_abort_run(self, mock_page, mock_jobspy):
+        mock_page.side_effect = RuntimeError("429")
+        mock_jobspy.return_value = pd.DataFrame([{"id": "j1", "site": "indeed", "job_url": "u"}])
+
+        pairs = fetch_all(
+            [{"source": "adzuna"}, {"source": "jobspy"}, {"source": "adzuna"}],
+            {"pages": 1},
+            {"sources": {"adzuna": {"rpm": None, "max_failures": 1}}},
+        )
+
+        assert [n["src_id"] for _, n in pairs] == ["indeed:j1"]
+        assert mock_page.call_count == 1  # second adzuna query skipped by the budget
+
+    @patch("src.orchestrator.jobspy.scrape_frame")
+    def test_queries_run_concurrently(self, mock_jobspy):
+        def slow(query, global_params):
+            time.sleep(0.1)
+            return pd.DataFrame([{"id": query["search_term"], "site": "indeed", "job_url": "u"}])
+
+        mock_jobspy.side_effect = slow
+        queries = [{"source": "jobspy", "search_term": str(i)} for i in range(4)]
+
+        t0 = time.perf_counter()
+        pairs = fetch_all(queries, {}, {"max_parallel_queries": 4, "sources": {"jobspy": {"concurrency": 4}}})
+        assert time.perf_counter() - t0 < 0.3
+        assert [n["src_id"] for _, n in pairs] == [f"indeed:{i}" for i in range(4)]
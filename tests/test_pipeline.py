@@ -0,0 +1,106 @@
+import csv, time
+
+import pytest
+
+from src.pipeline import Pipeline, Stage, build_pipeline, jobs_hash
+
+
+class Inputs:
+    """Mutable fingerprints plus a log of which stages ran."""
+
+    def __init__(self, **fingerprints):
+        self.fp, self.ran = dict(fingerprints), []
+
+    def stage(self, name, deps=(), delay=0.0, fail=False, **kw):
+        def run():
+            time.sleep(delay)
+            if fail:
+                raise RuntimeError(f"{name} broke")
+            self.ran.append(name)
+
+        return Stage(name, run, lambda: self.fp.get(name, ""), deps=deps, **kw)
+
+
+def _pipeline(tmp_path, inputs, **stage_kw):
+    return Pipeline(
+        [
+            inputs.stage("index", **stage_kw.get("index", {})),
+            inputs.stage("fetch", **stage_kw.get("fetch", {})),
+            inputs.stage("rank", deps=("index", "fetch"), **stage_kw.get("rank", {})),
+        ],
+        state_path=tmp_path / "state.json",
+    )
+
+
+class TestPipeline:
+    def test_skips_stages_whose_inputs_are_unchanged(self, tmp_path):
+        inputs = Inputs(index="p1", fetch="c1", rank="j1")
+        assert set(_pipeline(tmp_path, inputs).run().values()) == {"ran"}
+        assert set(_pipeline(tmp_path, inputs).run().values()) == {"skipped"}
+        assert len(inputs.ran) == 3
+
+    def test_changed_input_reruns_only_that_stage(self, tmp_path):
+        inputs = Inputs(index="p1", fetch="c1", rank="j1")
+        _pipeline(tmp_path, inputs).run()
+        inputs.fp["rank"] = "j2"
+        assert _pipeline(tmp_path, inputs).run() == {"index": "skipped", "fetch": "skipped", "rank": "ran"}
+
+    def test_independent_stages_run_in_parallel(self, tmp_path):
+        inputs = Inputs()
+        p = _pipeline(tmp_path, inputs, index={"delay": 0.3}, fetch={"delay": 0.3})
+        t0 = time.perf_counter()
+        p.run()
+        assert time.perf_counter() - t0 < 0.5
+        assert inputs.ran[-1] == "rank"
+
+    def test_failure_blocks_dependents(self, tmp_path):
+        inputs = Inputs()
+        results = _pipeline(tmp_path, inputs, fetch={"fail": True}).run()
+        assert results == {"index": "ran", "fetch": "failed", "rank": "blocked"}
+        results = _pipeline(tmp_path, inputs).run()  # the failed stage was not recorded
+        assert results == {"index": "skipped", "fetch": "ran", "rank": "ran"}
+
+    def test_missing_output_or_max_age_forces_a_rerun(self, tmp_path):
+        out = tmp_path / "jobs.csv"
+        out.write_text("x")
+        inputs = Inputs()
+        _pipeline(tmp_path, inputs, fetch={"outputs": (out,)}).run()
+        out.unlink()
+        assert _pipeline(tmp_path, inputs, fetch={"outputs": (out,)}).run()["fetch"] == "ran"
+        assert _pipeline(tmp_path, inputs, fetch={"max_age": 0}).run()["fetch"] == "ran"
+
+    def test_force_and_dry_run(self, tmp_path):
+        inputs = Inputs()
+        _pipeline(tmp_path, inputs).run()
+        assert _pipeline(tmp_path, inputs).run(force={"fetch"})["fetch"] == "ran"
+        inputs.fp["index"] = "p2"
+        assert _pipeline(tmp_path, inputs).run(dry_run=True)["index"] == "stale"
+        assert inputs.ran.count("index") == 1
+
+    def test_rejects_cycles_and_unknown_deps(self, tmp_path):
+        inputs = Inputs()
+        with pytest.raises(ValueError, match="cycle"):
+            Pipeline([inputs.stage("a", deps=("b",)), inputs.stage("b", deps=("a",))])
+        with pytest.raises(ValueError, match="unknown"):
+            Pipeline([inputs.stage("a", deps=("nope",))])
+
+
+class TestFingerprints:
+    def _write(self, path, rows):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=["src_id", "title"])
+            w.writeheader()
+            w.writerows(rows)
+
+    def test_jobs_hash_ignores_row_order_but_not_content(self, tmp_path):
+        a, b = {"src_id": "a:1", "title": "Dev"}, {"src_id": "b:2", "title": "Ops"}
+        self._write(tmp_path / "x.csv", [a, b])
+        self._write(tmp_path / "y.csv", [b, a])
+        self._write(tmp_path / "z.csv", [a, {**b, "title": "SRE"}])
+        assert jobs_hash(tmp_path / "x.csv") == jobs_hash(tmp_path / "y.csv") != jobs_hash(tmp_path / "z.csv")
+        assert jobs_hash(tmp_path / "none.csv") == "missing"
+
+    def test_rank_fingerprint_includes_rank_options(self, tmp_path):
+        a = build_pipeline(["--top-k", "10"], state_path=tmp_path / "s.json").stages["rank"].fingerprint()
+        b = build_pipeline(["--top-k", "30"], state_path=tmp_path / "s.json").stages["rank"].fingerprint()
+        assert a != b
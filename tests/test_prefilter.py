@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from src.prefilter import HashingEmbedder, prefilter, similarity
+
+
+PROFILE = ["Python backend engineer building payments APIs with Flask and PostgreSQL"]
+
+
+def _rows():
+    return [
+        {"title": "Backend Engineer", "description": "Python payments APIs, Flask, PostgreSQL"},
+        {"title": "Registered Nurse", "description": "Patient care in a hospital ward"},
+        {"title": "Python Developer", "description": "Backend services and APIs"},
+        {"title": "Truck Driver", "description": "CDL license required, long haul routes"},
+    ]
+
+
+class TestHashingEmbedder:
+    def test_deterministic(self):
+        e = HashingEmbedder(dim=64)
+        assert e.embed_query("python backend") == HashingEmbedder(dim=64).embed_query("python backend")
+        assert len(e.embed_documents(["a", "b"])) == 2
+
+
+class TestSimilarity:
+    def test_max_over_profile_chunks(self):
+        jobs = np.array([[1.0, 0.0], [0.0, 2.0], [0.0, 0.0]])
+        profile = np.array([[1.0, 0.0], [0.0, 1.0]])
+        assert similarity(jobs, profile).tolist() == [1.0, 1.0, 0.0]
+
+
+class TestPrefilter:
+    def setup_method(self):
+        self.emb = HashingEmbedder()
+        self.profile = np.asarray(self.emb.embed_documents(PROFILE))
+
+    def test_top_n_keeps_relevant_in_order(self):
+        kept, sims = prefilter(_rows(), self.emb, self.profile, top_n=2, batch_size=3)
+        assert [r["title"] for r in kept] == ["Backend Engineer", "Python Developer"]
+        assert sims.shape == (4,)
+
+    def test_threshold(self):
+        kept, sims = prefilter(_rows(), self.emb, self.profile, threshold=0.2)
+        assert all(s >= 0.2 for s, r in zip(sims, _rows()) if r in kept)
+        assert "Truck Driver" not in [r["title"] for r in kept]
+
+    def test_no_limits_keeps_everything(self):
+        kept, _ = prefilter(_rows(), self.emb, self.profile)
+        assert len(kept) == 4
+
+    def test_empty_profile_index_is_a_clear_error(self):
+        with pytest.raises(ValueError, match="python -m src index"):
+            prefilter(_rows(), self.emb, np.zeros((0, 0), dtype=np.float32), top_n=2)
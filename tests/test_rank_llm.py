@@ -0,0 +1,322 @@
+import csv, time
+from functools import partial
+import pytest
+from unittest.mock import patch
+
+from src.rank_llm import pack_batches, rank_jobs
+from src.crawler import Crawler
+from src.prefilter import HashingEmbedder
+from src.ratelimit import TokenBucket
+from benchmarks.fakes import FakeAPIError, FakeChatModel, FakeRetriever, fake_score, write_jobs_csv
+
+
+@pytest.fixture(autouse=True)
+def offline_enrichment():
+    """Keep the top-K enrichment step off the network."""
+    with patch("src.enrich.fetch_and_cache", return_value="[error: offline]") as fetch, patch(
+        "src.crawler.Crawler", partial(Crawler, host_delay=0)
+    ), patch("src.crawler.get_cached", return_value=None), patch(
+        "src.crawler.fetch_robots", return_value=None
+    ):
+        yield fetch
+
+
+def _run(tmp_path, name, n=16, **kw):
+    jobs = tmp_path / "jobs.csv"
+    write_jobs_csv(jobs, n)
+    out, top = tmp_path / f"{name}_ranked.csv", tmp_path / f"{name}_top.csv"
+    kw.setdefault("cache_path", None)
+    rank_jobs(jobs_csv=jobs, out_path=out, top_k_path=top, retriever=FakeRetriever(), **kw)
+    return out.read_text(), top.read_text()
+
+
+class TestRankJobs:
+    def test_scores_every_row_sorted(self, tmp_path):
+        out, _ = _run(tmp_path, "seq", n=10, llm=FakeChatModel(), concurrency=1)
+        rows = list(csv.DictReader(out.splitlines()))
+        assert len(rows) == 10
+        scores = [int(r["score"]) for r in rows]
+        assert scores == sorted(scores, reverse=True)
+        assert {int(r["score"]) for r in rows} == {fake_score(f"fake:{i}") for i in range(10)}
+
+    def test_concurrent_matches_sequential_and_is_faster(self, tmp_path):
+        t0 = time.perf_counter()
+        seq = _run(tmp_path, "seq", llm=FakeChatModel(latency=0.05), concurrency=1)
+        t_seq = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        par = _run(tmp_path, "par", llm=FakeChatModel(latency=0.05), concurrency=16)
+        t_par = time.perf_counter() - t0
+
+        assert par == seq
+        assert t_par * 3 < t_seq
+
+    def test_timeout_drops_slow_jobs(self, tmp_path, capsys):
+        out, _ = _run(tmp_path, "slow", n=3, llm=FakeChatModel(latency=0.5), timeout=0.05)
+        assert len(out.strip().splitlines()) == 1  # header only
+        assert "Dropped 3 jobs" in capsys.readouterr().out
+
+    def test_transient_api_errors_are_retried(self, tmp_path, capsys):
+        llm = FakeChatModel(error_rate=0.3)
+        out, _ = _run(tmp_path, "flaky", n=40, llm=llm, batch_size=8, retry_backoff=0, top_k=0)
+        assert len(list(csv.DictReader(out.splitlines()))) == 40
+        assert "Dropped" not in capsys.readouterr().out
+
+    def test_jobs_lost_to_errors_are_reported(self, tmp_path, capsys):
+        class BrokenChatModel(FakeChatModel):
+            def _respond(self, messages):
+                self.calls += 1
+                raise ValueError("not an API error")
+
+        llm = BrokenChatModel()
+        out, _ = _run(tmp_path, "broken", n=8, llm=llm, batch_size=8, retry_backoff=0, top_k=0)
+        assert llm.calls == 1  # a non-transient error is not retried
+        assert len(out.strip().splitlines()) == 1
+        assert "Dropped 8 jobs" in capsys.readouterr().out
+
+    def test_rerun_is_served_from_score_cache(self, tmp_path):
+        cache = tmp_path / "scores.sqlite"
+        first = FakeChatModel()
+        out1, _ = _run(tmp_path, "a", n=5, llm=first, cache_path=cache)
+        assert first.calls == 5
+
+        second = FakeChatModel()
+        out2, _ = _run(tmp_path, "b", n=5, llm=second, cache_path=cache)
+        assert second.calls == 0
+        assert out2 == out1
+
+    def test_profile_change_invalidates_score_cache(self, tmp_path):
+        cache, profile = tmp_path / "scores.sqlite", tmp_path / "profile.md"
+        profile.write_text("v1")
+        _run(tmp_path, "a", n=3, llm=FakeChatModel(), cache_path=cache, profile_path=profile)
+
+        profile.write_text("v2")
+        llm = FakeChatModel()
+        _run(tmp_path, "b", n=3, llm=llm, cache_path=cache, profile_path=profile)
+        assert llm.calls == 3
+
+
+class TestTokenBucket:
+    def test_burst_then_throttle(self):
+        bucket = TokenBucket(rate=10, per=1.0)  # 10/s, burst of 10
+        t0 = time.perf_counter()
+        for _ in range(15):
+            bucket.acquire()
+        assert time.perf_counter() - t0 == pytest.approx(0.5, abs=0.15)
+
+
+class TestBatching:
+    def test_pack_batches_respects_size_and_budget(self):
+        rows = [{"src_id": str(i), "description": "x" * 400} for i in range(5)]
+        assert [len(b) for b in pack_batches(rows, batch_size=2, token_budget=10_000)] == [2, 2, 1]
+        assert [len(b) for b in pack_batches(rows, batch_size=10, token_budget=300)] == [2, 2, 1]
+
+    def test_batched_output_matches_single(self, tmp_path):
+        single, _ = _run(tmp_path, "single", n=12, llm=FakeChatModel())
+        llm = FakeChatModel()
+        batched, _ = _run(tmp_path, "batched", n=12, llm=llm, batch_size=5)
+        assert batched == single
+        assert llm.batch_calls == llm.calls
+
+    def test_only_missing_jobs_retried(self, tmp_path):
+        llm = FakeChatModel(drop_from_batch={"fake:1", "fake:3"})
+        out, _ = _run(tmp_path, "partial", n=4, llm=llm, batch_size=4)
+        assert len(out.strip().splitlines()) == 5
+        assert llm.batch_calls >= 1
+        assert llm.calls - llm.batch_calls == 2 * 2  # two retries in each pass
+
+    def test_failed_retry_keeps_the_rest_of_the_batch(self, tmp_path, capsys):
+        class FailingRetries(FakeChatModel):
+            def _respond(self, messages):
+                if "JOB DATA:\n" in messages[-1].content:
+                    self.calls += 1
+                    raise FakeAPIError(503)
+                return super()._respond(messages)
+
+        llm = FailingRetries(drop_from_batch={"fake:5"})
+        out, _ = _run(tmp_path, "lost_retry", n=8, llm=llm, batch_size=8, retry_backoff=0, top_k=0)
+        assert len(list(csv.DictReader(out.splitlines()))) == 7
+        assert "Dropped 1 jobs" in capsys.readouterr().out
+
+
+class TestPrefilterStage:
+    def test_only_top_n_reach_llm(self, tmp_path):
+        profile = tmp_path / "profile.md"
+        profile.write_text("Software Engineer 3 building backend services")
+        llm = FakeChatModel()
+        out, _ = _run(
+            tmp_path, "pre", n=10, llm=llm, prefilter_top_n=4,
+            embedder=HashingEmbedder(), profile_path=profile,
+        )
+        assert len(out.strip().splitlines()) == 5
+        assert llm.calls == 4 * 2  # first pass + rerank
+
+
+class TestRetrievalReuse:
+    def test_one_retrieval_per_distinct_query(self, tmp_path):
+        jobs = tmp_path / "jobs.csv"
+        write_jobs_csv(jobs, 6)
+        retriever = FakeRetriever()
+        rank_jobs(
+            jobs_csv=jobs, out_path=tmp_path / "o.csv", top_k_path=tmp_path / "t.csv",
+            llm=FakeChatModel(), retriever=retriever, cache_path=None,
+        )
+        assert retriever.calls == 6  # rerank reuses first-pass lookups
+
+
+class TestJobDatabase:
+    def test_incremental_scoring_from_store(self, tmp_path, capsys):
+        from src.store import JobStore
+
+        db = tmp_path / "jobs.sqlite"
+        store = JobStore(db)
+        jobs = [
+            {"src_id": f"fake:{i}", "title": f"Engineer {i}", "company": "C", "location": "NY",
+             "description": "Python"}
+            for i in range(4)
+        ]
+        store.upsert(jobs[:3], store.start_run())
+        store.close()
+
+        def run(llm, **kw):
+            rank_jobs(out_path=tmp_path / "r.csv", top_k_path=tmp_path / "t.csv", llm=llm,
+                      retriever=FakeRetriever(), cache_path=None, store_path=db, **kw)
+
+        first = FakeChatModel()
+        run(first)
+        assert first.calls == 3 + 3  # first pass + rerank
+
+        store = JobStore(db)
+        store.upsert(jobs, store.start_run())
+        store.close()
+        second = FakeChatModel()
+        run(second)
+        assert second.calls == 1 + 1  # only the new job is scored and reranked
+        assert "Tier 1 (gpt-4o-mini): 1 jobs scored" in capsys.readouterr().out
+        assert len((tmp_path / "r.csv").read_text().strip().splitlines()) == 5  # export keeps earlier runs
+        assert len((tmp_path / "t.csv").read_text().strip().splitlines()) == 5
+
+        strong = StrongChatModel()
+        run(FakeChatModel(), rerank_llm=strong)
+        assert strong.calls == 4  # every stored rerank came from the old model
+
+    def test_changing_model_rescores_stored_jobs(self, tmp_path):
+        from src.store import JobStore
+
+        db = tmp_path / "jobs.sqlite"
+        store = JobStore(db)
+        store.upsert([{"src_id": f"fake:{i}", "title": f"T{i}", "company": "C", "location": "NY"} for i in range(3)],
+                     store.start_run())
+        store.close()
+
+        def run(llm):
+            rank_jobs(out_path=tmp_path / "r.csv", top_k_path=tmp_path / "t.csv", llm=llm, top_k=0,
+                      retriever=FakeRetriever(), cache_path=None, store_path=db)
+
+        run(FakeChatModel())
+        same = FakeChatModel()
+        run(same)
+        assert same.calls == 0
+        other = StrongChatModel()
+        run(other)
+        assert other.calls == 3
+
+
+class TestStructuredReplies:
+    def test_malformed_replies_are_salvaged_or_repaired(self, tmp_path, capsys):
+        bad = {"fake:0": ["fence"], "fake:1": ["string_score"], "fake:2": ["junk"], "fake:3": ["truncate"]}
+        llm = FakeChatModel(bad_replies=bad)
+        out, _ = _run(tmp_path, "bad", n=4, llm=llm)
+        rows = list(csv.DictReader(out.splitlines()))
+        assert {r["external_id"]: int(r["score"]) for r in rows} == {f"fake:{i}": fake_score(f"fake:{i}") for i in range(4)}
+        assert llm.calls == 4 + 1 + 4  # one re-ask for the junk reply, then the rerank
+        assert "Parse failures (gpt-4o-mini): 1, 1 repaired by a re-ask" in capsys.readouterr().out
+
+    def test_repair_budget_is_bounded(self, tmp_path):
+        llm = FakeChatModel(bad_replies={f"fake:{i}": ["junk", "junk"] for i in range(3)})
+        out, _ = _run(tmp_path, "junk", n=3, llm=llm, concurrency=1, repairs=1)
+        assert len(out.strip().splitlines()) == 1  # every job dropped
+        assert llm.calls == 3 + 1  # a single re-ask for the whole run
+
+
+class CrashingChatModel(FakeChatModel):
+    """Dies like a killed process after `after` successful calls."""
+
+    def __init__(self, after: int):
+        super().__init__()
+        self.after = after
+
+    async def ainvoke(self, messages):
+        if self.calls >= self.after:
+            raise SystemExit("killed")
+        return await super().ainvoke(messages)
+
+
+class TestResume:
+    def test_resume_skips_logged_jobs_and_merges_them(self, tmp_path):
+        full, _ = _run(tmp_path, "ref", n=5, llm=FakeChatModel())
+
+        with pytest.raises(SystemExit):
+            _run(tmp_path, "crash", n=5, llm=CrashingChatModel(after=3), concurrency=1)
+        assert (tmp_path / "crash_ranked.partial.jsonl").exists()
+
+        llm = FakeChatModel()
+        out, _ = _run(tmp_path, "crash", n=5, llm=llm, resume=True)
+        assert llm.calls == 2 + 5  # the two unscored jobs, then the rerank
+        assert out == full
+        assert not (tmp_path / "crash_ranked.partial.jsonl").exists()
+
+    def test_crash_during_rerank_keeps_first_pass(self, tmp_path):
+        with pytest.raises(SystemExit):
+            _run(tmp_path, "late", n=4, llm=CrashingChatModel(after=6), concurrency=1)
+        llm = FakeChatModel()
+        _run(tmp_path, "late", n=4, llm=llm, resume=True, concurrency=1)
+        assert llm.calls == 2  # only the reranks that had not finished
+
+    def test_failed_jobs_keep_the_log_for_resume(self, tmp_path):
+        _run(tmp_path, "flaky", n=6, llm=FakeChatModel(error_rate=0.5), retries=0, top_k=0, concurrency=1)
+        assert (tmp_path / "flaky_ranked.partial.jsonl").exists()
+
+        llm = FakeChatModel()
+        out, _ = _run(tmp_path, "flaky", n=6, llm=llm, resume=True, top_k=0)
+        assert 0 < llm.calls < 6  # only the jobs that failed
+        assert len(list(csv.DictReader(out.splitlines()))) == 6
+        assert not (tmp_path / "flaky_ranked.partial.jsonl").exists()
+
+    def test_without_resume_starts_over(self, tmp_path):
+        with pytest.raises(SystemExit):
+            _run(tmp_path, "fresh", n=4, llm=CrashingChatModel(after=2), concurrency=1)
+        llm = FakeChatModel()
+        _run(tmp_path, "fresh", n=4, llm=llm)
+        assert llm.calls == 4 + 4
+
+
+class StrongChatModel(FakeChatModel):
+    model_name = "gpt-4o"
+
+    def _row(self, job):
+        return {**FakeChatModel._row(job), "score": 100 - fake_score(job.get("external_id")), "why": "strong"}
+
+
+class TestCascade:
+    def test_only_the_shortlist_reaches_the_strong_model(self, tmp_path, capsys):
+        weak, strong = FakeChatModel(), StrongChatModel()
+        _, top = _run(tmp_path, "cascade", n=10, llm=weak, rerank_llm=strong, top_k=3, rerank_concurrency=2)
+        assert weak.calls == 10 and strong.calls == 3
+        rows = list(csv.DictReader(top.splitlines()))
+        assert sum(r["why"] == "strong" for r in rows) == 3
+        out = capsys.readouterr().out
+        assert "Tier 1 (gpt-4o-mini): 10 jobs scored" in out
+        assert "Tier 2 (gpt-4o): 3 jobs escalated (top 3), 3 re-scored" in out
+
+    def test_first_tier_model_is_configurable(self, tmp_path, capsys):
+        llm = FakeChatModel()
+        with patch("src.rank_llm._chat_model", return_value=llm) as make:
+            _run(tmp_path, "nano", n=4, model="gpt-4.1-nano", top_k=0)
+        assert make.call_args[0][0] == "gpt-4.1-nano"
+        assert "Tier 1 (gpt-4.1-nano): 4 jobs scored" in capsys.readouterr().out
+
+    def test_score_band_limits_escalation(self, tmp_path):
+        strong = StrongChatModel()
+        _run(tmp_path, "band", n=10, llm=FakeChatModel(), rerank_llm=strong, top_k=10, escalate_min_score=50)
+        assert strong.calls == sum(fake_score(f"fake:{i}") >= 50 for i in range(10))
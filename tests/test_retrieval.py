@@ -0,0 +1,41 @@
+import asyncio
+
+from src.retrieval import CachedRetriever, WholeProfileRetriever, get_profile_retriever
+from benchmarks.fakes import FakeRetriever
+
+
+class TestCachedRetriever:
+    def test_memoizes_normalized_queries(self):
+        inner = FakeRetriever()
+        r = CachedRetriever(inner)
+        r.invoke("Engineer at Acme in NYC")
+        r.invoke("  engineer at ACME   in nyc ")
+        assert inner.calls == 1
+        assert (r.hits, r.misses) == (1, 1)
+
+    def test_lru_bound(self):
+        inner = FakeRetriever()
+        r = CachedRetriever(inner, maxsize=2)
+        for q in ["a", "b", "c", "a"]:
+            r.invoke(q)
+        assert inner.calls == 4  # "a" was evicted by "c"
+
+    def test_concurrent_identical_queries_share_one_lookup(self):
+        inner = FakeRetriever(latency=0.05)
+        r = CachedRetriever(inner)
+
+        async def go():
+            return await asyncio.gather(*(r.ainvoke("same query") for _ in range(5)))
+
+        results = asyncio.run(go())
+        assert inner.calls == 1
+        assert all(res is results[0] for res in results)
+
+
+class TestGetProfileRetriever:
+    def test_small_profile_used_whole(self, tmp_path):
+        profile = tmp_path / "profile.md"
+        profile.write_text("Python engineer")
+        r = get_profile_retriever(profile, whole_profile_chars=100)
+        assert isinstance(r, WholeProfileRetriever)
+        assert r.invoke("anything")[0].page_content == "Python engineer"
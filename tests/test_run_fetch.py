@@ -0,0 +1,67 @@
+import csv, json
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src import run_fetch
+
+CFG = {
+    "queries": [{"source": "adzuna", "where": "NYC"}, {"source": "jobspy", "search_term": "dev"}],
+    "global_params": {"pages": 4, "results_per_page": 2},
+    "fetch": {"sources": {"adzuna": {"rpm": None}}},
+}
+
+
+def _page(p, q, gp):
+    return [{"id": f"{p}-{i}", "title": f"Job {p}-{i}"} for i in range(2)]
+
+
+def _frame(query, global_params):
+    return pd.DataFrame([{"id": "j1", "site": "indeed", "job_url": "u", "title": "Dev"}])
+
+
+def _csv_ids(path):
+    return [r["src_id"] for r in csv.DictReader(open(path, encoding="utf-8"))]
+
+
+@pytest.fixture
+def env(tmp_path):
+    with patch.object(run_fetch, "load_config", return_value=CFG), patch(
+        "src.orchestrator.jobspy.scrape_frame", side_effect=_frame
+    ), patch("src.orchestrator.adzuna.APP_ID", "x"):
+        yield tmp_path
+
+
+class TestStreaming:
+    def test_stream_matches_batch_output(self, env):
+        with patch("src.orchestrator.adzuna.fetch_adzuna_page", side_effect=_page):
+            run_fetch.main(out_dir=env / "batch", store_path=env / "a.sqlite")
+            run_fetch.main(out_dir=env / "stream", store_path=env / "b.sqlite", stream=True)
+
+        assert sorted(_csv_ids(env / "stream/jobs.csv")) == sorted(_csv_ids(env / "batch/jobs.csv"))
+        assert len(_csv_ids(env / "stream/jobs.csv")) == 9
+        assert len((env / "stream/jobs_raw.jsonl").read_text().splitlines()) == 9
+        assert not (env / "stream/fetch_checkpoint.json").exists()
+
+    def test_resume_after_crash(self, env):
+        def crashing(p, q, gp):
+            if p == 3:
+                raise KeyboardInterrupt  # simulate the process dying mid-run
+            return _page(p, q, gp)
+
+        with patch("src.orchestrator.adzuna.fetch_adzuna_page", side_effect=crashing):
+            with pytest.raises(KeyboardInterrupt):
+                run_fetch.main(out_dir=env, store_path=env / "s.sqlite", stream=True)
+
+        state = json.loads((env / "fetch_checkpoint.json").read_text())
+        assert {"q0:p1", "q0:p2"} <= set(state["done"])
+        assert len(_csv_ids(env / "jobs.csv")) >= 4  # flushed before the crash
+
+        with patch("src.orchestrator.adzuna.fetch_adzuna_page", side_effect=_page) as mock_page:
+            run_fetch.main(out_dir=env, store_path=env / "s.sqlite", resume=True)
+            assert {c.args[0] for c in mock_page.call_args_list} == {3, 4}
+
+        ids = _csv_ids(env / "jobs.csv")
+        assert len(ids) == len(set(ids)) == 9
+        assert not (env / "fetch_checkpoint.json").exists()
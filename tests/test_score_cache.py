@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from src.score_cache import ScoreCache, fingerprint
+
+
+class TestFingerprint:
+    def test_stable_and_order_sensitive(self):
+        assert fingerprint("a", {"x": 1, "y": 2}) == fingerprint("a", {"y": 2, "x": 1})
+        assert fingerprint("a", "b") != fingerprint("b", "a")
+
+
+class TestScoreCache:
+    def test_hit_and_miss_counters(self, tmp_path):
+        cache = ScoreCache(tmp_path / "c.sqlite", namespace="ns")
+        assert cache.get("k") is None
+        cache.put("k", {"score": 80})
+        assert cache.get("k") == {"score": 80}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        ScoreCache(tmp_path / "c.sqlite", namespace="ns").put("k", {"score": 1})
+        assert ScoreCache(tmp_path / "c.sqlite", namespace="ns").get("k") == {"score": 1}
+
+    def test_namespace_change_clears(self, tmp_path):
+        ScoreCache(tmp_path / "c.sqlite", namespace="old").put("k", {"score": 1})
+        assert ScoreCache(tmp_path / "c.sqlite", namespace="new").get("k") is None
+
+    def test_ttl_expiry(self, tmp_path):
+        cache = ScoreCache(tmp_path / "c.sqlite", ttl_days=1)
+        with patch("src.score_cache.time.time", return_value=1_000_000.0):
+            cache.put("k", {"score": 1})
+        with patch("src.score_cache.time.time", return_value=1_000_000.0 + 2 * 86400):
+            assert cache.get("k") is None
+            assert cache.evict() == 1
+
+    def test_size_eviction_keeps_most_recently_used(self, tmp_path):
+        cache = ScoreCache(tmp_path / "c.sqlite", ttl_days=None, max_entries=2)
+        for i, k in enumerate("abc"):
+            with patch("src.score_cache.time.time", return_value=1000.0 + i):
+                cache.put(k, {"score": i})
+        with patch("src.score_cache.time.time", return_value=2000.0):
+            cache.get("a")  # touch oldest
+        cache.evict()
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
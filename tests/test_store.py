@@ -0,0 +1,106 @@
+from src.store import JobStore, dedupe, fuzzy_key
+
+
+def _job(sid, title="Backend Engineer", company="Acme", location="New York, NY", desc="Build APIs"):
+    return {"src_id": sid, "title": title, "company": company, "location": location, "description": desc}
+
+
+class TestFuzzyKey:
+    def test_ignores_case_and_punctuation(self):
+        a = _job("a", title="Sr. Backend Engineer", company="ACME, Inc.")
+        b = _job("b", title="sr backend  engineer", company="Acme Inc")
+        assert fuzzy_key(a) == fuzzy_key(b)
+
+
+class TestDedupe:
+    def test_by_src_id_and_fuzzy_key(self):
+        rows = [_job("indeed:1"), _job("indeed:1"), _job("linkedin:9"), _job("indeed:2", title="Other")]
+        assert [r["src_id"] for r in dedupe(rows)] == ["indeed:1", "indeed:2"]
+
+
+class TestJobStore:
+    def test_new_changed_unchanged_duplicate(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.sqlite")
+        run1 = store.start_run()
+        assert store.upsert([_job("a:1"), _job("a:2", title="Data Engineer")], run1)["new"] == 2
+
+        run2 = store.start_run()
+        counts = store.upsert(
+            [
+                _job("a:1"),  # unchanged
+                _job("a:2", title="Data Engineer", desc="Now with Spark"),  # changed
+                _job("b:7"),  # same posting as a:1 on another site
+                _job("a:3", title="ML Engineer"),  # new
+            ],
+            run2,
+        )
+        assert counts == {"new": 1, "changed": 1, "unchanged": 1, "duplicate": 1}
+        assert [r["src_id"] for r in store.new_since(run2)] == ["a:2", "a:3"]
+        assert store.last_run() == run2
+
+        a1 = store.get("a:1")
+        assert a1["first_run"] == run1 and a1["seen_run"] == run2
+        assert a1["last_seen"] >= a1["first_seen"]
+
+    def test_persists(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.sqlite")
+        store.upsert([_job("a:1")], store.start_run())
+        store.close()
+        again = JobStore(tmp_path / "jobs.sqlite")
+        assert again.upsert([_job("a:1")], again.start_run())["unchanged"] == 1
+
+
+class TestScoresAndExport:
+    def _store(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.sqlite")
+        store.upsert([_job("a:1"), _job("a:2", title="Data Engineer")], store.start_run())
+        return store
+
+    def test_wal_mode(self, tmp_path):
+        store = self._store(tmp_path)
+        assert store.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_unscored_until_scored_then_again_on_change(self, tmp_path):
+        store = self._store(tmp_path)
+        assert len(store.unscored()) == 2
+        store.save_scores([{"external_id": "a:1", "score": 70}], "rank")
+        assert [r["src_id"] for r in store.unscored()] == ["a:2"]
+
+        store.upsert([_job("a:1", desc="Rewritten")], store.start_run())
+        assert [r["src_id"] for r in store.unscored()] == ["a:1", "a:2"]
+
+    def test_unscored_by_another_model(self, tmp_path):
+        store = self._store(tmp_path)
+        store.save_scores([{"external_id": "a:1", "score": 70}, {"external_id": "a:2", "score": 60}], "rank", "mini")
+        assert store.unscored("rank", "mini") == []
+        assert len(store.unscored("rank", "large")) == 2
+
+        store.save_scores([{"external_id": "a:1", "score": 80}], "rerank", "large")
+        assert store.outdated_reranks("large") == []
+        assert [r["external_id"] for r in store.outdated_reranks("huge")] == ["a:1"]
+
+    def test_scores_ordering_and_rerank_override(self, tmp_path):
+        store = self._store(tmp_path)
+        store.save_scores([{"external_id": "a:1", "score": 70}, {"external_id": "a:2", "score": "90"}])
+        assert [s["external_id"] for s in store.scores()] == ["a:2", "a:1"]
+        assert [s["external_id"] for s in store.scores(min_score=80)] == ["a:2"]
+
+        store.save_scores([{"external_id": "a:1", "score": 95}], "rerank")
+        assert [s["score"] for s in store.best_scores()] == [95, "90"]
+
+    def test_jobs_filters(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.sqlite")
+        rows = [dict(_job("indeed:1"), created="2024-01-01"), dict(_job("adzuna:2", title="X"), created="2024-02-01")]
+        store.upsert(rows, store.start_run())
+        assert [r["src_id"] for r in store.jobs(source="adzuna")] == ["adzuna:2"]
+        assert [r["src_id"] for r in store.jobs(since="2024-01-15")] == ["adzuna:2"]
+
+    def test_export_ranked_csv(self, tmp_path):
+        import csv
+        from src.store import export_csv
+
+        store = self._store(tmp_path)
+        store.save_scores([{"external_id": "a:1", "score": 70, "title": "Backend Engineer"}])
+        export_csv(store, "ranked", tmp_path / "ranked.csv")
+        rows = list(csv.DictReader(open(tmp_path / "ranked.csv")))
+        assert rows[0]["external_id"] == "a:1" and rows[0]["score"] == "70"
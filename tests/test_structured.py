@@ -0,0 +1,43 @@
+import pytest
+
+from src.structured import coerce_score, loads_lenient
+
+
+class TestLoadsLenient:
+    def test_fenced_and_wrapped_in_prose(self):
+        assert loads_lenient('Here you go:\n```json\n{"score": 80}\n```') == {"score": 80}
+        assert loads_lenient('Result: {"score": 80} Hope this helps!') == {"score": 80}
+
+    def test_truncated_object_keeps_complete_fields(self):
+        assert loads_lenient('{"score": 71, "why": "strong Python", "tech_fit": ["go", "k8') == {
+            "score": 71, "why": "strong Python", "tech_fit": ["go", "k8"],
+        }
+        assert loads_lenient('{"score": 71, "level_fit": ') == {"score": 71}
+
+    def test_truncated_batch_drops_partial_job(self):
+        data = loads_lenient('{"jobs": [{"external_id": "a", "score": 1}, {"external_id": "b", "sc')
+        assert data["jobs"][0] == {"external_id": "a", "score": 1}
+
+    def test_no_json(self):
+        with pytest.raises(ValueError):
+            loads_lenient("I cannot score this job.")
+
+
+class TestCoerceScore:
+    def test_coerces_types(self):
+        data = coerce_score({"score": "85/100", "tech_fit": "python, go", "level_fit": "Senior",
+                             "location_fit": "great", "concerns": None, "why": "x" * 400})
+        assert data["score"] == 85
+        assert data["tech_fit"] == ["python", "go"]
+        assert data["level_fit"] == "senior"
+        assert data["location_fit"] == ""
+        assert data["concerns"] == [] and len(data["why"]) == 280
+
+    def test_clamps_and_rounds(self):
+        assert coerce_score({"score": 104.6})["score"] == 100
+        assert coerce_score({"score": "72.5"})["score"] == 72
+
+    @pytest.mark.parametrize("bad", [{"why": "no score"}, {"score": "n/a"}, {"score": True}, ["score"]])
+    def test_rejects_unusable(self, bad):
+        with pytest.raises(ValueError):
+            coerce_score(bad)